@@ -111,6 +111,31 @@ class VarianterDispatcher(EnabledExtensionManager):
         return super(VarianterDispatcher, self).map_method_with_return(
             method_name, deepcopy=True, *args, **kwargs)
 
+    def get_variant(self, index):
+        """
+        Reports the variant at a given position, among the variants of
+        all plugins, without producing the preceding ones
+
+        :param index: position of the variant
+        :type index: int
+        :raise IndexError: when the index is out of range
+        :raise NotImplementedError: when the plugin producing the variant
+                                    has no random access to its variants
+        """
+        if index < 0:
+            raise IndexError("Variant index out of range")
+        for ext in self.extensions:
+            if not hasattr(ext.obj, '__len__'):
+                continue
+            number = len(ext.obj)
+            if index < number:
+                if not hasattr(ext.obj, 'get_variant'):
+                    raise NotImplementedError("Varianter %s does not support "
+                                              "random access" % ext.name)
+                return ext.obj.get_variant(index)
+            index -= number
+        raise IndexError("Variant index out of range")
+
 
 class RunnerDispatcher(EnabledExtensionManager):
 
@@ -126,5 +151,7 @@ class InitDispatcher(EnabledExtensionManager):
 
 class SpawnerDispatcher(EnabledExtensionManager):
 
-    def __init__(self):
-        super(SpawnerDispatcher, self).__init__('avocado.plugins.spawner')
+    def __init__(self, config=None):
+        super(SpawnerDispatcher, self).__init__(
+            'avocado.plugins.spawner',
+            invoke_kwds={'config': config})
@@ -26,6 +26,7 @@ import sys
 import pkg_resources
 
 from ..utils import stacktrace
+from . import tracing
 
 # This is also defined in avocado.core.output, but this avoids a
 # circular import
@@ -116,6 +117,15 @@ class ExtensionManager:
         """
         return sorted(super(ExtensionManager, self).names())
 
+    def _span(self, extension, method_name):
+        """
+        Traces the execution of a method of an extension
+        """
+        if not tracing.TRACER.enabled:
+            return tracing.span(None)
+        return tracing.span('%s.%s' % (self.fully_qualified_name(extension),
+                                       method_name), 'plugin')
+
     def map_method_with_return(self, method_name, *args, **kwargs):
         """
         The same as `map_method` but additionally reports the list of returned
@@ -134,12 +144,13 @@ class ExtensionManager:
             try:
                 if hasattr(ext.obj, method_name):
                     method = getattr(ext.obj, method_name)
-                    if deepcopy:
-                        copied_args = [copy.deepcopy(arg) for arg in args]
-                        copied_kwargs = copy.deepcopy(kwargs)
-                        ret.append(method(*copied_args, **copied_kwargs))
-                    else:
-                        ret.append(method(*args, **kwargs))
+                    with self._span(ext, method_name):
+                        if deepcopy:
+                            copied_args = [copy.deepcopy(arg) for arg in args]
+                            copied_kwargs = copy.deepcopy(kwargs)
+                            ret.append(method(*copied_args, **copied_kwargs))
+                        else:
+                            ret.append(method(*args, **kwargs))
             except SystemExit:
                 raise
             except KeyboardInterrupt:
@@ -162,7 +173,8 @@ class ExtensionManager:
             try:
                 if hasattr(ext.obj, method_name):
                     method = getattr(ext.obj, method_name)
-                    method(*args)
+                    with self._span(ext, method_name):
+                        method(*args)
             except SystemExit:
                 raise
             except KeyboardInterrupt:
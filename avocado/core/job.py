@@ -33,7 +33,7 @@ from copy import deepcopy
 from ..utils import astring
 from ..utils.data_structures import CallbackRegister, time_to_seconds
 from . import (data_dir, dispatcher, exceptions, exit_codes, jobdata, output,
-               result, version)
+               result, tracing, version)
 from .job_id import create_unique_job_id
 from .output import LOG_JOB, LOG_UI, STD_OUTPUT
 from .settings import settings
@@ -67,6 +67,16 @@ def register_job_options():
                              key_type=time_to_seconds,
                              help_msg=help_msg)
 
+    help_msg = ('Records the time spent on the job phases, tests, test '
+                'phases and plugins, saving it in the Chrome trace event '
+                'format (viewable with chrome://tracing or Perfetto) as '
+                '"trace.json" in the job results directory.')
+    settings.register_option(section='job.run',
+                             key='trace',
+                             default=False,
+                             key_type=bool,
+                             help_msg=help_msg)
+
 
 register_job_options()
 
@@ -471,6 +481,9 @@ class Job:
         """
         Cleanup the temporary job handlers (dirs, global setting, ...)
         """
+        if self.config.get('job.run.trace'):
+            tracing.TRACER.export()
+            tracing.TRACER.disable()
         self.__stop_job_logging()
         if not self.__keep_tmpdir and os.path.exists(self.tmpdir):
             shutil.rmtree(self.tmpdir)
@@ -514,7 +527,8 @@ class Job:
         By default this runs the plugins that implement the
         :class:`avocado.core.plugin_interfaces.JobPostTests` interface.
         """
-        self.result_events_dispatcher.map_method('post_tests', self)
+        with tracing.span('post_tests', 'job'):
+            self.result_events_dispatcher.map_method('post_tests', self)
 
     def pre_tests(self):
         """
@@ -523,7 +537,8 @@ class Job:
         By default this runs the plugins that implement the
         :class:`avocado.core.plugin_interfaces.JobPreTests` interface.
         """
-        self.result_events_dispatcher.map_method('pre_tests', self)
+        with tracing.span('pre_tests', 'job'):
+            self.result_events_dispatcher.map_method('pre_tests', self)
 
     def render_results(self):
         """Render test results that depend on all tests having finished.
@@ -531,9 +546,10 @@ class Job:
         By default this runs the plugins that implement the
         :class:`avocado.core.plugin_interfaces.Result` interface.
         """
-        result_dispatcher = dispatcher.ResultDispatcher()
-        if result_dispatcher.extensions:
-            result_dispatcher.map_method('render', self.result, self)
+        with tracing.span('render_results', 'job'):
+            result_dispatcher = dispatcher.ResultDispatcher()
+            if result_dispatcher.extensions:
+                result_dispatcher.map_method('render', self.result, self)
 
     def run(self):
         """
@@ -548,41 +564,44 @@ class Job:
         assert self.tmpdir is not None, "Job.setup() not called"
         if self.time_start == -1:
             self.time_start = time.time()
-        try:
-            self.result.tests_total = self.size
-            self.pre_tests()
-            return self.run_tests()
-        except exceptions.JobBaseException as details:
-            self.status = details.status
-            fail_class = details.__class__.__name__
-            self.log.error('\nAvocado job failed: %s: %s', fail_class, details)
-            self.exitcode |= exit_codes.AVOCADO_JOB_FAIL
-            return self.exitcode
-        except exceptions.OptionValidationError as details:
-            self.log.error('\n%s', str(details))
-            self.exitcode |= exit_codes.AVOCADO_JOB_FAIL
-            return self.exitcode
-
-        except Exception as details:  # pylint: disable=W0703
-            self.status = "ERROR"
-            exc_type, exc_value, exc_traceback = sys.exc_info()
-            tb_info = traceback.format_exception(exc_type, exc_value,
-                                                 exc_traceback.tb_next)
-            fail_class = details.__class__.__name__
-            self.log.error('\nAvocado crashed: %s: %s', fail_class, details)
-            for line in tb_info:
-                self.log.debug(line)
-            self.log.error("Please include the traceback info and command line"
-                           " used on your bug report")
-            self.log.error('Report bugs visiting %s', _NEW_ISSUE_LINK)
-            self.exitcode |= exit_codes.AVOCADO_FAIL
-            return self.exitcode
-        finally:
-            self.post_tests()
-            if self.time_end == -1:
-                self.time_end = time.time()
-                self.time_elapsed = self.time_end - self.time_start
-            self.render_results()
+        with tracing.span('run', 'job', job_id=self.unique_id):
+            try:
+                self.result.tests_total = self.size
+                self.pre_tests()
+                return self.run_tests()
+            except exceptions.JobBaseException as details:
+                self.status = details.status
+                fail_class = details.__class__.__name__
+                self.log.error('\nAvocado job failed: %s: %s',
+                               fail_class, details)
+                self.exitcode |= exit_codes.AVOCADO_JOB_FAIL
+                return self.exitcode
+            except exceptions.OptionValidationError as details:
+                self.log.error('\n%s', str(details))
+                self.exitcode |= exit_codes.AVOCADO_JOB_FAIL
+                return self.exitcode
+
+            except Exception as details:  # pylint: disable=W0703
+                self.status = "ERROR"
+                exc_type, exc_value, exc_traceback = sys.exc_info()
+                tb_info = traceback.format_exception(exc_type, exc_value,
+                                                     exc_traceback.tb_next)
+                fail_class = details.__class__.__name__
+                self.log.error('\nAvocado crashed: %s: %s',
+                               fail_class, details)
+                for line in tb_info:
+                    self.log.debug(line)
+                self.log.error("Please include the traceback info and "
+                               "command line used on your bug report")
+                self.log.error('Report bugs visiting %s', _NEW_ISSUE_LINK)
+                self.exitcode |= exit_codes.AVOCADO_FAIL
+                return self.exitcode
+            finally:
+                self.post_tests()
+                if self.time_end == -1:
+                    self.time_end = time.time()
+                    self.time_elapsed = self.time_end - self.time_start
+                self.render_results()
 
     def run_tests(self):
         """
@@ -597,7 +616,9 @@ class Job:
 
         summary = set()
         for suite in self.test_suites:
-            summary |= suite.run(self)
+            with tracing.span('run_suite', 'job', suite=str(suite.name),
+                              tests=suite.size):
+                summary |= suite.run(self)
 
         # If it's all good so far, set job status to 'PASS'
         if self.status == 'RUNNING':
@@ -621,6 +642,9 @@ class Job:
                 tmp_dir = tempfile.mkdtemp(prefix="avocado-dry-run-")
                 self.config['run.results_dir'] = tmp_dir
         self._setup_job_results()
+        if self.config.get('job.run.trace'):
+            tracing.TRACER.enable()
+            tracing.TRACER.set_output(self.logdir)
         self.result = result.Result(self.unique_id, self.logfile)
         self.__start_job_logging()
         self._setup_job_category()
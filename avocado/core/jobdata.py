@@ -23,7 +23,7 @@ import os
 from ..utils.path import init_dir
 from .output import LOG_JOB, LOG_UI
 from .settings import settings
-from .varianter import VARIANTS_FILENAME
+from .varianter import VARIANTS_FILENAME, dump_variants_compact
 
 JOB_DATA_DIR = 'jobdata'
 CONFIG_FILENAME = 'config'
@@ -62,10 +62,8 @@ def record(job, cmdline=None):
         os.fsync(config_file)
 
     with open(path_variants, 'w') as variants_file:
-        variants = []
-        for suite in job.test_suites:
-            variants.append(suite.variants.dump())
-        json.dump(variants, variants_file, default=json_bad_variants_obj)
+        dump_variants_compact([suite.variants for suite in job.test_suites],
+                              variants_file, default=json_bad_variants_obj)
         variants_file.flush()
         os.fsync(variants_file)
 
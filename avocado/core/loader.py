@@ -23,6 +23,7 @@ import os
 import re
 import shlex
 import sys
+import time
 import warnings
 from enum import Enum
 
@@ -81,6 +82,8 @@ class TestLoaderProxy:
         self.reference_plugin_mapping = {}
         self._label_mapping = None
         self._decorator_mapping = None
+        self._preloaded_modules = {}
+        self._preloaded_names = set()
 
     def register_plugin(self, plugin):
         try:
@@ -258,6 +261,71 @@ class TestLoaderProxy:
         self._update_mappings()
         return tests
 
+    @staticmethod
+    def _get_module_name(test_path):
+        return os.path.basename(test_path).split('.')[0]
+
+    def _import_test_module(self, test_path):
+        """
+        Imports (or reimports) the module in the given path
+
+        :param test_path: path to the Python module file
+        :type test_path: str
+        :return: the imported module
+        """
+        module_name = self._get_module_name(test_path)
+        test_module_dir = os.path.abspath(os.path.dirname(test_path))
+        # Tests with local dir imports need this
+        try:
+            sys.path.insert(0, test_module_dir)
+            f, p, d = imp.find_module(module_name, [test_module_dir])
+            return imp.load_module(module_name, f, p, d)
+        finally:
+            if test_module_dir in sys.path:
+                sys.path.remove(test_module_dir)
+
+    def preload_test_module(self, test_path):
+        """
+        Imports a test module once, to be reused by :meth:`load_test`
+
+        Test processes forked after a module is preloaded inherit it
+        (copy-on-write), instead of importing it (and all its
+        dependencies) again.  Modules that fail to import are not
+        preloaded, so that the error is reported by each of its tests.
+        Modules are imported by their file name, so a module with the
+        same name as one already preloaded (but on a different
+        directory) is not preloaded either, as it would replace it.
+
+        :param test_path: path to the Python module file
+        :type test_path: str
+        :return: the time, in seconds, spent importing the module, or
+                 None if it was not preloaded now
+        """
+        test_path = os.path.abspath(test_path)
+        if test_path in self._preloaded_modules:
+            return None
+        module_name = self._get_module_name(test_path)
+        if module_name in self._preloaded_names:
+            return None
+        start = time.monotonic()
+        try:
+            module = self._import_test_module(test_path)
+        except:  # pylint: disable=W0702
+            return None
+        self._preloaded_modules[test_path] = module
+        self._preloaded_names.add(module_name)
+        return time.monotonic() - start
+
+    def clear_preloaded_modules(self):
+        """
+        Forgets the modules preloaded by :meth:`preload_test_module`
+
+        The modules preloaded for a job must not be reused by later jobs,
+        as the test files may have changed in the meantime.
+        """
+        self._preloaded_modules = {}
+        self._preloaded_names = set()
+
     def load_test(self, test_factory):
         """
         Load test from the test factory.
@@ -271,24 +339,22 @@ class TestLoaderProxy:
             test_path = test_parameters.pop('modulePath')
         else:
             test_path = None
+        time_import = -1
         if isinstance(test_class, str):
-            module_name = os.path.basename(test_path).split('.')[0]
-            test_module_dir = os.path.abspath(os.path.dirname(test_path))
-            # Tests with local dir imports need this
-            try:
-                sys.path.insert(0, test_module_dir)
-                f, p, d = imp.find_module(module_name, [test_module_dir])
-                test_module = imp.load_module(module_name, f, p, d)
-            except:  # pylint: disable=W0702
-                # On load_module exception we fake the test class and pass
-                # the exc_info as parameter to be logged.
-                test_parameters['methodName'] = 'test'
-                exception = stacktrace.prepare_exc_info(sys.exc_info())
-                test_parameters['exception'] = exception
-                return test.TestError(**test_parameters)
-            finally:
-                if test_module_dir in sys.path:
-                    sys.path.remove(test_module_dir)
+            start = time.monotonic()
+            test_module = self._preloaded_modules.get(
+                os.path.abspath(test_path))
+            if test_module is None:
+                try:
+                    test_module = self._import_test_module(test_path)
+                except:  # pylint: disable=W0702
+                    # On load_module exception we fake the test class and
+                    # pass the exc_info as parameter to be logged.
+                    test_parameters['methodName'] = 'test'
+                    exception = stacktrace.prepare_exc_info(sys.exc_info())
+                    test_parameters['exception'] = exception
+                    return test.TestError(**test_parameters)
+            time_import = time.monotonic() - start
             for _, obj in inspect.getmembers(test_module):
                 if (inspect.isclass(obj) and obj.__name__ == test_class and
                         inspect.getmodule(obj) == test_module):
@@ -302,6 +368,7 @@ class TestLoaderProxy:
         elif 'nrun.results_dir' in test_parameters:
             test_parameters['base_logdir'] = test_parameters.pop('nrun.results_dir')
         test_instance = test_class(**test_parameters)
+        test_instance.time_import = time_import
 
         return test_instance
 
@@ -413,6 +480,18 @@ def add_loader_options(parser, section='run'):
                              parser=arggrp,
                              long_arg='--loaders')
 
+    help_msg = ("Do not use, nor update, the cache of the tests found on "
+                "Python files, which are otherwise only parsed again when "
+                "they, or the files their test classes inherit from, change")
+    settings.register_option(section=section,
+                             key='discovery_cache',
+                             default=True,
+                             key_type=bool,
+                             action='store_false',
+                             help_msg=help_msg,
+                             parser=arggrp,
+                             long_arg='--no-discovery-cache')
+
     help_msg = ("Path to an specific test runner that allows the use of its "
                 "own tests. This should be used for running tests that do not "
                 "conform to Avocado\'s SIMPLE test interface and can not run "
@@ -8,6 +8,7 @@ import io
 import json
 import multiprocessing
 import os
+import select
 import socket
 import subprocess
 import sys
@@ -21,6 +22,14 @@ try:
 except ImportError:
     PKG_RESOURCES_AVAILABLE = False
 
+try:
+    from .resource_usage import ResourceUsageTracker
+    from .status import protocol as status_protocol
+except ImportError:
+    # when running as a standalone script, outside of the avocado package
+    ResourceUsageTracker = None
+    status_protocol = None
+
 
 #: The amount of time (in seconds) between each internal status check
 RUNNER_RUN_CHECK_INTERVAL = 0.01
@@ -29,6 +38,27 @@ RUNNER_RUN_CHECK_INTERVAL = 0.01
 #: runner that performs its work asynchronously
 RUNNER_RUN_STATUS_INTERVAL = 0.5
 
+#: The maximum amount of output (in bytes), from each of stdout and
+#: stderr, kept in memory and sent on a status message by the runners
+#: of executables
+EXEC_RUNNER_OUTPUT_LIMIT = 1024 * 1024
+
+#: The prefix of status URIs that refer to a UNIX domain socket path
+STATUS_URI_UNIX_PREFIX = 'unix:'
+
+#: The maximum amount of time (in seconds) a status service holds
+#: "running" messages before sending them
+STATUS_SERVICE_FLUSH_INTERVAL = 1.0
+
+#: The maximum number of messages a status service holds before sending
+STATUS_SERVICE_BUFFER_MESSAGES = 64
+
+#: The number of attempts to (re)connect and send messages to a status
+#: server, and the delay (in seconds, doubled at every new attempt)
+#: between them
+STATUS_SERVICE_CONNECT_ATTEMPTS = 3
+STATUS_SERVICE_RECONNECT_DELAY = 0.1
+
 #: All known runner commands, capable of being used by a
 #: SpawnMethod.STANDALONE_EXECUTABLE compatible spawners
 RUNNERS_REGISTRY_STANDALONE_EXECUTABLE = {}
@@ -350,6 +380,39 @@ class NoOpRunner(BaseRunner):
 RUNNERS_REGISTRY_PYTHON_CLASS['noop'] = NoOpRunner
 
 
+class _OutputSink:
+    """
+    Receives the output of a process, without holding all of it in memory
+
+    The output is written to a file, if a path is given, and only its
+    last :data:`EXEC_RUNNER_OUTPUT_LIMIT` bytes are kept in memory.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.size = 0
+        self._tail = bytearray()
+        self._file = None
+        if path is not None:
+            self._file = open(path, 'wb')
+
+    def write(self, data):
+        self.size += len(data)
+        if self._file is not None:
+            self._file.write(data)
+        self._tail += data
+        # trimming only once twice the limit is reached keeps the number
+        # of (expensive) trims low
+        if len(self._tail) > 2 * EXEC_RUNNER_OUTPUT_LIMIT:
+            del self._tail[:-EXEC_RUNNER_OUTPUT_LIMIT]
+
+    def tail(self):
+        return bytes(self._tail[-EXEC_RUNNER_OUTPUT_LIMIT:])
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
 class ExecRunner(BaseRunner):
     """
     Runner for standalone executables with or without arguments
@@ -363,7 +426,19 @@ class ExecRunner(BaseRunner):
 
      * kwargs: key=val to be set as environment variables to the
        process
+
+    The output of the process is read while it runs and, when running
+    as part of a task, saved to the "stdout" and "stderr" files in the
+    task output directory.  The "running" statuses report the number of
+    bytes produced so far ("stdout_size" and "stderr_size"), and the
+    "finished" status includes (up to :data:`EXEC_RUNNER_OUTPUT_LIMIT`
+    bytes of) the end of the output, and the paths of the files.
     """
+    def _output_dir(self):
+        if self.runnable.kwargs:
+            return self.runnable.kwargs.get('AVOCADO_TEST_OUTPUT_DIR')
+        return None
+
     def run(self):
         env = None
         if self.runnable.kwargs:
@@ -379,27 +454,53 @@ class ExecRunner(BaseRunner):
             env=env)
 
         yield self.prepare_status('started')
-        most_current_execution_state_time = None
-        while process.poll() is None:
-            time.sleep(RUNNER_RUN_CHECK_INTERVAL)
-            now = time.time()
-            if most_current_execution_state_time is not None:
-                next_execution_state_mark = (most_current_execution_state_time +
-                                             RUNNER_RUN_STATUS_INTERVAL)
-            if (most_current_execution_state_time is None or
-                    now > next_execution_state_mark):
-                most_current_execution_state_time = now
-                yield self.prepare_status('running')
-
-        stdout = process.stdout.read()
-        process.stdout.close()
-        stderr = process.stderr.read()
-        process.stderr.close()
-
-        return_code = process.returncode
-        yield self.prepare_status('finished', {'returncode': return_code,
-                                               'stdout': stdout,
-                                               'stderr': stderr})
+        output_dir = self._output_dir()
+        sinks = {}
+        for name, stream in (('stdout', process.stdout),
+                             ('stderr', process.stderr)):
+            path = None
+            if output_dir is not None:
+                path = os.path.join(output_dir, name)
+            sinks[stream.fileno()] = _OutputSink(path)
+
+        # the output is read as it's produced, so that the process does
+        # not block on a full pipe
+        try:
+            open_fds = list(sinks)
+            next_status = time.monotonic() + RUNNER_RUN_CHECK_INTERVAL
+            while open_fds:
+                timeout = max(0, next_status - time.monotonic())
+                for fd in select.select(open_fds, [], [], timeout)[0]:
+                    data = os.read(fd, 65536)
+                    if data:
+                        sinks[fd].write(data)
+                    else:
+                        open_fds.remove(fd)
+                if open_fds and time.monotonic() >= next_status:
+                    next_status = (time.monotonic() +
+                                   RUNNER_RUN_STATUS_INTERVAL)
+                    yield self.prepare_status(
+                        'running',
+                        {'stdout_size': sinks[process.stdout.fileno()].size,
+                         'stderr_size': sinks[process.stderr.fileno()].size})
+        finally:
+            for sink in sinks.values():
+                sink.close()
+            stdout = sinks[process.stdout.fileno()]
+            stderr = sinks[process.stderr.fileno()]
+            process.stdout.close()
+            process.stderr.close()
+
+        return_code = process.wait()
+        finished = {'returncode': return_code,
+                    'stdout': stdout.tail(),
+                    'stderr': stderr.tail(),
+                    'stdout_size': stdout.size,
+                    'stderr_size': stderr.size}
+        if output_dir is not None:
+            finished['stdout_path'] = stdout.path
+            finished['stderr_path'] = stderr.path
+        yield self.prepare_status('finished', finished)
 
 
 RUNNERS_REGISTRY_PYTHON_CLASS['exec'] = ExecRunner
@@ -518,7 +619,10 @@ class PythonUnittestRunner(BaseRunner):
                 most_current_execution_state_time = now
                 yield self.prepare_status('running')
 
-        yield queue.get()
+        status = queue.get()
+        # reaps the test process, so that its resources are accounted for
+        process.join()
+        yield status
 
 
 RUNNERS_REGISTRY_PYTHON_CLASS['python-unittest'] = PythonUnittestRunner
@@ -588,24 +692,137 @@ class TaskStatusService:
     """
     Implementation of interface that a task can use to post status updates
 
+    The status server can be reached either by TCP, with a "host:port"
+    URI, or by a UNIX domain socket, with a "unix:/path/to/socket" URI.
+
+    Messages are sent with the binary protocol described at
+    :mod:`avocado.core.status.protocol` when both ends support it, and
+    as JSON lines otherwise.
+
+    To reduce the number of system calls, "running" messages are held
+    in a buffer for up to :data:`STATUS_SERVICE_FLUSH_INTERVAL` seconds,
+    and sent together with the next messages.  Consecutive heartbeats
+    (plain "running" messages, with no other information) are
+    coalesced, that is, only the latest one is kept.  The first message
+    of a task, and messages for other statuses, cause the buffer to be
+    sent immediately.
+
     TODO: make the interface generic and this just one of the implementations
     """
-    def __init__(self, uri):
+    def __init__(self, uri, binary=True):
+        """
+        :param uri: the "host:port" or "unix:/path/to/socket" the status
+                    server listens on
+        :type uri: str
+        :param binary: whether to attempt to use the binary protocol
+        :type binary: bool
+        """
         self.uri = uri
+        self.binary = binary and status_protocol is not None
         self.connection = None
+        #: The version of the binary protocol in use, or 0 for JSON lines
+        self.protocol_version = 0
+        self._buffer = []
+        self._heartbeat = None
+        self._last_flush = time.monotonic()
+        self._posted = False
+
+    def _create_connection(self):
+        if self.uri.startswith(STATUS_URI_UNIX_PREFIX):
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                connection.connect(self.uri[len(STATUS_URI_UNIX_PREFIX):])
+            except OSError:
+                connection.close()
+                raise
+            return connection
+        host, port = self.uri.rsplit(':', 1)
+        return socket.create_connection((host, int(port)))
+
+    def _connect(self):
+        self.connection = self._create_connection()
+        if not self.binary:
+            return
+        self.protocol_version = status_protocol.negotiate(self.connection)
+        if not self.protocol_version:
+            # the server does not understand the binary protocol, and
+            # may have been confused by the hello, so start over
+            self.connection.close()
+            self.connection = self._create_connection()
+            self.binary = False
 
-    def post(self, status):
-        host, port = self.uri.split(':')
-        port = int(port)
-        if self.connection is None:
-            self.connection = socket.create_connection((host, port))
+    def _disconnect(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _encode(self, status):
+        if self.protocol_version:
+            return status_protocol.encode_frame(status)
+        return json_dumps(status).encode('ascii') + b"\n"
 
-        data = json_dumps(status)
-        self.connection.send(data.encode('ascii') + "\n".encode('ascii'))
+    @staticmethod
+    def _is_heartbeat(status):
+        return (status.get('status') == 'running' and
+                all(key in ('id', 'status', 'time') for key in status))
+
+    def _send(self, messages):
+        """
+        Sends the messages, reconnecting to the server if needed
+
+        Messages are encoded only once connected, as the encoding depends
+        on the protocol negotiated with the server.
+        """
+        delay = STATUS_SERVICE_RECONNECT_DELAY
+        for attempt in range(STATUS_SERVICE_CONNECT_ATTEMPTS):
+            try:
+                if self.connection is None:
+                    self._connect()
+                self.connection.sendall(b''.join(self._encode(message)
+                                                 for message in messages))
+                return
+            except OSError:
+                self._disconnect()
+                if attempt == STATUS_SERVICE_CONNECT_ATTEMPTS - 1:
+                    raise
+                time.sleep(delay)
+                delay *= 2
+
+    def flush(self):
+        """
+        Sends the messages held in the buffer, if any
+        """
+        messages = self._buffer
+        if self._heartbeat is not None:
+            messages.append(self._heartbeat)
+        self._buffer = []
+        self._heartbeat = None
+        self._last_flush = time.monotonic()
+        if messages:
+            self._send(messages)
+
+    def post(self, status):
+        if self._is_heartbeat(status):
+            # only the latest of consecutive heartbeats is of any interest
+            self._heartbeat = status
+        else:
+            # the pending heartbeat still tells when the task was alive
+            if self._heartbeat is not None:
+                self._buffer.append(self._heartbeat)
+                self._heartbeat = None
+            self._buffer.append(status)
+        if (not self._posted or status.get('status') != 'running' or
+                len(self._buffer) >= STATUS_SERVICE_BUFFER_MESSAGES or
+                (time.monotonic() - self._last_flush >=
+                 STATUS_SERVICE_FLUSH_INTERVAL)):
+            self._posted = True
+            self.flush()
 
     def close(self):
-        if self.connection is not None:
-            self.connection.close()
+        try:
+            self.flush()
+        finally:
+            self._disconnect()
 
     def __repr__(self):
         return '<TaskStatusService uri="{}">'.format(self.uri)
@@ -700,13 +917,26 @@ class Task:
         self.setup_output_dir()
         runner_klass = self.runnable.pick_runner_class(self.known_runners)
         runner = runner_klass(self.runnable)
+        tracker = None
+        if ResourceUsageTracker is not None:
+            # runners run the runnables in child processes (or, if
+            # in-process, usage is negligible), and wait for them before
+            # the final status, so only those are counted
+            tracker = ResourceUsageTracker(include_self=False)
+            tracker.start()
         for status in runner.run():
             if status['status'] == 'started':
                 status.update({'output_dir': self.output_dir})
+            elif (status['status'] == 'finished' and tracker is not None and
+                  'resource_usage' not in status):
+                # runners may measure the runnable themselves
+                status.update({'resource_usage': tracker.stop()})
             status.update({"id": self.identifier})
             for status_service in self.status_services:
                 status_service.post(status)
             yield status
+        for status_service in self.status_services:
+            status_service.close()
 
 
 class BaseRunnerApp:
@@ -72,7 +72,7 @@ class AvocadoInstrumentedTestRunner(nrunner.BaseRunner):
 
         process.start()
 
-        self.prepare_status('started')
+        yield self.prepare_status('started')
         most_current_execution_state_time = None
         while queue.empty():
             time.sleep(nrunner.RUNNER_RUN_CHECK_INTERVAL)
@@ -85,7 +85,10 @@ class AvocadoInstrumentedTestRunner(nrunner.BaseRunner):
                 most_current_execution_state_time = now
                 yield self.prepare_status('running')
 
-        yield queue.get()
+        status = queue.get()
+        # reaps the test process, so that its resources are accounted for
+        process.join()
+        yield status
 
 
 class RunnerApp(nrunner.BaseRunnerApp):
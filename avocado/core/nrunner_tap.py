@@ -1,4 +1,5 @@
-import io
+import os
+import select
 import subprocess
 import time
 
@@ -29,38 +30,111 @@ class TAPRunner(nrunner.BaseRunner):
                            'bar', # arg 1
                            DEBUG='false') # kwargs 1 (environment)
     """
+    @staticmethod
+    def _iter_lines(process):
+        """
+        Yields the lines of output of the process, as they are produced
+
+        None is yielded every time no output was produced in the last
+        :data:`nrunner.RUNNER_RUN_STATUS_INTERVAL` seconds.  Lines longer
+        than :data:`nrunner.EXEC_RUNNER_OUTPUT_LIMIT` are truncated to
+        that size, and the rest of them is discarded as it's read, so
+        they're never held as a whole.
+        """
+        fd = process.stdout.fileno()
+        limit = nrunner.EXEC_RUNNER_OUTPUT_LIMIT
+        pending = b''
+        # whether the rest of a truncated line is being discarded
+        truncated = False
+        while True:
+            ready = select.select([fd], [], [],
+                                  nrunner.RUNNER_RUN_STATUS_INTERVAL)[0]
+            if not ready:
+                yield None
+                continue
+            data = os.read(fd, 65536)
+            if not data:
+                break
+            lines = (pending + data).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                if truncated:
+                    truncated = False
+                    continue
+                yield line[:limit]
+            if truncated:
+                pending = b''
+            elif len(pending) >= limit:
+                yield pending[:limit]
+                pending = b''
+                truncated = True
+        if pending:
+            yield pending
+
+    @staticmethod
+    def _event_to_result(event, result):
+        """
+        Returns the result given the event, and if it's the final result
+        """
+        if isinstance(event, (TapParser.Bailout, TapParser.Error)):
+            return 'error', True
+        if isinstance(event, TapParser.Test):
+            if event.result in (TestResult.XPASS, TestResult.FAIL):
+                return 'fail', True
+            if event.result == TestResult.SKIP:
+                return 'skip', True
+            return 'pass', False
+        return result, False
+
     def run(self):
         env = self.runnable.kwargs or None
+        # stderr is not used for anything, and if piped, it could fill
+        # up and block the process, as it's not read while it runs
         process = subprocess.Popen(
             [self.runnable.uri] + list(self.runnable.args),
             stdin=subprocess.DEVNULL,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
             env=env)
 
-        while process.poll() is None:
-            time.sleep(nrunner.RUNNER_RUN_STATUS_INTERVAL)
-            yield self.prepare_status('running')
-
-        stdout = io.TextIOWrapper(process.stdout)
-        parser = TapParser(stdout)
+        # the output is parsed as it's produced, so each TAP test result
+        # is reported as soon as it's known, and the output is never
+        # held in memory as a whole
+        parser = TapParser()
         result = 'error'
-        for event in parser.parse():
-            if isinstance(event, TapParser.Bailout):
-                result = 'error'
-                break
-            elif isinstance(event, TapParser.Error):
-                result = 'error'
-                break
-            elif isinstance(event, TapParser.Test):
-                if event.result in (TestResult.XPASS, TestResult.FAIL):
-                    result = 'fail'
+        final = False
+        last_running = time.monotonic()
+        for line in self._iter_lines(process):
+            if line is None:
+                last_running = time.monotonic()
+                yield self.prepare_status('running')
+                continue
+            # once the result is final, the remaining output is only
+            # consumed, so that the process is not blocked writing to it
+            if final:
+                continue
+            for event in parser.parse_line(line):
+                result, final = self._event_to_result(event, result)
+                if isinstance(event, TapParser.Test):
+                    last_running = time.monotonic()
+                    yield self.prepare_status('running',
+                                              {'tap_test': {
+                                                  'number': event.number,
+                                                  'name': event.name,
+                                                  'result': event.result.value}})
+                if final:
                     break
-                elif event.result == TestResult.SKIP:
-                    result = 'skip'
+            if (time.monotonic() - last_running >
+                    nrunner.RUNNER_RUN_STATUS_INTERVAL):
+                last_running = time.monotonic()
+                yield self.prepare_status('running')
+        process.stdout.close()
+        process.wait()
+        if not final:
+            for event in parser.parse_end():
+                result, final = self._event_to_result(event, result)
+                if final:
                     break
-                else:
-                    result = 'pass'
 
         yield self.prepare_status('finished',
                                   {'result': result,
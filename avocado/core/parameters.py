@@ -15,6 +15,7 @@
 Module related to test parameters
 """
 
+import functools
 import logging
 import re
 
@@ -89,12 +90,18 @@ class AvocadoParams:
         :param leaves: list of TreeNode leaves
         """
         path_re = self._greedy_path_to_re(path)
-        path_leaves = [leaf for leaf in leaves if path_re.search(leaf.path + '/')]
-        for leaf in path_leaves:
-            leaves.remove(leaf)
+        path_leaves = []
+        remaining = []
+        for leaf in leaves:
+            if path_re.search(leaf.path + '/'):
+                path_leaves.append(leaf)
+            else:
+                remaining.append(leaf)
+        leaves[:] = remaining
         return path_leaves
 
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def _greedy_path_to_re(path):
         """
         Converts user-friendly path with asterisk to a regex and compiles it
@@ -211,12 +218,32 @@ class AvocadoParam:
         # names cache (leaf.path is quite expensive)
         self._leaf_names = [leaf.path + '/' for leaf in leaves]
         self.name = name
+        # key => [(leaf index, value, origin path), ...] of the leaves
+        # which contain the key, so lookups don't visit every leaf
+        self._key_index = {}
+        origin_paths = {}
+        for i, leaf in enumerate(leaves):
+            environment = leaf.environment
+            # environments are layered on their parents', so the origins
+            # are flattened once, instead of looked up through the layers
+            origins = dict(environment.origin.items())
+            for key, value in environment.items():
+                origin = origins[key]
+                origin_path = origin_paths.get(id(origin))
+                if origin_path is None:
+                    origin_path = origin_paths[id(origin)] = origin.path
+                self._key_index.setdefault(key, []).append(
+                    (i, value, origin_path))
+        # path pattern => set of indexes of the matching leaves
+        self._path_index = {}
 
     def __eq__(self, other):
-        if self.__dict__ == other.__dict__:
-            return True
-        else:
-            return False
+        # the indexes are derived from the leaves, and the path index
+        # depends on the previous queries, so they're not compared
+        for attr in ('_leaves', '_leaf_names', 'name'):
+            if getattr(self, attr) != getattr(other, attr, None):
+                return False
+        return True
 
     def __ne__(self, other):
         return not (self == other)
@@ -230,9 +257,22 @@ class AvocadoParam:
         """
         Get all leaves matching the path
         """
-        return [self._leaves[i]
-                for i in range(len(self._leaf_names))
-                if path.search(self._leaf_names[i])]
+        return [self._leaves[i] for i in sorted(self._match_path(path))]
+
+    def _match_path(self, path):
+        """
+        Get the indexes of the leaves matching the path
+
+        The path is evaluated only once per distinct path for all the
+        leaves, and the result is kept for further queries.
+        """
+        try:
+            return self._path_index[path]
+        except KeyError:
+            matches = frozenset(i for i, name in enumerate(self._leaf_names)
+                                if path.search(name))
+            self._path_index[path] = matches
+            return matches
 
     def get_or_die(self, path, key):
         """
@@ -240,20 +280,23 @@ class AvocadoParam:
         :raise NoMatchError: When no matches
         :raise KeyError: When value is not certain (multiple matches)
         """
-        leaves = self._get_leaves(path)
-        ret = [(leaf.environment[key], leaf.environment.origin[key])
-               for leaf in leaves
-               if key in leaf.environment]
+        entries = self._key_index.get(key)
+        if entries:
+            matches = self._match_path(path)
+            ret = [entry for entry in entries if entry[0] in matches]
+        else:
+            ret = None
         if not ret:
             raise NoMatchError("No matches to %s => %s in %s"
                                % (path.pattern, key, self.str_leaves_variant))
         # make sure all params come from the same origin
-        if len(set([_[1].path for _ in ret])) == 1:
-            return ret[0][0]
+        origin = ret[0][2]
+        if all(entry[2] == origin for entry in ret):
+            return ret[0][1]
         else:
             raise ValueError("Multiple %s leaves contain the key '%s'; %s"
                              % (path.pattern, key,
-                                ["%s=>%s" % (_[1].path, _[0])
+                                ["%s=>%s" % (_[2], _[1])
                                  for _ in ret]))
 
     def iteritems(self):
@@ -262,5 +305,6 @@ class AvocadoParam:
         which generates lots of duplicate entries due to inherited values.
         """
         for leaf in self._leaves:
+            origins = dict(leaf.environment.origin.items())
             for key, value in leaf.environment.items():
-                yield (leaf.environment.origin[key].path, key, value)
+                yield (origins[key].path, key, value)
@@ -15,6 +15,8 @@
 
 import abc
 
+from .output import LOG_JOB
+
 
 class Plugin(metaclass=abc.ABCMeta):
     """Base for all plugins."""
@@ -272,3 +274,20 @@ class Spawner(Plugin):
     @abc.abstractmethod
     async def spawn_task(self, task):
         """Spawns a task return whether the spawning was successful."""
+
+    async def terminate_task(self, task):
+        """Terminates a task that was spawned, and is possibly alive.
+
+        Spawners that can not terminate their tasks keep this default,
+        which leaves the task running until it finishes by itself.
+        """
+        LOG_JOB.warning('Spawner "%s" does not support terminating tasks, '
+                        'task "%s" was not terminated',
+                        self.__class__.__name__, task.identifier)
+
+    async def cleanup(self):
+        """Releases the resources kept by the spawner, once it's done.
+
+        Called after all the tasks have finished, this is meant for
+        spawners that keep resources (such as containers) across tasks.
+        """
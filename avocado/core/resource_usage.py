@@ -0,0 +1,121 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright: Red Hat Inc. 2020
+
+"""
+Accounting of the resources (CPU, memory, I/O) used by tests
+
+This module only depends on the Python standard library, so that it can
+also be used by the standalone runners.
+"""
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+#: The keys of the resource usage dictionaries, all of them numbers:
+#:  * cpu_user and cpu_system: CPU time, in seconds
+#:  * max_rss: the peak resident set size of the largest process, in KiB
+#:  * block_input and block_output: number of block I/O operations
+#:  * read_bytes and write_bytes: bytes read from and written to the
+#:    storage layer (only when the own process is also accounted for)
+USAGE_KEYS = ('cpu_user', 'cpu_system', 'max_rss',
+              'block_input', 'block_output',
+              'read_bytes', 'write_bytes')
+
+
+def _get_io_counters():
+    """
+    Gets the I/O accounting of this process and its waited for children
+
+    :rtype: dict
+    """
+    counters = {}
+    try:
+        with open('/proc/self/io') as io_file:
+            for line in io_file:
+                key, value = line.split(':', 1)
+                if key in ('read_bytes', 'write_bytes'):
+                    counters[key] = int(value)
+    except (OSError, ValueError):
+        pass
+    return counters
+
+
+def _get_rusage(who):
+    usage = resource.getrusage(who)
+    return {'cpu_user': usage.ru_utime,
+            'cpu_system': usage.ru_stime,
+            'max_rss': usage.ru_maxrss,
+            'block_input': usage.ru_inblock,
+            'block_output': usage.ru_oublock}
+
+
+class ResourceUsageTracker:
+
+    """
+    Tracks the resources used between :meth:`start` and :meth:`stop`
+
+    The resources used by child processes are only accounted for after
+    they've finished and were waited for.  The peak RSS is not a delta,
+    but the largest of the peak RSS of the processes accounted for.
+    """
+
+    def __init__(self, include_self=True):
+        """
+        :param include_self: whether the resources used by this process,
+                             and not only by its children, are accounted
+                             for.  Tests running in their own process
+                             should use True, while runners that only
+                             start the test process(es) may use False
+        :type include_self: bool
+        """
+        self.include_self = include_self
+        self._start = None
+
+    def _snapshot(self):
+        usage = _get_rusage(resource.RUSAGE_CHILDREN)
+        if self.include_self:
+            own = _get_rusage(resource.RUSAGE_SELF)
+            for key, value in own.items():
+                if key == 'max_rss':
+                    usage[key] = max(usage[key], value)
+                else:
+                    usage[key] += value
+            usage.update(_get_io_counters())
+        return usage
+
+    def start(self):
+        if RESOURCE_AVAILABLE:
+            self._start = self._snapshot()
+
+    def stop(self):
+        """
+        Gets the resources used since :meth:`start`
+
+        :returns: the resource usage, with (some of) the keys in
+                  :data:`USAGE_KEYS`, or None if it's not available
+        :rtype: dict or None
+        """
+        if self._start is None:
+            return None
+        end = self._snapshot()
+        usage = {}
+        for key, value in end.items():
+            if key == 'max_rss':
+                usage[key] = value
+            elif key in self._start:
+                # CPU times are floats, avoid reporting rounding noise
+                usage[key] = round(value - self._start[key], 6)
+        return usage
@@ -19,13 +19,33 @@ Safe (AST based) test loader module utilities
 
 import ast
 import collections
+import contextlib
+import hashlib
 import imp
 import json
 import os
+import pickle
 import re
 import sys
+import time
 
-from ..utils import data_structures
+from ..utils import crypto, data_structures
+
+#: Version of the format of the discovery cache files, changed whenever
+#: the format, or the results of :func:`find_python_tests`, change
+DISCOVERY_CACHE_VERSION = 1
+
+#: The cache used by :func:`find_python_tests`, if any, see
+#: :func:`discovery_cache`
+_DISCOVERY_CACHE = None
+
+#: The Python source code files parsed while finding tests, when they
+#: are being recorded on the discovery cache
+_PARSED_PATHS = None
+
+#: The modules that could not be found while finding tests, when the
+#: parsed files are being recorded on the discovery cache
+_UNRESOLVED_MODULES = None
 
 
 class PythonModule:
@@ -59,6 +79,8 @@ class PythonModule:
         self.path = path
         self.module = module
         self.klass = klass
+        if _PARSED_PATHS is not None:
+            _PARSED_PATHS.append(path)
         # A dict that keeps track of objects names and importable entities
         #   key => object name from this module point of view
         #   value => Something-like a directory path to the import.
@@ -396,6 +418,23 @@ def _extend_test_list(current, new):
             current.append(test)
 
 
+def _find_module(name, paths):
+    """
+    Finds a module with :func:`imp.find_module`, recording failures
+
+    :returns: the path of the module
+    :rtype: str
+    :raises: ImportError if the module was not found
+    """
+    try:
+        return imp.find_module(name, paths)[1]
+    except ImportError:
+        # the module may be created later, and so change the results
+        if _UNRESOLVED_MODULES is not None:
+            _UNRESOLVED_MODULES.append(name)
+        raise
+
+
 def _examine_class(path, class_name, match, target_module, target_class,
                    determine_match):
     """
@@ -497,8 +536,7 @@ def _examine_class(path, class_name, match, target_module, target_class,
 
             modules_paths = [parent_path,
                              os.path.dirname(module.path)] + sys.path
-            _, found_ppath, _ = imp.find_module(parent_module,
-                                                modules_paths)
+            found_ppath = _find_module(parent_module, modules_paths)
             _info, _disabled, _match = _examine_class(found_ppath,
                                                       parent_class,
                                                       match,
@@ -514,6 +552,142 @@ def _examine_class(path, class_name, match, target_module, target_class,
     return info, disabled, match
 
 
+class DiscoveryCache:
+    """
+    Cache of the tests found on Python source code files
+
+    The results of :func:`find_python_tests` for a file are kept on the
+    cache directory, along with the size, modification time and digest
+    of all the files parsed to find them, that is, the given one and the
+    ones its test classes inherit from.  They are reused for as long as
+    those files are unchanged, and the digest of a file is only checked
+    when its size is the same, but its modification time is not.  The
+    results are not cached when a module the test classes inherit from
+    could not be found, as it may be created later.
+    """
+
+    def __init__(self, cache_dir):
+        """
+        :param cache_dir: directory where the results are cached
+        :type cache_dir: str
+        """
+        self.cache_dir = cache_dir
+
+    def _get_cache_path(self, path):
+        key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+        return os.path.join(self.cache_dir, '%s.pickle' % key)
+
+    @staticmethod
+    def _load(cache_path):
+        try:
+            with open(cache_path, 'rb') as cache_file:
+                version, entries = pickle.load(cache_file)
+        except (OSError, EOFError, ValueError, TypeError, AttributeError,
+                ImportError, pickle.UnpicklingError):
+            return {}
+        if version != DISCOVERY_CACHE_VERSION:
+            return {}
+        return entries
+
+    @staticmethod
+    def _get_signature(path):
+        stat_result = os.stat(path)
+        mtime = stat_result.st_mtime_ns
+        # recently modified files may be modified again without changing
+        # their modification time, so only their digest is trusted
+        if time.time() - stat_result.st_mtime < crypto.CACHE_MIN_AGE:
+            mtime = None
+        return (path, stat_result.st_size, mtime,
+                crypto.hash_file(path, algorithm='sha1'))
+
+    @staticmethod
+    def _is_unchanged(signature):
+        path, size, mtime, digest = signature
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return False
+        if stat_result.st_size != size:
+            return False
+        if stat_result.st_mtime_ns == mtime:
+            return True
+        return crypto.hash_file(path, algorithm='sha1') == digest
+
+    def get(self, path, module_name, class_name):
+        """
+        Returns the cached tests of a file, or None if missing or changed
+
+        :param path: path to a Python source code file
+        :type path: str
+        :param module_name: as given to :func:`find_python_tests`
+        :type module_name: str
+        :param class_name: as given to :func:`find_python_tests`
+        :type class_name: str
+        """
+        entries = self._load(self._get_cache_path(path))
+        entry = entries.get((module_name, class_name))
+        if entry is None:
+            return None
+        signatures, result = entry
+        if not all(self._is_unchanged(_) for _ in signatures):
+            return None
+        return result
+
+    def set(self, path, module_name, class_name, parsed_paths, result):
+        """
+        Caches the tests of a file, found by :func:`find_python_tests`
+
+        :param path: path to a Python source code file
+        :type path: str
+        :param module_name: as given to :func:`find_python_tests`
+        :type module_name: str
+        :param class_name: as given to :func:`find_python_tests`
+        :type class_name: str
+        :param parsed_paths: the files parsed while finding the tests
+        :type parsed_paths: list of str
+        :param result: as returned by :func:`find_python_tests`
+        """
+        cache_path = self._get_cache_path(path)
+        temp = '%s.%s' % (cache_path, os.getpid())
+        try:
+            signatures = [self._get_signature(parsed_path) for parsed_path
+                          in collections.OrderedDict.fromkeys(
+                              os.path.abspath(_) for _ in parsed_paths)]
+            entries = self._load(cache_path)
+            entries[(module_name, class_name)] = (signatures, result)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp, 'wb') as cache_file:
+                pickle.dump((DISCOVERY_CACHE_VERSION, entries), cache_file,
+                            pickle.HIGHEST_PROTOCOL)
+            os.rename(temp, cache_path)
+        except (OSError, pickle.PicklingError):
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+
+
+@contextlib.contextmanager
+def discovery_cache(cache_dir):
+    """
+    Caches the tests found by :func:`find_python_tests` on this context
+
+    :param cache_dir: directory where the tests are cached, and reused
+                      from, or None to not use a cache
+    :type cache_dir: str
+    """
+    global _DISCOVERY_CACHE  # pylint: disable=W0603
+    previous = _DISCOVERY_CACHE
+    if cache_dir is None:
+        _DISCOVERY_CACHE = None
+    else:
+        _DISCOVERY_CACHE = DiscoveryCache(cache_dir)
+    try:
+        yield
+    finally:
+        _DISCOVERY_CACHE = previous
+
+
 def find_python_tests(module_name, class_name, determine_match, path):
     """
     Attempts to find Python tests from source files
@@ -521,6 +695,9 @@ def find_python_tests(module_name, class_name, determine_match, path):
     A Python test in this context is a method within a specific type
     of class (or that inherits from a specific class).
 
+    Inside a :func:`discovery_cache` context, the results are reused
+    while the files parsed to find them are unchanged.
+
     :param module_name: the name of the module from which a class should
                         have come from
     :type module_name: str
@@ -538,6 +715,30 @@ def find_python_tests(module_name, class_name, determine_match, path):
               forcefully disabled.
     :rtype: tuple
     """
+    global _PARSED_PATHS, _UNRESOLVED_MODULES  # pylint: disable=W0603
+    if _DISCOVERY_CACHE is None:
+        return _find_python_tests(module_name, class_name, determine_match,
+                                  path)
+    result = _DISCOVERY_CACHE.get(path, module_name, class_name)
+    if result is not None:
+        return result
+    _PARSED_PATHS = []
+    _UNRESOLVED_MODULES = []
+    try:
+        result = _find_python_tests(module_name, class_name, determine_match,
+                                    path)
+        parsed_paths = _PARSED_PATHS
+        unresolved_modules = _UNRESOLVED_MODULES
+    finally:
+        _PARSED_PATHS = None
+        _UNRESOLVED_MODULES = None
+    if not unresolved_modules:
+        _DISCOVERY_CACHE.set(path, module_name, class_name, parsed_paths,
+                             result)
+    return result
+
+
+def _find_python_tests(module_name, class_name, determine_match, path):
     module = PythonModule(path, module_name, class_name)
     # The resulting test classes
     result = collections.OrderedDict()
@@ -631,7 +832,7 @@ def find_python_tests(module_name, class_name, determine_match, path):
             modules_paths = [parent_path,
                              os.path.dirname(module.path)] + sys.path
             try:
-                _, found_ppath, _ = imp.find_module(parent_module, modules_paths)
+                found_ppath = _find_module(parent_module, modules_paths)
             except ImportError:
                 continue
             _info, _dis, _python_test = _examine_class(found_ppath,
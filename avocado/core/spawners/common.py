@@ -26,6 +26,9 @@ class SpawnerMixin:
 
     METHODS = []
 
+    def __init__(self, config=None):
+        self.config = config
+
     @staticmethod
     def bytes_from_file(filename):
         """Read bytes from a files in binary mode.
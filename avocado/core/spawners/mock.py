@@ -13,7 +13,7 @@ class MockSpawner(Spawner):
 
     METHODS = [SpawnMethod.PYTHON_CLASS, SpawnMethod.STANDALONE_EXECUTABLE]
 
-    def __init__(self):
+    def __init__(self, config=None):  # pylint: disable=W0613
         self._known_tasks = {}
 
     def is_task_alive(self, task):
@@ -33,6 +33,10 @@ class MockSpawner(Spawner):
         self._known_tasks[task] = True
         return True
 
+    async def terminate_task(self, task):
+        if task in self._known_tasks:
+            self._known_tasks[task] = False
+
 
 class MockRandomAliveSpawner(MockSpawner):
     """A mocking spawner that simulates randomness about tasks being alive."""
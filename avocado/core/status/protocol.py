@@ -0,0 +1,218 @@
+"""
+Binary, length-prefixed protocol for sending status messages
+
+Status messages are dictionaries which may contain bytes values (such
+as the output of the tests), and that are otherwise serializable as
+JSON.  On the JSON lines protocol, bytes are base64 encoded, which makes
+them 33% larger and costs CPU time on both ends.
+
+On this protocol, a client starts by sending a "hello", with the highest
+protocol version it supports, and the server replies with the version
+that will be used, or with 0 if none of the versions the client supports
+is also supported by the server.  Each message is then sent as a frame::
+
+  +-------------+-------------+--------+---------------+--------+-----
+  | header size | chunk count | header | chunk 1 size  | chunk 1 | ...
+  | (uint32)    | (uint32)    | (JSON) | (uint32)      | (raw)   |
+  +-------------+-------------+--------+---------------+--------+-----
+
+Where the header is the message, as JSON, with each of its (top level)
+bytes values replaced by a reference to one of the raw chunks.  All
+integers are unsigned, 32 bits and in network byte order.
+
+This module only depends on the Python standard library, so that it can
+also be used by the standalone runners.
+"""
+
+import base64
+import json
+import struct
+
+#: The first bytes of a hello.  As a JSON message can not start with a
+#: NUL byte, the server can tell the protocol being used from the first
+#: byte sent by a client
+MAGIC = b'\x00AVST'
+
+#: The latest version of the protocol
+VERSION = 1
+
+#: The hello, sent by the client, and its reply, sent by the server
+HELLO = struct.Struct('!%dsB' % len(MAGIC))
+
+#: The fixed size part of a frame: header size and number of chunks
+FRAME = struct.Struct('!II')
+
+#: The size of each chunk
+CHUNK = struct.Struct('!I')
+
+#: The key, on the header, referencing a raw chunk
+CHUNK_KEY = '__chunk__'
+
+#: The key used when (nested) bytes values are base64 encoded
+BASE64_KEY = '__base64_encoded__'
+
+#: How long (in seconds) a client waits for the server reply to a hello
+NEGOTIATION_TIMEOUT = 2.0
+
+
+class StatusProtocolError(Exception):
+    """Data received does not conform to the status protocol."""
+
+
+def encode_hello(version=VERSION):
+    """Encodes the hello sent by clients, or its reply sent by servers.
+
+    :param version: the highest version supported by the client, or the
+                    version chosen by the server
+    :type version: int
+    :rtype: bytes
+    """
+    return HELLO.pack(MAGIC, version)
+
+
+def decode_hello(data):
+    """Decodes a hello, or its reply.
+
+    :raises: :class:`StatusProtocolError` if data is not a hello
+    :returns: the version on the hello
+    :rtype: int
+    """
+    try:
+        magic, version = HELLO.unpack(data)
+    except struct.error:
+        raise StatusProtocolError(data)
+    if magic != MAGIC:
+        raise StatusProtocolError(data)
+    return version
+
+
+def choose_version(version):
+    """Chooses, on the server side, the version used with a client.
+
+    :param version: the highest version supported by the client
+    :type version: int
+    :returns: the version to be used, or 0 if there's none in common
+    :rtype: int
+    """
+    if version < 1:
+        return 0
+    return min(version, VERSION)
+
+
+def _base64_default(value):
+    if isinstance(value, bytes):
+        return {BASE64_KEY: base64.b64encode(value).decode('ascii')}
+    raise TypeError("Object of type %s is not JSON serializable"
+                    % type(value).__name__)
+
+
+def _base64_decode(dct):
+    if BASE64_KEY in dct:
+        return base64.b64decode(dct[BASE64_KEY])
+    return dct
+
+
+def encode_frame(message):
+    """Encodes a status message into a frame.
+
+    :param message: the status message
+    :type message: dict
+    :rtype: bytes
+    """
+    header = {}
+    chunks = []
+    for key, value in message.items():
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            header[key] = {CHUNK_KEY: len(chunks)}
+            chunks.append(value)
+        else:
+            header[key] = value
+    # bytes that are not top level values are rare, and still base64 encoded
+    header = json.dumps(header, default=_base64_default).encode()
+    parts = [FRAME.pack(len(header), len(chunks)), header]
+    for chunk in chunks:
+        parts.append(CHUNK.pack(len(chunk)))
+        parts.append(chunk)
+    return b''.join(parts)
+
+
+def decode_frame(header, chunks):
+    """Decodes a status message from the contents of a frame.
+
+    :param header: the header, as JSON
+    :type header: bytes
+    :param chunks: the raw chunks
+    :type chunks: list of bytes
+    :raises: :class:`StatusProtocolError` if the header is not valid
+    :rtype: dict
+    """
+    try:
+        if BASE64_KEY.encode() in header:
+            message = json.loads(header.decode(), object_hook=_base64_decode)
+        else:
+            message = json.loads(header.decode())
+    except ValueError:
+        raise StatusProtocolError(header)
+    if not isinstance(message, dict):
+        raise StatusProtocolError(header)
+    for key, value in message.items():
+        if isinstance(value, dict) and CHUNK_KEY in value:
+            try:
+                message[key] = chunks[value[CHUNK_KEY]]
+            except (IndexError, TypeError):
+                raise StatusProtocolError(header)
+    return message
+
+
+async def read_frame(reader):
+    """Reads and decodes a status message from a stream.
+
+    :param reader: the stream the frame is read from
+    :type reader: :class:`asyncio.StreamReader`
+    :raises: :class:`asyncio.IncompleteReadError` if the stream ends
+             before a complete frame is read
+    :rtype: dict
+    """
+    header_size, chunk_count = FRAME.unpack(
+        await reader.readexactly(FRAME.size))
+    header = await reader.readexactly(header_size)
+    chunks = []
+    for _ in range(chunk_count):
+        chunk_size, = CHUNK.unpack(await reader.readexactly(CHUNK.size))
+        chunks.append(await reader.readexactly(chunk_size))
+    return decode_frame(header, chunks)
+
+
+def _recv_exactly(connection, size):
+    data = bytearray()
+    while len(data) < size:
+        received = connection.recv(size - len(data))
+        if not received:
+            raise EOFError
+        data += received
+    return bytes(data)
+
+
+def negotiate(connection, version=VERSION, timeout=NEGOTIATION_TIMEOUT):
+    """Negotiates, as a client, the protocol version with a server.
+
+    :param connection: a connected (blocking) socket
+    :type connection: :class:`socket.socket`
+    :param version: the highest version supported by the client
+    :type version: int
+    :param timeout: how long to wait for the server reply
+    :type timeout: float
+    :returns: the version to be used, or 0 if the server does not support
+              this protocol (and the connection should not be used for
+              JSON lines messages anymore)
+    :rtype: int
+    """
+    previous_timeout = connection.gettimeout()
+    connection.settimeout(timeout)
+    try:
+        connection.sendall(encode_hello(version))
+        return decode_hello(_recv_exactly(connection, HELLO.size))
+    except (OSError, EOFError, StatusProtocolError):
+        return 0
+    finally:
+        connection.settimeout(previous_timeout)
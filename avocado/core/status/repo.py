@@ -1,16 +1,87 @@
-from .utils import json_loads
+import array
+import os
+import tempfile
+
+from .utils import json_dumps, json_loads
 
 
 class StatusMsgMissingDataError(Exception):
     """Status message does not contain the required data."""
 
 
+class TaskSummary:
+    """Compact summary of the status messages of a task."""
+
+    __slots__ = ('task_id', 'status', 'result', 'time_start', 'time_end',
+                 'output_dir', 'messages', 'running', '_offsets')
+
+    def __init__(self, task_id):
+        #: The task identifier
+        self.task_id = task_id
+        #: The status on the latest message ('started', 'running', etc)
+        self.status = None
+        #: The result, once the task has finished
+        self.result = None
+        #: The time on the first and latest messages (that have one)
+        self.time_start = None
+        self.time_end = None
+        #: The output directory, reported when the task started
+        self.output_dir = None
+        #: The number of messages, and of 'running' messages, received
+        self.messages = 0
+        self.running = 0
+        # the positions of this task's messages on the journal
+        self._offsets = array.array('Q')
+
+    def update(self, message, offset):
+        status = message.get('status')
+        self.status = status
+        self.messages += 1
+        if status == 'running':
+            self.running += 1
+        elif status == 'started':
+            self.output_dir = message.get('output_dir')
+        elif status == 'finished':
+            self.result = message.get('result')
+        message_time = message.get('time')
+        if message_time is not None:
+            if self.time_start is None:
+                self.time_start = message_time
+            self.time_end = message_time
+        self._offsets.append(offset)
+
+    def __repr__(self):
+        return ('<TaskSummary task_id="{}" status="{}" result="{}" '
+                'messages={}>'.format(self.task_id, self.status,
+                                      self.result, self.messages))
+
+
 class StatusRepo:
-    """Maintains tasks' status related data and provides aggregated info."""
+    """Maintains tasks' status related data and provides aggregated info.
 
-    def __init__(self):
-        self._data = {}
+    Only a compact summary of each task (a :class:`TaskSummary`) is kept
+    in memory, while the messages themselves are appended to a journal
+    file, one JSON encoded message per line, and read back from there
+    when requested.
+    """
+
+    def __init__(self, journal_path=None):
+        """
+        :param journal_path: the path of the journal file, which will be
+                             created, or appended to.  If not given, an
+                             anonymous temporary file is used.
+        :type journal_path: str
+        """
+        self._summaries = {}
         self._by_result = {}
+        self.journal_path = journal_path
+        if journal_path is None:
+            self._journal = tempfile.TemporaryFile()
+        else:
+            self._journal = open(journal_path, 'a+b')
+        self._journal.seek(0, os.SEEK_END)
+        self._journal_size = self._journal.tell()
+        self._journal_dirty = False
 
     def _handle_task_finished(self, message):
         self._set_by_result(message)
@@ -33,15 +104,78 @@ class StatusRepo:
         self._by_result[result].append(message['id'])
 
     def _set_task_data(self, message):
-        """Appends all data on message to an entry keyed by the task's ID."""
-        task_id = message.pop('id')
-        if not task_id in self._data:
-            self._data[task_id] = []
-        self._data[task_id].append(message)
+        """Appends the message to the journal, and updates the summary."""
+        task_id = message['id']
+        summary = self._summaries.get(task_id)
+        if summary is None:
+            summary = self._summaries[task_id] = TaskSummary(task_id)
+        line = json_dumps(message).encode('ascii') + b'\n'
+        summary.update(message, self._journal_size)
+        self._journal.write(line)
+        self._journal_size += len(line)
+        self._journal_dirty = True
+
+    def _read_message(self, offset):
+        if self._journal_dirty:
+            self._journal.flush()
+            self._journal_dirty = False
+        self._journal.seek(offset)
+        message = json_loads(self._journal.readline())
+        self._journal.seek(0, os.SEEK_END)
+        del message['id']
+        return message
+
+    def iter_task_data(self, task_id):
+        """Yields the messages of a given task, by its ID, from the journal.
+
+        The messages are yielded in the order they were received, and
+        without their "id".
+        """
+        summary = self._summaries.get(task_id)
+        if summary is None:
+            return
+        for offset in summary._offsets:  # pylint: disable=W0212
+            yield self._read_message(offset)
 
     def get_task_data(self, task_id):
         """Returns all data on a given task, by its ID."""
-        return self._data.get(task_id)
+        if task_id not in self._summaries:
+            return None
+        return list(self.iter_task_data(task_id))
+
+    def get_latest_task_data(self, task_id):
+        """Returns the latest message of a given task, by its ID."""
+        summary = self._summaries.get(task_id)
+        if summary is None:
+            return None
+        return self._read_message(summary._offsets[-1])  # pylint: disable=W0212
+
+    def get_task_summary(self, task_id):
+        """Returns the :class:`TaskSummary` of a given task, by its ID."""
+        return self._summaries.get(task_id)
+
+    def get_tasks_by_result(self, result):
+        """Returns the IDs of the tasks that finished with a given result."""
+        return list(self._by_result.get(result, []))
+
+    def get_tasks_by_time(self, start=None, end=None):
+        """Returns the IDs of the tasks with messages in a time range.
+
+        :param start: the start of the range, or None for no lower limit
+        :type start: float
+        :param end: the end of the range, or None for no upper limit
+        :type end: float
+        """
+        tasks = []
+        for task_id, summary in self._summaries.items():
+            if summary.time_start is None:
+                continue
+            if start is not None and summary.time_end < start:
+                continue
+            if end is not None and summary.time_start > end:
+                continue
+            tasks.append(task_id)
+        return tasks
 
     def process_message(self, message):
         if 'id' not in message:
@@ -57,3 +191,7 @@ class StatusRepo:
         raw_message = raw_message.strip()
         message = json_loads(raw_message)
         self.process_message(message)
+
+    def close(self):
+        """Closes the journal, after which no data can be processed or read."""
+        self._journal.close()
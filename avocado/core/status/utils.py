@@ -14,6 +14,24 @@ def json_base64_decode(dct):
     return dct
 
 
+def json_base64_encode(obj):
+    """base64 encode default function for custom JSON encoding."""
+    if isinstance(obj, bytes):
+        return {'__base64_encoded__': base64.b64encode(obj).decode('ascii')}
+    raise TypeError("Object of type %s is not JSON serializable"
+                    % type(obj).__name__)
+
+
+def json_dumps(data):
+    """Dumps data as JSON, with added base64 encoding of bytes.
+
+    :param data: the Python objects to be encoded
+    :returns: the JSON encoded data, made only of ASCII characters
+    :rtype: str
+    """
+    return json.dumps(data, ensure_ascii=True, default=json_base64_encode)
+
+
 def json_loads(data):
     """Loads and decodes JSON, with added base64 decoding.
 
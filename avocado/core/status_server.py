@@ -1,6 +1,11 @@
 import asyncio
 import base64
 import json
+import os
+import stat
+
+from .status import protocol
+from .status.repo import StatusMsgMissingDataError
 
 
 def json_loads(data):
@@ -15,9 +20,13 @@ def json_base64_decode(dct):
     return dct
 
 
+#: The prefix of URIs that refer to a UNIX domain socket path
+UNIX_PREFIX = 'unix:'
+
+
 class StatusServer:
 
-    def __init__(self, uri, tasks_pending=None, verbose=False):
+    def __init__(self, uri, tasks_pending=None, verbose=False, repo=None):
         self.uri = uri
         self.server_task = None
         self.result = {}
@@ -26,43 +35,109 @@ class StatusServer:
         self.tasks_pending = tasks_pending
         self.verbose = verbose
         self.wait_on_tasks_pending = len(self.tasks_pending) > 0
+        #: A :class:`avocado.core.status.repo.StatusRepo` that receives
+        #: all the messages
+        self.repo = repo
 
-    async def cb(self, reader, _):
+    @staticmethod
+    async def _read_json_lines(reader, first):
+        line = first + await reader.readline()
         while True:
-            if self.wait_on_tasks_pending:
-                if not self.tasks_pending:
-                    print('Status server: exiting due to all tasks finished')
-                    self.server_task.cancel()
-                    await self.server_task
-                    return True
-
-            message = await reader.readline()
-            message = message.strip()
+            message = line.strip()
             if message == b'bye':
-                print('Status server: exiting due to user request')
-                self.server_task.cancel()
-                await self.server_task
-                return True
+                yield None
+                return
 
             if not message:
-                return False
+                return
 
             try:
-                data = json_loads(message)
+                yield json_loads(message)
             except json.decoder.JSONDecodeError:
-                return False
+                return
+            line = await reader.readline()
+
+    @staticmethod
+    async def _read_frames(reader, writer):
+        try:
+            hello = protocol.HELLO.size - 1
+            version = protocol.decode_hello(b'\x00' +
+                                            await reader.readexactly(hello))
+        except (asyncio.IncompleteReadError, protocol.StatusProtocolError):
+            return
+        version = protocol.choose_version(version)
+        writer.write(protocol.encode_hello(version))
+        await writer.drain()
+        if not version:
+            return
+        while True:
+            try:
+                yield await protocol.read_frame(reader)
+            except (asyncio.IncompleteReadError,
+                    protocol.StatusProtocolError):
+                return
+
+    async def cb(self, reader, writer):
+        first = await reader.read(1)
+        # a JSON message can not start with a NUL byte, while a binary
+        # protocol hello always does
+        if first == b'\x00':
+            messages = self._read_frames(reader, writer)
+        else:
+            messages = self._read_json_lines(reader, first)
+
+        async for data in messages:
+            if data is None:
+                print('Status server: exiting due to user request')
+                self.server_task.cancel()
+                await self.server_task
+                return True
+
+            if self.repo is not None:
+                try:
+                    self.repo.process_message(data)
+                except StatusMsgMissingDataError as details:
+                    if self.verbose:
+                        print('Status server: message missing data: %s'
+                              % details)
 
             if data.get('status') in ['started']:
                 self.handle_task_started(data)
             elif data.get('status') in ['finished']:
                 self.handle_task_finished(data)
 
+            if self.wait_on_tasks_pending:
+                if not self.tasks_pending:
+                    print('Status server: exiting due to all tasks finished')
+                    self.server_task.cancel()
+                    await self.server_task
+                    return True
+        return False
+
+    @staticmethod
+    def _remove_socket_file(path):
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+
     async def create_server_task(self):
-        host, port = self.uri.split(':')
-        port = int(port)
-        server = await asyncio.start_server(self.cb, host=host, port=port)
-        print("Status server started at:", self.uri)
-        await server.wait_closed()
+        path = None
+        if self.uri.startswith(UNIX_PREFIX):
+            path = self.uri[len(UNIX_PREFIX):]
+            # a socket file left behind by a previous server
+            self._remove_socket_file(path)
+            server = await asyncio.start_unix_server(self.cb, path=path)
+        else:
+            host, port = self.uri.rsplit(':', 1)
+            port = int(port)
+            server = await asyncio.start_server(self.cb, host=host, port=port)
+        if self.verbose:
+            print("Status server started at:", self.uri)
+        try:
+            await server.wait_closed()
+        finally:
+            server.close()
+            if path is not None:
+                self._remove_socket_file(path)
 
     def handle_task_started(self, data):
         if self.verbose:
@@ -77,6 +152,9 @@ class StatusServer:
         task_id = data['id']
 
         if self.wait_on_tasks_pending:
+            if task_id not in self.tasks_pending:
+                # a message sent again after a client reconnected
+                return
             self.tasks_pending.remove(task_id)
 
         if result not in self.result:
@@ -100,6 +178,11 @@ class StatusServer:
         loop = asyncio.get_event_loop()
         self.server_task = loop.create_task(self.create_server_task())
 
+    def close(self):
+        """Stops the server, if it's still running."""
+        if self.server_task is not None and not self.server_task.done():
+            self.server_task.cancel()
+
     async def wait(self):
         while not self.server_task.done():
             await asyncio.sleep(0.1)
@@ -1,6 +1,9 @@
+import os
+from collections.abc import Sequence
 from enum import Enum
 from uuid import uuid4
 
+from . import data_dir, safeloader, tracing
 from .dispatcher import RunnerDispatcher
 from .exceptions import (JobTestSuiteReferenceResolutionError,
                          OptionValidationError)
@@ -25,6 +28,73 @@ class TestSuiteStatus(Enum):
     UNKNOWN = object()
 
 
+class TestMatrix(Sequence):
+    """
+    The tests of a suite combined with each one of its variants
+
+    The combinations are not enumerated up front: their number is given
+    by the number of tests and of variants, and each one, a tuple with
+    the test template and the variant, is only produced when accessed,
+    by its index or while iterating, in the given execution order.  The
+    variants are produced by the varianter as they're needed, and only
+    gathered (once) on the first access by index when the varianter has
+    no random access to them.
+    """
+
+    #: The supported orders of the combinations
+    EXECUTION_ORDERS = ("variants-per-test", "tests-per-variant")
+
+    def __init__(self, tests, variants, execution_order="variants-per-test"):
+        """
+        :param tests: the test templates
+        :type tests: list
+        :param variants: the variants the tests are combined with
+        :type variants: :class:`avocado.core.varianter.Varianter`
+        :param execution_order: one of :attr:`EXECUTION_ORDERS`
+        :type execution_order: str
+        """
+        if execution_order not in self.EXECUTION_ORDERS:
+            raise NotImplementedError("Suite_order %s is not supported"
+                                      % execution_order)
+        self.tests = tests
+        self.execution_order = execution_order
+        self._varianter = variants
+        self._variants = None
+
+    def _get_variant(self, index):
+        if self._variants is None:
+            try:
+                return self._varianter.get_variant(index)
+            except NotImplementedError:
+                self._variants = list(self._varianter.itertests())
+        return self._variants[index]
+
+    def __len__(self):
+        return self._varianter.get_number_of_tests(self.tests)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("test matrix index out of range")
+        if self.execution_order == "variants-per-test":
+            test, variant = divmod(index, len(self) // len(self.tests))
+        else:
+            variant, test = divmod(index, len(self.tests))
+        return self.tests[test], self._get_variant(variant)
+
+    def __iter__(self):
+        if self.execution_order == "variants-per-test":
+            return ((test, variant)
+                    for test in self.tests
+                    for variant in self._varianter.itertests())
+        return ((test, variant)
+                for variant in self._varianter.itertests()
+                for test in self.tests)
+
+
 class TestSuite:
     def __init__(self, name, config, tests=None, job_config=None,
                  resolutions=None):
@@ -61,6 +131,13 @@ class TestSuite:
         for i in range(self.size):
             self.tests[i] = [DryRunTest, self.tests[i][1]]
 
+    @staticmethod
+    def _get_discovery_cache_dir(config):
+        subcommand = config.get('subcommand')
+        if not config.get('{}.discovery_cache'.format(subcommand)):
+            return None
+        return os.path.join(data_dir.get_cache_dirs()[0], 'discovery')
+
     @classmethod
     def _from_config_with_loader(cls, config, name=None):
         references = config.get('run.references')
@@ -221,6 +298,18 @@ class TestSuite:
                                                         [])}
         return self._test_parameters
 
+    def get_matrix(self, execution_order=None):
+        """Returns the tests of this suite combined with its variants.
+
+        :param execution_order: the order of the combinations, by default
+                                the one on "run.execution_order"
+        :type execution_order: str
+        :rtype: :class:`TestMatrix`
+        """
+        if execution_order is None:
+            execution_order = self.config.get('run.execution_order')
+        return TestMatrix(self.tests or [], self.variants, execution_order)
+
     @property
     def variants(self):
         if self._variants is None:
@@ -267,10 +356,13 @@ class TestSuite:
         if job_config:
             config.update(job_config)
         runner = config.get('run.test_runner') or 'runner'
-        if runner == 'nrunner':
-            suite = cls._from_config_with_resolver(config, name)
-        else:
-            suite = cls._from_config_with_loader(config, name)
+        cache_dir = cls._get_discovery_cache_dir(config)
+        with tracing.span('create_test_suite', 'job', suite=str(name)), \
+                safeloader.discovery_cache(cache_dir):
+            if runner == 'nrunner':
+                suite = cls._from_config_with_resolver(config, name)
+            else:
+                suite = cls._from_config_with_loader(config, name)
 
         if not config.get('run.ignore_missing_references'):
             if not suite.tests:
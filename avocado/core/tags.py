@@ -61,27 +61,116 @@ def _must_split_flat_key_val(must):
     return flat, key_val
 
 
-def _must_key_val_matches(must_key_vals, test_tags, include_empty_key):
+class TagFilter:
     """
-    Checks if the required key:vals are fulfilled by the test_tags
-
-    :rtype: bool
+    A compiled version of the filters given to "-t/--filter-by-tags"
+
+    The filters are parsed only once, into, for each tag set, the flat
+    tags that must be present, the key:val tags, indexed by key, that
+    must be present and the tags that must not be present.  Matching a
+    test then only requires membership checks on its tags, and a whole
+    suite can be filtered at once with :meth:`filter` or
+    :meth:`filter_runnables`.
     """
-    key_val_test_tags = {}
-    for k, v in test_tags.items():
-        if v is None:
-            continue
-        key_val_test_tags[k] = v
-
-    for k, v in must_key_vals.items():
-        if k not in test_tags:
-            if include_empty_key:
-                continue
-            else:
+
+    def __init__(self, filter_by_tags, include_empty=False,
+                 include_empty_key=False):
+        """
+        :param filter_by_tags: the list of tag sets to use as filters
+        :type filter_by_tags: list of comma separated tags (['foo,bar', 'fast'])
+        :param include_empty: if true tests without tags will not be
+                              filtered out
+        :type include_empty: bool
+        :param include_empty_key: if true tests "keys" on key:val tags will
+                                  be included in the filtered results
+        :type include_empty_key: bool
+        """
+        self.include_empty = include_empty
+        self.include_empty_key = include_empty_key
+        self._tag_sets = []
+        for must, must_not in _parse_filter_by_tags(filter_by_tags):
+            must_flat, must_key_val = _must_split_flat_key_val(must)
+            self._tag_sets.append((frozenset(must_flat),
+                                   tuple(must_key_val.items()),
+                                   frozenset(must_not)))
+
+    def _key_vals_match(self, must_key_val, test_tags):
+        for key, val in must_key_val:
+            if key not in test_tags:
+                if self.include_empty_key:
+                    continue
+                return False
+            vals = test_tags[key]
+            if vals is None or val not in vals:
                 return False
-        if v not in key_val_test_tags.get(k, set()):
-            return False
-    return True
+        return True
+
+    def match(self, test_tags):
+        """
+        Checks if the given tags fulfill any of the tag sets
+
+        :param test_tags: the tags of a test, that is, the flat tags, and
+                          the keys of the key:val tags, mapped to None or
+                          to their set of values
+        :type test_tags: dict
+        :rtype: bool
+        """
+        for must_flat, must_key_val, must_not in self._tag_sets:
+            if not must_not.isdisjoint(test_tags):
+                continue
+            if must_key_val and not self._key_vals_match(must_key_val,
+                                                         test_tags):
+                continue
+            if not all(tag in test_tags for tag in must_flat):
+                continue
+            return True
+        return False
+
+    def filter(self, test_suite):
+        """
+        Filters a test suite, as given by the loader, based on tags
+
+        Tests without tags are only kept when including empty ones.
+
+        :param test_suite: the unfiltered test suite
+        :type test_suite: list of (test class, test parameters) tuples
+        :returns: the filtered test suite
+        :rtype: list
+        """
+        filtered = []
+        for test in test_suite:
+            test_tags = test[1].get('tags')
+            if test_tags:
+                if self.match(test_tags):
+                    filtered.append(test)
+            elif self.include_empty:
+                filtered.append(test)
+        return filtered
+
+    def match_runnable(self, runnable):
+        """
+        Checks if the tags of a runnable fulfill any of the tag sets
+
+        :param runnable: the runnable whose tags are checked
+        :type runnable: :class:`avocado.core.nrunner.Runnable`
+        :rtype: bool
+        """
+        runnable_tags = runnable.tags or {}
+        if not runnable_tags and self.include_empty:
+            return True
+        return self.match(runnable_tags)
+
+    def filter_runnables(self, runnables):
+        """
+        Filters runnables based on tags
+
+        :param runnables: the unfiltered runnables
+        :type runnables: list of :class:`avocado.core.nrunner.Runnable`
+        :returns: the filtered runnables
+        :rtype: list
+        """
+        return [runnable for runnable in runnables
+                if self.match_runnable(runnable)]
 
 
 def filter_test_tags(test_suite, filter_by_tags, include_empty=False,
@@ -104,35 +193,8 @@ def filter_test_tags(test_suite, filter_by_tags, include_empty=False,
                               included in the filtered results
     :type include_empty_key: bool
     """
-    filtered = []
-    must_must_nots = _parse_filter_by_tags(filter_by_tags)
-
-    for klass, info in test_suite:
-        test_tags = info.get('tags', {})
-        if not test_tags:
-            if include_empty:
-                filtered.append((klass, info))
-            continue
-
-        for must, must_not in must_must_nots:
-            if must_not.intersection(test_tags):
-                continue
-
-            must_flat, must_key_val = _must_split_flat_key_val(must)
-            if must_key_val:
-                if not _must_key_val_matches(must_key_val,
-                                             test_tags,
-                                             include_empty_key):
-                    continue
-
-            if must_flat:
-                if not must_flat.issubset(test_tags):
-                    continue
-
-            filtered.append((klass, info))
-            break
-
-    return filtered
+    return TagFilter(filter_by_tags, include_empty,
+                     include_empty_key).filter(test_suite)
 
 
 def filter_test_tags_runnable(runnable, filter_by_tags, include_empty=False,
@@ -145,6 +207,9 @@ def filter_test_tags_runnable(runnable, filter_by_tags, include_empty=False,
     not populate the test tags, it will be considered to have empty
     tags.
 
+    When filtering many runnables, prefer a single :class:`TagFilter`,
+    as the filters are then parsed only once.
+
     :param test_suite: the unfiltered test suite
     :type test_suite: dict
     :param filter_by_tags: the list of tag sets to use as filters
@@ -155,28 +220,5 @@ def filter_test_tags_runnable(runnable, filter_by_tags, include_empty=False,
                               included in the filtered results
     :type include_empty_key: bool
     """
-    must_must_nots = _parse_filter_by_tags(filter_by_tags)
-    runnable_tags = runnable.tags or {}
-
-    if not runnable_tags:
-        if include_empty:
-            return True
-
-    for must, must_not in must_must_nots:
-        if must_not.intersection(runnable_tags):
-            continue
-
-        must_flat, must_key_val = _must_split_flat_key_val(must)
-        if must_key_val:
-            if not _must_key_val_matches(must_key_val,
-                                         runnable_tags,
-                                         include_empty_key):
-                continue
-
-        if must_flat:
-            if not must_flat.issubset(runnable_tags):
-                continue
-
-        return True
-
-    return False
+    return TagFilter(filter_by_tags, include_empty,
+                     include_empty_key).match_runnable(runnable)
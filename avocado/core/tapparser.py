@@ -35,8 +35,24 @@ class TapParser:
     _RE_YAML_START = re.compile(r'(\s+)---.*')
     _RE_YAML_END = re.compile(r'\s+\.\.\.\s*')
 
-    def __init__(self, tap_io):
+    def __init__(self, tap_io=None, encoding='utf-8'):
+        """
+        :param tap_io: an iterable of lines (either text or bytes) of TAP
+                       output, used by :meth:`parse`.  It's not needed if
+                       lines are given one by one to :meth:`parse_line`
+        :param encoding: the encoding used to decode lines given as bytes
+        """
         self.tap_io = tap_io
+        self.encoding = encoding
+        self._found_late_test = False
+        self._bailed_out = False
+        self._plan = None
+        self._lineno = 0
+        self._num_tests = 0
+        self._yaml_lineno = 0
+        self._yaml_indent = ''
+        self._state = self._MAIN
+        self._version = 12
 
     def parse_test(self, ok, num, name, directive, explanation):
         name = name.strip()
@@ -58,110 +74,128 @@ class TapParser:
         yield self.Test(num, name, result, explanation)
 
     def parse(self):
-        found_late_test = False
-        bailed_out = False
-        plan = None
-        lineno = 0
-        num_tests = 0
-        yaml_lineno = 0
-        yaml_indent = ''
-        state = self._MAIN
-        version = 12
-        while True:
-            lineno += 1
-            try:
-                line = next(self.tap_io).rstrip()
-            except StopIteration:
-                break
-
-            # YAML blocks are only accepted after a test
-            if state == self._AFTER_TEST:
-                if version >= 13:
-                    m = self._RE_YAML_START.match(line)
-                    if m:
-                        state = self._YAML
-                        yaml_lineno = lineno
-                        yaml_indent = m.group(1)
-                        continue
-                state = self._MAIN
-
-            elif state == self._YAML:
-                if self._RE_YAML_END.match(line):
-                    state = self._MAIN
-                    continue
-                if line.startswith(yaml_indent):
-                    continue
-                yield self.Error('YAML block not terminated (started on line %d)' % (yaml_lineno,))
-                state = self._MAIN
-
-            assert state == self._MAIN
-            if line.startswith('#'):
-                continue
-
-            m = self._RE_TEST.match(line)
-            if m:
-                if plan and plan.late and not found_late_test:
-                    yield self.Error('unexpected test after late plan')
-                    found_late_test = True
-                num_tests += 1
-                num = num_tests if m.group(2) is None else int(m.group(2))
-                if num != num_tests:
-                    yield self.Error('out of order test numbers')
-                yield from self.parse_test(m.group(1) == 'ok', num,
-                                           m.group(3), m.group(4), m.group(5))
-                state = self._AFTER_TEST
-                continue
-
-            m = self._RE_PLAN.match(line)
-            if m:
-                if plan:
-                    yield self.Error('more than one plan found')
-                else:
-                    count = int(m.group(1))
-                    skipped = (count == 0)
-                    if m.group(2):
-                        if m.group(2).upper().startswith('SKIP'):
-                            if count > 0:
-                                yield self.Error('invalid SKIP directive for plan')
-                            skipped = True
-                        else:
-                            yield self.Error('invalid directive for plan')
-                    plan = self.Plan(count=count, late=(num_tests > 0),
-                                     skipped=skipped, explanation=m.group(3))
-                    yield plan
-                continue
-
-            m = self._RE_BAILOUT.match(line)
-            if m:
-                yield self.Bailout(m.group(1))
-                bailed_out = True
-                continue
-
-            m = self._RE_VERSION.match(line)
-            if m:
-                # The TAP version is only accepted as the first line
-                if lineno != 1:
-                    yield self.Error('version number must be on the first line')
-                    continue
-                version = int(m.group(1))
-                if version < 13:
-                    yield self.Error('version number should be at least 13')
-                else:
-                    yield self.Version(version=version)
-                continue
-
-            if line == '':
-                continue
-
-            yield self.Error('unexpected input at line %d' % (lineno,))
-
-        if state == self._YAML:
-            yield self.Error('YAML block not terminated (started on line %d)' % (yaml_lineno,))
-
-        if not bailed_out and plan and num_tests != plan.count:
-            if num_tests < plan.count:
+        """
+        Parses all the lines in :attr:`tap_io`, yielding the events found
+        """
+        for line in self.tap_io:
+            yield from self.parse_line(line)
+        yield from self.parse_end()
+
+    def parse_line(self, line):
+        """
+        Parses a single line of TAP output, yielding the events found
+
+        This allows the output of a running process to be parsed
+        incrementally, with the events available as soon as each line
+        is produced.  :meth:`parse_end` should be called after the last
+        line.
+
+        :param line: a line of TAP output
+        :type line: str or bytes
+        """
+        if isinstance(line, bytes):
+            line = line.decode(self.encoding, 'replace')
+        line = line.rstrip()
+        self._lineno += 1
+
+        # YAML blocks are only accepted after a test
+        if self._state == self._AFTER_TEST:
+            if self._version >= 13:
+                m = self._RE_YAML_START.match(line)
+                if m:
+                    self._state = self._YAML
+                    self._yaml_lineno = self._lineno
+                    self._yaml_indent = m.group(1)
+                    return
+            self._state = self._MAIN
+
+        elif self._state == self._YAML:
+            if self._RE_YAML_END.match(line):
+                self._state = self._MAIN
+                return
+            if line.startswith(self._yaml_indent):
+                return
+            yield self.Error('YAML block not terminated (started on line %d)' % (self._yaml_lineno,))
+            self._state = self._MAIN
+
+        assert self._state == self._MAIN
+        if line.startswith('#'):
+            return
+
+        m = self._RE_TEST.match(line)
+        if m:
+            if self._plan and self._plan.late and not self._found_late_test:
+                yield self.Error('unexpected test after late plan')
+                self._found_late_test = True
+            self._num_tests += 1
+            num = self._num_tests if m.group(2) is None else int(m.group(2))
+            if num != self._num_tests:
+                yield self.Error('out of order test numbers')
+            yield from self.parse_test(m.group(1) == 'ok', num,
+                                       m.group(3), m.group(4), m.group(5))
+            self._state = self._AFTER_TEST
+            return
+
+        m = self._RE_PLAN.match(line)
+        if m:
+            if self._plan:
+                yield self.Error('more than one plan found')
+            else:
+                count = int(m.group(1))
+                skipped = (count == 0)
+                if m.group(2):
+                    if m.group(2).upper().startswith('SKIP'):
+                        if count > 0:
+                            yield self.Error('invalid SKIP directive for plan')
+                        skipped = True
+                    else:
+                        yield self.Error('invalid directive for plan')
+                self._plan = self.Plan(count=count,
+                                       late=(self._num_tests > 0),
+                                       skipped=skipped,
+                                       explanation=m.group(3))
+                yield self._plan
+            return
+
+        m = self._RE_BAILOUT.match(line)
+        if m:
+            yield self.Bailout(m.group(1))
+            self._bailed_out = True
+            return
+
+        m = self._RE_VERSION.match(line)
+        if m:
+            # The TAP version is only accepted as the first line
+            if self._lineno != 1:
+                yield self.Error('version number must be on the first line')
+                return
+            self._version = int(m.group(1))
+            if self._version < 13:
+                yield self.Error('version number should be at least 13')
+            else:
+                yield self.Version(version=self._version)
+            return
+
+        if line == '':
+            return
+
+        yield self.Error('unexpected input at line %d' % (self._lineno,))
+
+    def parse_end(self):
+        """
+        Finishes the parsing, yielding the events only known at the end
+
+        Those are errors such as an unterminated YAML block, or a number
+        of tests that doesn't match the plan.
+        """
+        if self._state == self._YAML:
+            yield self.Error('YAML block not terminated (started on line %d)' % (self._yaml_lineno,))
+
+        if (not self._bailed_out and self._plan and
+                self._num_tests != self._plan.count):
+            if self._num_tests < self._plan.count:
                 yield self.Error('Too few tests run (expected %d, got %d)'
-                                 % (plan.count, num_tests))
+                                 % (self._plan.count, self._num_tests))
             else:
                 yield self.Error('Too many tests run (expected %d, got %d)'
-                                 % (plan.count, num_tests))
+                                 % (self._plan.count, self._num_tests))
@@ -0,0 +1,32 @@
+class RuntimeTask:
+    """Task with extra status information on its life cycle status.
+
+    The :class:`avocado.core.nrunner.Task` class contains information
+    that is necessary to describe its persistence and execution by
+    itself.  This class wraps a task, with information that is only
+    relevant at run time, such as the result of its spawning, or the
+    deadline for its execution.
+    """
+
+    def __init__(self, task):
+        #: The :class:`avocado.core.nrunner.Task`
+        self.task = task
+        #: Additional descriptive information about the task status,
+        #: set when a task does not complete normally (such as when it
+        #: fails to be started or times out)
+        self.status = None
+        #: Monotonic time (:func:`time.monotonic`) by which the task
+        #: should have finished, or None for no execution timeout
+        self.execution_timeout = None
+        #: Monotonic time on which the task was found to be no longer
+        #: alive, while its final status message was not yet received
+        self.exited = None
+        #: Time (:func:`time.time`) on which the task was spawned, which
+        #: does not depend on the status messages of the task
+        self.spawned = None
+
+    def __repr__(self):
+        if self.status is None:
+            return '<RuntimeTask identifier="%s">' % self.task.identifier
+        return '<RuntimeTask identifier="%s" status="%s">' % (
+            self.task.identifier, self.status)
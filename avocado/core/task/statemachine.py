@@ -0,0 +1,285 @@
+"""
+The life cycle of the tasks run by the nrunner based job runner
+
+A task goes through the following phases, each one represented by a
+list (of :class:`avocado.core.task.runtime.RuntimeTask`) on the
+:class:`TaskStateMachine`::
+
+  requested -> triaging -> ready -> spawning -> started -> finished
+
+A task may also move straight into finished, from triaging (when its
+requirements are not available), from spawning (when it fails to be
+spawned) or from any phase before started, when the job deadline is
+reached.
+
+Tasks are pushed forward by one or more :class:`Worker`, which share
+the same state machine, and that run concurrently on an asyncio loop.
+The completion of a started task is driven by the status messages it
+sends to the status server, which are kept on a
+:class:`avocado.core.status.repo.StatusRepo`.
+"""
+
+import asyncio
+import itertools
+import time
+
+from ...core.output import LOG_JOB
+from ...utils.astring import tabular_output
+
+#: How long (in seconds) a worker sleeps when there's nothing for it to do
+WORKER_IDLE_INTERVAL = 0.05
+
+#: How long (in seconds) to wait for the final status message of a task
+#: that is no longer alive, as it may still be on its way
+TASK_EXIT_STATUS_TIMEOUT = 2.0
+
+#: The task requirements are not available
+FAILED_ON_TRIAGE = 'FAILED ON TRIAGE'
+#: The task could not be spawned
+FAILED_ON_START = 'FAILED ON START'
+#: The task did not finish within its timeout, and was terminated
+FAILED_WITH_TIMEOUT = 'FAILED W/ TIMEOUT'
+#: The task is no longer alive, but has not sent a final status
+FAILED_WITHOUT_STATUS = 'FAILED W/O STATUS'
+#: The job deadline was reached before the task was started
+NOT_STARTED = 'NOT STARTED'
+
+
+class TaskStateMachine:
+    """Represents all phases that a task can go through its life."""
+
+    def __init__(self, tasks, status_repo, on_finished=None):
+        """
+        :param tasks: the tasks to be run
+        :type tasks: list of :class:`avocado.core.task.runtime.RuntimeTask`
+        :param status_repo: the repository of status messages, where
+                            the final status of a started task is
+                            looked up
+        :type status_repo: :class:`avocado.core.status.repo.StatusRepo`
+        :param on_finished: a function called with each task, once it
+                            is moved into finished
+        """
+        self._requested = list(tasks)
+        self._triaging = []
+        self._ready = []
+        self._spawning = []
+        self._started = []
+        self._finished = []
+        self._status_repo = status_repo
+        self._on_finished = on_finished
+        self._lock = asyncio.Lock()
+
+    @property
+    def requested(self):
+        return self._requested
+
+    @property
+    def triaging(self):
+        return self._triaging
+
+    @property
+    def ready(self):
+        return self._ready
+
+    @property
+    def spawning(self):
+        return self._spawning
+
+    @property
+    def started(self):
+        return self._started
+
+    @property
+    def finished(self):
+        return self._finished
+
+    @property
+    def status_repo(self):
+        return self._status_repo
+
+    @property
+    def lock(self):
+        return self._lock
+
+    @property
+    async def complete(self):
+        async with self._lock:
+            pending = any([self._requested, self._triaging, self._ready,
+                           self._spawning, self._started])
+        return not pending
+
+    def finish_task(self, runtime_task, status=None):
+        """Moves a task into finished.
+
+        Must be called with the lock held, after the task has been
+        removed from the phase it was in.
+
+        :param status: the reason why the task did not complete normally
+        :type status: str
+        """
+        runtime_task.status = status
+        self._finished.append(runtime_task)
+        LOG_JOB.debug('Task "%s" finished%s', runtime_task.task.identifier,
+                      '' if status is None else ' (%s)' % status)
+        if self._on_finished is not None:
+            self._on_finished(runtime_task)
+
+    def __str__(self):
+        headers = ("|_REQUESTED_|", "|_TRIAGING__|",
+                   "|___READY___|", "|_SPAWNING__|", "|__STARTED__|",
+                   "|______FINISHED_______|")
+        data = itertools.zip_longest(self._requested, self._triaging,
+                                     self._ready, self._spawning,
+                                     self._started, self._finished,
+                                     fillvalue="")
+        matrix = [_ for _ in data]
+        return tabular_output(matrix, headers)
+
+
+class Worker:
+    """Pushes tasks forward on their life cycle."""
+
+    def __init__(self, state_machine, spawner, max_running=1,
+                 task_timeout=None, job_deadline=None):
+        """
+        :param state_machine: the state machine shared by all workers
+        :type state_machine: :class:`TaskStateMachine`
+        :param spawner: the spawner used to start the tasks
+        :type spawner: :class:`avocado.core.plugin_interfaces.Spawner`
+        :param max_running: the maximum number of tasks started (and
+                            being spawned) at the same time, across all
+                            the workers
+        :type max_running: int
+        :param task_timeout: the maximum time (in seconds) a task is
+                             allowed to run for, or None for no limit
+        :type task_timeout: float
+        :param job_deadline: the :func:`time.monotonic` time after which
+                             no task is started, and the started ones
+                             are terminated, or None for no deadline
+        :type job_deadline: float
+        """
+        self._state_machine = state_machine
+        self._spawner = spawner
+        self._max_running = max_running
+        self._task_timeout = task_timeout
+        self._job_deadline = job_deadline
+
+    def _deadline_reached(self):
+        return (self._job_deadline is not None and
+                time.monotonic() > self._job_deadline)
+
+    async def bootstrap(self):
+        """Reads from requested, moves into triaging."""
+        async with self._state_machine.lock:
+            try:
+                runtime_task = self._state_machine.requested.pop(0)
+            except IndexError:
+                return False
+            self._state_machine.triaging.append(runtime_task)
+        return True
+
+    async def triage(self):
+        """Reads from triaging, moves into either: ready or finished."""
+        async with self._state_machine.lock:
+            try:
+                runtime_task = self._state_machine.triaging.pop(0)
+            except IndexError:
+                return False
+            if runtime_task.task.are_requirements_available():
+                self._state_machine.ready.append(runtime_task)
+            else:
+                self._state_machine.finish_task(runtime_task,
+                                                FAILED_ON_TRIAGE)
+        return True
+
+    async def start(self):
+        """Reads from ready, moves into either: started or finished."""
+        async with self._state_machine.lock:
+            if not self._state_machine.ready:
+                return False
+            # a global limit, that also accounts for the tasks being spawned
+            if (len(self._state_machine.spawning) +
+                    len(self._state_machine.started)) >= self._max_running:
+                return False
+            runtime_task = self._state_machine.ready.pop(0)
+            self._state_machine.spawning.append(runtime_task)
+
+        spawned = await self._spawner.spawn_task(runtime_task.task)
+
+        async with self._state_machine.lock:
+            self._state_machine.spawning.remove(runtime_task)
+            if not spawned:
+                self._state_machine.finish_task(runtime_task,
+                                                FAILED_ON_START)
+                return True
+            runtime_task.spawned = time.time()
+            timeouts = []
+            if self._task_timeout:
+                timeouts.append(time.monotonic() + self._task_timeout)
+            if self._job_deadline is not None:
+                timeouts.append(self._job_deadline)
+            if timeouts:
+                runtime_task.execution_timeout = min(timeouts)
+            self._state_machine.started.append(runtime_task)
+            LOG_JOB.debug('Task "%s" started', runtime_task.task.identifier)
+        return True
+
+    async def monitor(self):
+        """Reads from started, moves finished tasks into finished."""
+        async with self._state_machine.lock:
+            started = list(self._state_machine.started)
+        progress = False
+        for runtime_task in started:
+            task = runtime_task.task
+            status = None
+            summary = self._state_machine.status_repo.get_task_summary(
+                task.identifier)
+            if summary is not None and summary.status == 'finished':
+                pass
+            elif (runtime_task.execution_timeout is not None and
+                  time.monotonic() > runtime_task.execution_timeout):
+                await self._spawner.terminate_task(task)
+                status = FAILED_WITH_TIMEOUT
+            elif self._spawner.is_task_alive(task):
+                continue
+            elif runtime_task.exited is None:
+                runtime_task.exited = time.monotonic()
+                continue
+            elif (time.monotonic() - runtime_task.exited <
+                  TASK_EXIT_STATUS_TIMEOUT):
+                continue
+            else:
+                status = FAILED_WITHOUT_STATUS
+
+            async with self._state_machine.lock:
+                # another worker may have moved it already
+                if runtime_task not in self._state_machine.started:
+                    continue
+                self._state_machine.started.remove(runtime_task)
+                self._state_machine.finish_task(runtime_task, status)
+            progress = True
+        return progress
+
+    async def abort(self):
+        """Moves all tasks not yet started into finished."""
+        async with self._state_machine.lock:
+            for phase in (self._state_machine.requested,
+                          self._state_machine.triaging,
+                          self._state_machine.ready):
+                while phase:
+                    self._state_machine.finish_task(phase.pop(0),
+                                                    NOT_STARTED)
+
+    async def run(self):
+        """Pushes tasks forward, until all of them are finished."""
+        while not await self._state_machine.complete:
+            if self._deadline_reached():
+                await self.abort()
+                progress = await self.monitor()
+            else:
+                progress = await self.bootstrap()
+                progress |= await self.triage()
+                progress |= await self.start()
+                progress |= await self.monitor()
+            if not progress:
+                await asyncio.sleep(WORKER_IDLE_INTERVAL)
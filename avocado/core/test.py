@@ -19,14 +19,16 @@ framework tests.
 """
 
 import inspect
-import io
 import logging
 import os
 import pipes
 import re
+import shlex
 import shutil
+import subprocess
 import sys
 import tempfile
+import threading
 import time
 import unittest
 from difflib import unified_diff
@@ -34,7 +36,8 @@ from difflib import unified_diff
 from ..utils import asset, astring, data_structures, genio
 from ..utils import path as utils_path
 from ..utils import process, stacktrace
-from . import data_dir, exceptions, output, parameters, sysinfo, tapparser
+from . import (data_dir, exceptions, output, parameters, resource_usage,
+               sysinfo, tapparser, tracing)
 from .decorators import skip
 from .output import LOG_JOB
 from .settings import settings
@@ -51,6 +54,7 @@ COMMON_TMPDIR_NAME = 'AVOCADO_TESTS_COMMON_TMPDIR'
 TEST_STATE_ATTRIBUTES = ('name', 'logdir', 'logfile',
                          'status', 'running', 'paused',
                          'time_start', 'time_elapsed', 'time_end',
+                         'time_import', 'resource_usage',
                          'fail_reason', 'fail_class', 'traceback',
                          'timeout', 'whiteboard', 'phase')
 
@@ -224,6 +228,15 @@ class Test(unittest.TestCase, TestData):
     #: duration of the test execution (always recalculated from time_end -
     #: time_start
     time_elapsed = -1
+    #: time spent importing the test module in the test process (it's
+    #: close to zero when the module was preloaded by the job process)
+    time_import = -1
+    #: resources (CPU, memory, I/O) used by the test process, and the
+    #: processes it waited for, between the test start and end, as given
+    #: by :meth:`avocado.core.resource_usage.ResourceUsageTracker.stop`.
+    #: As the test process is forked from the job process, its peak RSS
+    #: ("max_rss") includes the memory it inherited from the job process
+    resource_usage = None
     #: Test timeout (the timeout from params takes precedence)
     timeout = None
 
@@ -320,6 +333,7 @@ class Test(unittest.TestCase, TestData):
         self.__cache_dirs = None    # Is initialized lazily
 
         self.__running = False
+        self.__resource_usage_tracker = None
         self.paused = False
         self.paused_msg = ''
 
@@ -529,11 +543,15 @@ class Test(unittest.TestCase, TestData):
     def _tag_start(self):
         self.log.info('START %s', self.name)
         self.__running = True
+        self.__resource_usage_tracker = resource_usage.ResourceUsageTracker()
+        self.__resource_usage_tracker.start()
         self.time_start = time.time()
 
     def _tag_end(self):
         self.__running = False
         self.time_end = time.time()
+        if self.__resource_usage_tracker is not None:
+            self.resource_usage = self.__resource_usage_tracker.stop()
         # for consistency sake, always use the same stupid method
         self._update_time_elapsed(self.time_end)
 
@@ -744,7 +762,8 @@ class Test(unittest.TestCase, TestData):
         try:
             if skip_test is False:
                 self.__phase = 'SETUP'
-                self.setUp()
+                with tracing.span('setUp', 'test_phase'):
+                    self.setUp()
         except exceptions.TestSkipError as details:
             skip_test = True
             stacktrace.log_exc_info(sys.exc_info(), logger=LOG_JOB)
@@ -759,7 +778,8 @@ class Test(unittest.TestCase, TestData):
         else:
             try:
                 self.__phase = 'TEST'
-                testMethod()
+                with tracing.span(self._testMethodName, 'test_phase'):
+                    testMethod()
             except exceptions.TestCancel as details:
                 stacktrace.log_exc_info(sys.exc_info(), logger=LOG_JOB)
                 raise
@@ -777,7 +797,8 @@ class Test(unittest.TestCase, TestData):
             try:
                 if skip_test is False:
                     self.__phase = 'TEARDOWN'
-                    self.tearDown()
+                    with tracing.span('tearDown', 'test_phase'):
+                        self.tearDown()
             except exceptions.TestSkipError as details:
                 stacktrace.log_exc_info(sys.exc_info(), logger=LOG_JOB)
                 skip_illegal_msg = ('Using skip decorators in tearDown() '
@@ -1218,12 +1239,16 @@ class PythonUnittest(ExternalRunnerTest):
     """
     def __init__(self, name, params=None, base_logdir=None, job=None,
                  test_dir=None, python_unittest_module=None,
-                 tags=None):    # pylint: disable=W0613
+                 tags=None, unittest_worker=None):    # pylint: disable=W0613
         runner = "%s -m unittest -q -c" % sys.executable
         external_runner = ExternalRunnerSpec(runner, "test", test_dir)
         super(PythonUnittest, self).__init__(name, params, base_logdir, job,
                                              external_runner=external_runner,
                                              external_runner_argument=python_unittest_module)
+        self._unittest_name = python_unittest_module or self.name.name
+        #: an optional :class:`avocado.core.unittest_worker.UnittestWorker`
+        #: that runs the unittest, instead of a new Python interpreter
+        self.unittest_worker = unittest_worker
 
     def _find_result(self, status="OK"):
         status_line = "[stderr] %s" % status
@@ -1237,7 +1262,26 @@ class PythonUnittest(ExternalRunnerTest):
                     return line
         self.error("Fail to parse status from test result.")
 
+    def _test_in_worker(self):
+        self.log.info('Running test with the unittest worker for module '
+                      '"%s"', self.unittest_worker.module)
+        outcome = self.unittest_worker.run(self._unittest_name)
+        sys.stdout.write(outcome['stdout'])
+        sys.stderr.write(outcome['stderr'])
+        if outcome['status'] == 'ERROR':
+            self.log.error(outcome['details'])
+            self.error("Unittest reported error(s)")
+        elif outcome['status'] == 'FAIL':
+            self.log.error(outcome['details'])
+            self.fail("Unittest reported failure(s)")
+        elif outcome['status'] == 'SKIP':
+            self.log.info('Skip reason: %s', outcome['details'])
+            self.cancel("Unittest reported skip")
+
     def test(self):
+        if self.unittest_worker is not None:
+            self._test_in_worker()
+            return
         try:
             super(PythonUnittest, self).test()
         except exceptions.TestFail:
@@ -1259,49 +1303,112 @@ class TapTest(SimpleTest):
     Run a test command as a TAP test.
     """
 
-    def _execute_cmd(self):
-        try:
-            test_params = {str(key): str(val)
-                           for _, key, val in self.params.iteritems()}
+    #: The maximum length (in bytes) of the lines of output that are
+    #: parsed and logged, the rest of longer lines is discarded
+    OUTPUT_LINE_LIMIT = 1024 * 1024
 
-            input_encoding = self._config.get('core.input_encoding')
-            result = process.run(self._command,
-                                 verbose=True,
-                                 allow_output_check='stdout',
-                                 env=test_params,
-                                 encoding=input_encoding)
+    @classmethod
+    def _iter_lines(cls, stream):
+        """
+        Yields the lines read from a (binary) stream, until it's exhausted
 
-            self._log_detailed_cmd_info(result)
-        except process.CmdError as details:
-            self._log_detailed_cmd_info(details.result)
-            raise exceptions.TestFail(details)
+        Lines longer than :attr:`OUTPUT_LINE_LIMIT` are truncated, and
+        the rest of them is read in pieces and discarded, so that they're
+        never held in memory as a whole.
+        """
+        truncated = False
+        while True:
+            line = stream.readline(cls.OUTPUT_LINE_LIMIT)
+            if not line:
+                break
+            if not truncated:
+                yield line
+            truncated = not line.endswith(b'\n')
 
-        if result.exit_status != 0:
-            self.fail('TAP Test execution returned a '
-                      'non-0 exit code (%s)' % result)
-        parser = tapparser.TapParser(io.StringIO(result.stdout_text))
+    @classmethod
+    def _log_stream(cls, stream, prefix, encoding):
+        """
+        Logs each line read from a (binary) stream, until it's exhausted
+        """
+        stream_log = LOG_JOB.getChild(prefix)
+        for line in cls._iter_lines(stream):
+            line = astring.to_text(line, encoding, 'replace').rstrip('\n')
+            LOG_JOB.debug('[%s] %s', prefix, line)
+            stream_log.debug(line)
+
+    def _execute_cmd(self):
+        test_params = {str(key): str(val)
+                       for _, key, val in self.params.iteritems()}
+        env = os.environ.copy()
+        env.update(test_params)
+        input_encoding = self._config.get('core.input_encoding')
+
+        # The TAP output is parsed while the command runs, line by line,
+        # so that results are available as soon as they're produced, and
+        # the output is never held in memory as a whole
+        self.log.info("Running '%s'", self._command)
+        start = time.time()
+        proc = subprocess.Popen(shlex.split(self._command),
+                                stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE,
+                                env=env)
+        stderr_logger = threading.Thread(target=self._log_stream,
+                                         args=(proc.stderr, 'stderr',
+                                               input_encoding),
+                                         daemon=True)
+        stderr_logger.start()
+        parser = tapparser.TapParser(encoding=input_encoding)
+        error = None
         fail = 0
         count = 0
         bad_errormsg = 'there were test failures'
-        for event in parser.parse():
-            if isinstance(event, tapparser.TapParser.Error):
-                self.error('TAP parsing error: ' + event.message)
-                continue
-            if isinstance(event, tapparser.TapParser.Bailout):
-                self.error(event.message)
-                continue
-            if isinstance(event, tapparser.TapParser.Test):
-                bad = event.result in (tapparser.TestResult.XPASS, tapparser.TestResult.FAIL)
-                if event.result != tapparser.TestResult.SKIP:
-                    count += 1
-                if bad:
-                    self.log.error('%s %s %s', event.result.name, event.number, event.name)
-                    fail += 1
-                    if event.result == tapparser.TestResult.XPASS:
-                        bad_errormsg = 'there were test failures or unexpected passes'
-                else:
-                    self.log.info('%s %s %s', event.result.name, event.number, event.name)
-
+        try:
+            for line in self._iter_lines(proc.stdout):
+                text = astring.to_text(line, input_encoding, 'replace')
+                text = text.rstrip('\n')
+                LOG_JOB.debug('[stdout] %s', text)
+                LOG_JOB.getChild('stdout').debug(text)
+                for event in parser.parse_line(line):
+                    if isinstance(event, tapparser.TapParser.Error):
+                        error = error or 'TAP parsing error: ' + event.message
+                    elif isinstance(event, tapparser.TapParser.Bailout):
+                        error = error or event.message
+                    elif isinstance(event, tapparser.TapParser.Test):
+                        bad = event.result in (tapparser.TestResult.XPASS,
+                                               tapparser.TestResult.FAIL)
+                        if event.result != tapparser.TestResult.SKIP:
+                            count += 1
+                        if bad:
+                            self.log.error('%s %s %s', event.result.name,
+                                           event.number, event.name)
+                            fail += 1
+                            if event.result == tapparser.TestResult.XPASS:
+                                bad_errormsg = ('there were test failures '
+                                                'or unexpected passes')
+                        else:
+                            self.log.info('%s %s %s', event.result.name,
+                                          event.number, event.name)
+                        # lets the runner know the test is progressing
+                        self.report_state()
+        except BaseException:
+            proc.kill()
+            raise
+        finally:
+            proc.stdout.close()
+            exit_status = proc.wait()
+            stderr_logger.join()
+            proc.stderr.close()
+        for event in parser.parse_end():
+            error = error or 'TAP parsing error: ' + event.message
+
+        self.log.info("Exit status: %s", exit_status)
+        self.log.info("Duration: %s", time.time() - start)
+        if exit_status != 0:
+            self.fail('TAP Test execution returned a '
+                      'non-0 exit code (%s)' % exit_status)
+        if error is not None:
+            self.error(error)
         if not count:
             raise exceptions.TestSkipError('no tests were run')
         if fail:
@@ -0,0 +1,201 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright: Red Hat Inc. 2020
+
+"""
+Job execution tracing, exported in the Chrome trace event format
+
+Spans (a name, a category and the time it took) are recorded from the
+job phases, the runners, the test phases and the plugin dispatchers,
+and saved as a "trace.json" file in the job results directory, which
+can be loaded in chrome://tracing or https://ui.perfetto.dev.
+
+Recording is disabled by default, and then :func:`span` costs a single
+attribute lookup.  While enabled, each event is appended, as a line of
+JSON, to a file shared by the job process and the test processes it
+forks, and those lines are converted into the final file by
+:meth:`Tracer.export`.
+"""
+
+import json
+import os
+import threading
+import time
+
+#: Name of the file with the recorded events, one JSON object per line
+RAW_FILENAME = 'trace.jsonl'
+
+#: Name of the file in the Chrome trace event format
+TRACE_FILENAME = 'trace.json'
+
+
+class _NullSpan:
+
+    """
+    A span that records nothing, used while tracing is disabled
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        event = {'name': self.name,
+                 'cat': self.category,
+                 'ph': 'X',
+                 'ts': int(self.start * 1000000),
+                 'dur': int((time.time() - self.start) * 1000000)}
+        args = self.args
+        if exc_type is not None:
+            args = dict(args or {}, exception=exc_type.__name__)
+        if args:
+            event['args'] = args
+        self.tracer.emit(event)
+        return False
+
+
+class Tracer:
+
+    """
+    Records trace events, either into a buffer or into the output file
+
+    Events recorded before :meth:`set_output` is called (say, while the
+    test suite is being created, before the job results directory
+    exists) are kept in memory, and written once an output is set.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._buffer = []
+        self._fd = None
+        self._path = None
+
+    def enable(self):
+        self.enabled = True
+
+    def set_output(self, directory):
+        """
+        Sets the directory where the events are written to
+
+        :param directory: usually the job results directory
+        :type directory: str
+        """
+        self._path = os.path.join(directory, RAW_FILENAME)
+        # O_APPEND makes each event (a single write) land whole, even when
+        # written concurrently by the forked test processes
+        self._fd = os.open(self._path,
+                           os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        buffered, self._buffer = self._buffer, []
+        for event in buffered:
+            self.emit(event)
+        self.set_process_name('avocado job')
+
+    def disable(self):
+        self.enabled = False
+        self._buffer = []
+        self._path = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def emit(self, event):
+        """
+        Records an event, completing it with the process and thread ids
+        """
+        event.setdefault('pid', os.getpid())
+        event.setdefault('tid', threading.get_ident())
+        if self._fd is None:
+            self._buffer.append(event)
+        else:
+            os.write(self._fd, (json.dumps(event) + '\n').encode())
+
+    def span(self, name, category='avocado', **args):
+        """
+        Creates a context manager that records the time spent within it
+
+        :param name: the name of the span, such as a test or phase name
+        :type name: str
+        :param category: the category, used to filter events in viewers
+        :type category: str
+        :param args: additional (JSON serializable) information
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def set_process_name(self, name):
+        """
+        Names the current process in the trace viewers
+        """
+        if self.enabled:
+            self.emit({'name': 'process_name',
+                       'ph': 'M',
+                       'args': {'name': name}})
+
+    def export(self):
+        """
+        Writes the recorded events in the Chrome trace event format
+
+        The file with the raw events is removed afterwards.
+
+        :returns: the path of the trace file, or None if there was no
+                  output set
+        :rtype: str or None
+        """
+        if self._path is None or not os.path.exists(self._path):
+            return None
+        events = []
+        with open(self._path) as raw:
+            for line in raw:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    # a process killed while writing its last event
+                    continue
+        path = os.path.join(os.path.dirname(self._path), TRACE_FILENAME)
+        with open(path, 'w') as trace:
+            json.dump({'traceEvents': events,
+                       'displayTimeUnit': 'ms'}, trace)
+        os.unlink(self._path)
+        return path
+
+
+#: The tracer used by the whole avocado process
+TRACER = Tracer()
+
+
+def span(name, category='avocado', **args):
+    """
+    Shortcut to :meth:`Tracer.span` of the global :data:`TRACER`
+    """
+    if not TRACER.enabled:
+        return _NULL_SPAN
+    return _Span(TRACER, name, category, args)
@@ -34,6 +34,7 @@ original base tree code and re-license under GPLv2+, given that GPLv3 and GPLv2
 """
 
 import collections
+import collections.abc
 import copy
 import itertools
 import locale
@@ -63,20 +64,142 @@ class FilterSet(set):
                 % ', '.join(sorted(["'%s'" % i for i in self])))
 
 
-class TreeEnvironment(dict):
+#: Marks the keys removed from a layer, hiding the ones of its parents
+_REMOVED = object()
+
+
+class LayeredDict(collections.abc.MutableMapping):
+
+    """
+    Mapping of its own values, layered on top of the ones of a parent
+
+    Lookups fall back to the parent (and to its parents), while changes
+    only affect this layer, so the values of the parents are shared
+    instead of copied.  The order of the keys is the one of a dict
+    updated with the values of each layer, from the bottom one.
+
+    The parents are expected to not change once layers are put on top
+    of them, as those changes would be seen through the layers.
+    """
+
+    __slots__ = ('_parent', '_data')
+
+    def __init__(self, parent=None):
+        """
+        :param parent: the mapping this one is layered on top of
+        :type parent: :class:`LayeredDict`
+        """
+        self._parent = parent
+        self._data = {}
+
+    @property
+    def parent(self):
+        return self._parent
+
+    def _flatten(self):
+        """
+        Returns a dict with the contents of all layers
+        """
+        layers = []
+        layer = self
+        while layer is not None:
+            layers.append(layer._data)  # pylint: disable=W0212
+            layer = layer._parent  # pylint: disable=W0212
+        flat = {}
+        for data in reversed(layers):
+            for key, value in data.items():
+                if value is _REMOVED:
+                    flat.pop(key, None)
+                else:
+                    flat[key] = value
+        return flat
+
+    def __getitem__(self, key):
+        layer = self
+        while layer is not None:
+            try:
+                value = layer._data[key]  # pylint: disable=W0212
+            except KeyError:
+                layer = layer._parent  # pylint: disable=W0212
+                continue
+            if value is _REMOVED:
+                break
+            return value
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if self._parent is not None and key in self._parent:
+            self._data[key] = _REMOVED
+        else:
+            del self._data[key]
+
+    def __iter__(self):
+        return iter(self._flatten())
+
+    def __len__(self):
+        return len(self._flatten())
+
+    def items(self):
+        return self._flatten().items()
+
+    def values(self):
+        return self._flatten().values()
+
+    def __repr__(self):
+        return repr(self._flatten())
+
+
+class TreeEnvironment(LayeredDict):
 
     """ TreeNode environment with values, origins and filters """
 
-    def __init__(self):
-        super(TreeEnvironment, self).__init__()     # values
-        self.origin = {}    # origins of the values
-        self.filter_only = FilterSet()   # list of filter_only
-        self.filter_out = FilterSet()    # list of filter_out
+    __slots__ = ('origin', 'filter_only', 'filter_out')
+
+    def __init__(self, parent=None):
+        """
+        :param parent: the environment of the parent node, which this
+                       one inherits (and shares) the values, origins
+                       and filters from
+        :type parent: :class:`TreeEnvironment`
+        """
+        super(TreeEnvironment, self).__init__(parent)     # values
+        if parent is None:
+            self.origin = LayeredDict()    # origins of the values
+            self.filter_only = FilterSet()   # list of filter_only
+            self.filter_out = FilterSet()    # list of filter_out
+        else:
+            self.origin = LayeredDict(parent.origin)
+            # the filters are shared until changed, see :meth:`add_filters`
+            self.filter_only = parent.filter_only
+            self.filter_out = parent.filter_out
+
+    def add_filters(self, filter_only, filter_out):
+        """
+        Adds filters to this environment, without changing the parent's
+        """
+        if filter_only:
+            self.filter_only = copy.copy(self.filter_only)
+            self.filter_only.update(filter_only)
+        if filter_out:
+            self.filter_out = copy.copy(self.filter_out)
+            self.filter_out.update(filter_out)
 
     def copy(self):
         cpy = TreeEnvironment()
-        cpy.update(self)
-        cpy.origin = copy.copy(self.origin)
+        cpy._data = self._flatten()
+        cpy.origin._data = self.origin._flatten()  # pylint: disable=W0212
         cpy.filter_only = copy.copy(self.filter_only)
         cpy.filter_out = copy.copy(self.filter_out)
         return cpy
@@ -128,6 +251,7 @@ class TreeNodeEnvOnly:
         self.name = path.rsplit("/")[-1]
         self.path = path
         self.environment = TreeEnvironment()
+        self._fingerprint = None
         if environment:
             self.__load_environment(environment)
 
@@ -149,7 +273,10 @@ class TreeNodeEnvOnly:
         return True
 
     def fingerprint(self):
-        return "%s%s" % (self.path, self.environment.to_text(True))
+        if self._fingerprint is None:
+            self._fingerprint = "%s%s" % (self.path,
+                                          self.environment.to_text(True))
+        return self._fingerprint
 
     def get_environment(self):
         return self.environment
@@ -188,7 +315,10 @@ class TreeNode:
         self.filters = [], []  # This node's filters, full filters are in env
         self.parent = parent
         self.children = []
+        # children indexed by name, for a constant time lookup
+        self._children_by_name = {}
         self._environment = None
+        self._fingerprint = None
         for child in children:
             self.add_child(child)
 
@@ -240,7 +370,14 @@ class TreeNode:
     def fingerprint(self):
         """
         Reports string which represents the value of this node.
+
+        It's cached until :meth:`set_environment_dirty` is called.
         """
+        if self._fingerprint is None:
+            self._fingerprint = self._compute_fingerprint()
+        return self._fingerprint
+
+    def _compute_fingerprint(self):
         return "%s%s" % (self.path, self.environment.to_text(True))
 
     def add_child(self, node):
@@ -249,14 +386,23 @@ class TreeNode:
         existing position.
         """
         if isinstance(node, TreeNode):
-            if node.name in self.children:
-                self.children[self.children.index(node.name)].merge(node)
+            child = self._children_by_name.get(node.name)
+            if child is not None:
+                child.merge(node)
             else:
                 node.parent = self
                 self.children.append(node)
+                self._children_by_name[node.name] = node
         else:
             raise ValueError('Bad node type.')
 
+    def remove_child(self, node):
+        """
+        Removes node from the children of this node
+        """
+        self.children.remove(node)
+        self._children_by_name.pop(node.name, None)
+
     def merge(self, other):
         """
         Merges `other` node into this one without checking the name of the
@@ -313,7 +459,7 @@ class TreeNode:
 
     def get_path(self, sep='/'):
         """ Get node path """
-        if not self.parent:
+        if self.parent is None:
             return sep + astring.to_text(self.name)
         path = [astring.to_text(self.name)]
         for node in self.iter_parents():
@@ -328,8 +474,8 @@ class TreeNode:
     def get_environment(self):
         """ Get node environment (values + preceding envs) """
         if self._environment is None:
-            self._environment = (self.parent.environment.copy()
-                                 if self.parent else TreeEnvironment())
+            self._environment = TreeEnvironment(
+                self.parent.environment if self.parent is not None else None)
             for key, value in self.value.items():
                 if isinstance(value, list):
                     if (key in self._environment and
@@ -340,8 +486,7 @@ class TreeNode:
                 else:
                     self._environment[key] = value
                 self._environment.origin[key] = self
-            self._environment.filter_only.update(self.filters[0])
-            self._environment.filter_out.update(self.filters[1])
+            self._environment.add_filters(self.filters[0], self.filters[1])
         return self._environment
 
     def set_environment_dirty(self):
@@ -353,6 +498,7 @@ class TreeNode:
         for child in self.children:
             child.set_environment_dirty()
         self._environment = None
+        self._fingerprint = None
 
     def get_node(self, path, create=False):
         """
@@ -366,8 +512,8 @@ class TreeNode:
             if not name:
                 continue
             try:
-                node = node.children[node.children.index(name)]
-            except ValueError:
+                node = node._children_by_name[name]  # pylint: disable=W0212
+            except KeyError:
                 if create:
                     child = node.__class__(name)
                     node.add_child(child)
@@ -401,8 +547,8 @@ class TreeNode:
 
     def detach(self):
         """ Detach this node from parent """
-        if self.parent:
-            self.parent.children.remove(self)
+        if self.parent is not None:
+            self.parent.remove_child(self)
             self.parent = None
         return self
 
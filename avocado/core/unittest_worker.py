@@ -0,0 +1,293 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright: Red Hat Inc. 2020
+
+"""
+Batched execution of Python unittests
+
+Instead of starting a new Python interpreter (and importing the test
+module again) for every single unittest method, a worker process is
+started per module.  It imports the module once, and runs the test
+methods it's asked to, reporting the outcome of each one of them as a
+dictionary.
+"""
+
+import collections
+import importlib
+import io
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import time
+import traceback
+import unittest
+
+#: Maximum number of idle workers kept by a :class:`UnittestWorkerPool`
+MAX_WORKERS = 4
+
+#: Time, in seconds, given to a worker to finish when it's being stopped
+STOP_TIMEOUT = 5
+
+
+def _capture_fd(fd, temp):
+    """
+    Redirects fd into the temporary file, returning a copy of the original
+    """
+    saved = os.dup(fd)
+    os.dup2(temp.fileno(), fd)
+    return saved
+
+
+def _restore_fd(fd, saved, temp):
+    """
+    Restores fd from a copy, and returns what was written to the temp file
+    """
+    os.dup2(saved, fd)
+    os.close(saved)
+    temp.seek(0)
+    return temp.read().decode(errors='replace')
+
+
+def _result_to_status(result):
+    """
+    Converts a :class:`unittest.TestResult` into an Avocado test status
+    """
+    if result.errors:
+        return 'ERROR', result.errors[0][1]
+    if result.failures:
+        return 'FAIL', result.failures[0][1]
+    if result.unexpectedSuccesses:
+        return 'FAIL', 'Unexpected success'
+    if not result.testsRun:
+        return 'ERROR', 'No tests were run'
+    if result.skipped and len(result.skipped) == result.testsRun:
+        return 'SKIP', result.skipped[0][1]
+    return 'PASS', ''
+
+
+def run_unittest(name):
+    """
+    Runs a single unittest (usually a test method) in this process
+
+    The standard output and error are captured at the file descriptor
+    level, so output from subprocesses is also captured.
+
+    :param name: a "dotted name" that can be given to
+                 :meth:`unittest.TestLoader.loadTestsFromName`
+    :type name: str
+    :returns: the outcome, with the keys "status" (one of "PASS", "FAIL",
+              "ERROR" or "SKIP"), "details" (usually a traceback),
+              "stdout", "stderr" and "time" (elapsed time in seconds)
+    :rtype: dict
+    """
+    result = unittest.TestResult()
+    start = time.monotonic()
+    with tempfile.TemporaryFile() as stdout, \
+            tempfile.TemporaryFile() as stderr:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        saved_stdout = _capture_fd(1, stdout)
+        saved_stderr = _capture_fd(2, stderr)
+        try:
+            try:
+                suite = unittest.TestLoader().loadTestsFromName(name)
+                suite.run(result)
+            except Exception:  # pylint: disable=W0703
+                result.errors.append((name, traceback.format_exc()))
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            out = _restore_fd(1, saved_stdout, stdout)
+            err = _restore_fd(2, saved_stderr, stderr)
+    status, details = _result_to_status(result)
+    return {'status': status,
+            'details': details,
+            'stdout': out,
+            'stderr': err,
+            'time': time.monotonic() - start}
+
+
+def _serve(connection, test_dir, module):
+    """
+    Worker process main loop
+
+    Requests are tuples of (request_id, unittest_name), and a request of
+    None makes the worker exit.  Replies are tuples of (request_id,
+    outcome), where the outcome is given by :func:`run_unittest`.
+    """
+    if test_dir is not None:
+        os.chdir(test_dir)
+        sys.path.insert(0, test_dir)
+    # unittest writes to sys.stdout/sys.stderr, make sure they're bound
+    # to the file descriptors that get captured
+    sys.stdout = io.TextIOWrapper(open(1, 'wb', buffering=0, closefd=False),
+                                  write_through=True)
+    sys.stderr = io.TextIOWrapper(open(2, 'wb', buffering=0, closefd=False),
+                                  write_through=True)
+    import_error = None
+    try:
+        importlib.import_module(module)
+    except BaseException:  # pylint: disable=W0703
+        import_error = traceback.format_exc()
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        request_id, name = request
+        if import_error is not None:
+            outcome = {'status': 'ERROR',
+                       'details': import_error,
+                       'stdout': '',
+                       'stderr': '',
+                       'time': 0.0}
+        else:
+            outcome = run_unittest(name)
+        connection.send((request_id, outcome))
+
+
+class UnittestWorker:
+
+    """
+    A process that runs Python unittests from a single module
+
+    The worker is started in a new interpreter (using the "spawn" start
+    method), so it doesn't inherit the state of the process starting it.
+    It may be used from processes forked after it was started, one at a
+    time, which is how the test runner uses it: the worker is started by
+    the job process, and used by each test process.
+    """
+
+    def __init__(self, test_dir, module):
+        """
+        :param test_dir: directory containing the module, which is also
+                         used as the working directory of the worker
+        :type test_dir: str
+        :param module: name of the module containing the unittests
+        :type module: str
+        """
+        self.test_dir = test_dir
+        self.module = module
+        self._connection = None
+        self._process = None
+        self._owner_pid = None
+        self._request_no = 0
+
+    def start(self):
+        context = multiprocessing.get_context('spawn')
+        parent, child = context.Pipe()
+        self._process = context.Process(target=_serve,
+                                        args=(child, self.test_dir,
+                                              self.module),
+                                        daemon=True)
+        self._process.start()
+        self._owner_pid = os.getpid()
+        child.close()
+        self._connection = parent
+
+    def is_alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def kill(self):
+        if self._process is not None:
+            if os.getpid() == self._owner_pid:
+                self._process.kill()
+                self._process.join()
+            else:
+                # only the process that started the worker can wait for
+                # it, a forked user can only make sure it's gone
+                try:
+                    os.kill(self._process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def stop(self):
+        """
+        Asks the worker to finish, killing it if it doesn't in time
+        """
+        if self.is_alive():
+            try:
+                self._connection.send(None)
+            except OSError:
+                pass
+            self._process.join(STOP_TIMEOUT)
+        self.kill()
+
+    def run(self, name):
+        """
+        Runs a unittest in the worker, waiting for its outcome
+
+        If the wait is interrupted (say, because of a test timeout) the
+        worker is killed, as it's still busy running the test.
+
+        :param name: a "dotted name" of the unittest, such as
+                     "module.Class.test_method"
+        :type name: str
+        :returns: the outcome as given by :func:`run_unittest`
+        :rtype: dict
+        """
+        # the process id makes the request unique even among different
+        # processes forked from the same parent
+        self._request_no += 1
+        request_id = (os.getpid(), self._request_no)
+        try:
+            self._connection.send((request_id, name))
+            while True:
+                reply_id, outcome = self._connection.recv()
+                # replies to requests from previous (interrupted) users
+                # of this worker are discarded
+                if reply_id == request_id:
+                    return outcome
+        except BaseException:
+            self.kill()
+            raise
+
+
+class UnittestWorkerPool:
+
+    """
+    Keeps a limited number of :class:`UnittestWorker`, one per module
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.max_workers = max_workers
+        self._workers = collections.OrderedDict()
+
+    def get(self, test_dir, module):
+        """
+        Gets a live worker for the given module, starting it if needed
+
+        The least recently used workers are stopped when there are more
+        than :attr:`max_workers`.
+        """
+        key = (test_dir, module)
+        worker = self._workers.pop(key, None)
+        if worker is None or not worker.is_alive():
+            worker = UnittestWorker(test_dir, module)
+            worker.start()
+        self._workers[key] = worker
+        while len(self._workers) > self.max_workers:
+            _, oldest = self._workers.popitem(last=False)
+            oldest.stop()
+        return worker
+
+    def stop(self):
+        while self._workers:
+            _, worker = self._workers.popitem()
+            worker.stop()
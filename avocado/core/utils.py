@@ -6,7 +6,7 @@ from pkg_resources import get_distribution
 from ..utils import path, process
 from .nrunner import Task
 from .resolver import ReferenceResolutionResult
-from .tags import filter_test_tags_runnable
+from .tags import TagFilter
 
 
 def get_avocado_git_version():
@@ -74,15 +74,16 @@ def resolutions_to_tasks(resolutions, config):
     include_empty = config.get("filter.by_tags.include_empty")
     include_empty_key = config.get('filter.by_tags.include_empty_key')
     status_server = config.get('nrun.status_server.listen')
+    tag_filter = None
+    if filter_by_tags:
+        tag_filter = TagFilter(filter_by_tags, include_empty,
+                               include_empty_key)
     for resolution in resolutions:
         if resolution.result != ReferenceResolutionResult.SUCCESS:
             continue
-        for runnable in resolution.resolutions:
-            if filter_by_tags:
-                if not filter_test_tags_runnable(runnable,
-                                                 filter_by_tags,
-                                                 include_empty,
-                                                 include_empty_key):
-                    continue
+        runnables = resolution.resolutions
+        if tag_filter is not None:
+            runnables = tag_filter.filter_runnables(runnables)
+        for runnable in runnables:
             tasks.append(Task(str(uuid1()), runnable, [status_server]))
     return tasks
@@ -21,6 +21,7 @@ Base classes for implementing the varianter interface
 
 import hashlib
 import json
+import operator
 import os
 
 from ..utils import astring
@@ -28,6 +29,10 @@ from . import dispatcher, output, tree
 
 VARIANTS_FILENAME = 'variants.json'
 
+#: Version of the compact format of the variants file, written by
+#: :func:`dump_variants_compact`
+VARIANTS_COMPACT_VERSION = 2
+
 
 def is_empty_variant(variant):
     """
@@ -39,14 +44,45 @@ def is_empty_variant(variant):
     return not variant or variant == [tree.TreeNode()] * len(variant)
 
 
+#: Maximum number of variant ids kept by :func:`generate_variant_id`
+VARIANT_IDS_CACHE_SIZE = 4096
+
+#: The ids of the recently seen variants, keyed by the identities of
+#: their nodes, see :func:`generate_variant_id`
+_VARIANT_IDS = {}
+
+
 def generate_variant_id(variant):
     """
     Basic function to generate variant-id from a variant
 
+    The same variants are usually seen many times, once for each test,
+    so the ids of the recently seen ones are cached.  A cached id is
+    only used while the (cached) fingerprints of its nodes are the same.
+
     :param variant: Avocado test variant (list of TreeNode-like objects)
     :return: String compounded of ordered node names and a hash of all
              values.
     """
+    key = tuple(map(id, variant))
+    fingerprints = [node.fingerprint() for node in variant]
+    cached = _VARIANT_IDS.get(key)
+    # the nodes are kept on the cache, so their ids are not reused, and
+    # the fingerprints are compared by identity, as a changed node (see
+    # :meth:`avocado.core.tree.TreeNode.set_environment_dirty`) gets a
+    # new one
+    if cached is not None and all(map(operator.is_, fingerprints,
+                                      cached[1])):
+        return cached[2]
+    variant_id = _generate_variant_id(variant)
+    if VARIANT_IDS_CACHE_SIZE > 0:
+        if len(_VARIANT_IDS) >= VARIANT_IDS_CACHE_SIZE:
+            del _VARIANT_IDS[next(iter(_VARIANT_IDS))]
+        _VARIANT_IDS[key] = (tuple(variant), fingerprints, variant_id)
+    return variant_id
+
+
+def _generate_variant_id(variant):
     def get_variant_name(variant):
         """
         To get the variant full name string
@@ -57,7 +93,9 @@ def generate_variant_id(variant):
         full_name = []
         for node in variant:
             var_str = []
-            while node:
+            # not "while node", as the truth value of a TreeNode is
+            # given by its (costly to compute) number of leaves
+            while node is not None:
                 var_str.append(node.name)
                 node = node.parent if hasattr(node, 'parent') else None
             try:
@@ -137,6 +175,142 @@ def dump_ivariants(ivariants):
     return variants
 
 
+def dump_variants_compact(varianters, stream, default=None):
+    """
+    Writes the variants of a number of varianters in the compact format
+
+    Instead of the environment of each node of each variant, as given by
+    :func:`dump_ivariants`, the unique nodes are written only once, and
+    the variants reference them by id.  The format is made of JSON lines,
+    written as the variants are iterated: a header, with the version of
+    the format, followed, for each varianter (usually, one per test
+    suite), by a line starting it and by its nodes and variants::
+
+        {"version": 2}
+        {"suite": 0}
+        {"node": 0, "path": "/pig/cat", "environment": [["/pig", "ant", "fox"]]}
+        {"variant_id": "cat-26c0", "paths": ["/run/*"], "variant": [0]}
+        ...
+
+    :param varianters: the varianters whose variants are written
+    :type varianters: list of :class:`Varianter`
+    :param stream: a file-like object (in text mode) to write to
+    :param default: function used to serialize values that are not
+                    otherwise JSON serializable, as in :func:`json.dumps`
+    """
+    nodes = {}
+    # nodes are usually the very same objects across variants, which
+    # avoids the need to serialize their environment to look them up
+    nodes_by_object = {}
+
+    def dump_tree_node(node):
+        if id(node) in nodes_by_object:
+            return nodes_by_object[id(node)][1]
+        path = astring.to_text(node.path)
+        environment = json.dumps(
+            [(astring.to_text(node.environment.origin[key].path),
+              astring.to_text(key), value)
+             for key, value in node.environment.items()],
+            default=default)
+        node_id = nodes.get((path, environment))
+        if node_id is None:
+            node_id = nodes[(path, environment)] = len(nodes)
+            stream.write('{"node": %d, "path": %s, "environment": %s}\n'
+                         % (node_id, json.dumps(path), environment))
+        # the node is kept alive, so that its id() is not reused
+        nodes_by_object[id(node)] = (node, node_id)
+        return node_id
+
+    stream.write(json.dumps({"version": VARIANTS_COMPACT_VERSION}) + '\n')
+    for index, varianter in enumerate(varianters):
+        if not varianter.is_parsed():
+            raise NotImplementedError("Dumping Varianter state before "
+                                      "multiplexation is not supported.")
+        stream.write(json.dumps({"suite": index}) + '\n')
+        for variant in varianter.itertests():
+            node_ids = [dump_tree_node(_)
+                        for _ in variant.get("variant", [])]
+            stream.write('{"variant_id": %s, "paths": %s, "variant": %s}\n'
+                         % (json.dumps(variant.get("variant_id")),
+                            json.dumps([astring.to_text(pth)
+                                        for pth in variant.get("paths")]),
+                            json.dumps(node_ids)))
+
+
+class CompactVariants:
+
+    """
+    The variants of a test suite, lazily loaded from a compact variants file
+
+    Each iteration reads the file again, yielding the variants, in the
+    same form as :class:`FakeVariantDispatcher` does, as they are read.
+    See :func:`dump_variants_compact` for the format.
+    """
+
+    def __init__(self, path, suite):
+        """
+        :param path: path to the compact variants file
+        :param suite: index of the test suite on the file
+        """
+        self.path = path
+        self.suite = suite
+        self._len = None
+
+    @staticmethod
+    def suites(path):
+        """
+        Returns the variants of all test suites on a compact variants file
+
+        :param path: path to a variants file, in either format
+        :return: one :class:`CompactVariants` per test suite, or None if
+                 the file is not on the compact format
+        :rtype: list
+        """
+        with open(path, 'r') as variants_file:
+            header = variants_file.readline()
+            if not header.startswith('{"version"'):
+                return None
+            suites = sum(1 for line in variants_file
+                         if line.startswith('{"suite"'))
+        return [CompactVariants(path, suite) for suite in range(suites)]
+
+    def _lines(self):
+        suite = None
+        with open(self.path, 'r') as variants_file:
+            variants_file.readline()
+            for line in variants_file:
+                if line.startswith('{"suite"'):
+                    if suite == self.suite:
+                        return
+                    suite = json.loads(line)["suite"]
+                    continue
+                yield suite == self.suite, line
+
+    def __iter__(self):
+        environments = {}
+        nodes = {}
+        for in_suite, line in self._lines():
+            item = json.loads(line)
+            if "node" in item:
+                environments[item["node"]] = (item["path"],
+                                              item["environment"])
+            elif in_suite:
+                variant = []
+                for node_id in item["variant"]:
+                    if node_id not in nodes:
+                        nodes[node_id] = tree.TreeNodeEnvOnly(
+                            *environments[node_id])
+                    variant.append(nodes[node_id])
+                item["variant"] = variant
+                yield item
+
+    def __len__(self):
+        if self._len is None:
+            self._len = sum(1 for in_suite, line in self._lines()
+                            if in_suite and line.startswith('{"variant_id"'))
+        return self._len
+
+
 class FakeVariantDispatcher:
 
     """
@@ -145,9 +319,10 @@ class FakeVariantDispatcher:
     """
 
     def __init__(self, state):
-        for variant in state:
-            variant["variant"] = [tree.TreeNodeEnvOnly(path, env)
-                                  for path, env in variant["variant"]]
+        if not isinstance(state, CompactVariants):
+            for variant in state:
+                variant["variant"] = [tree.TreeNodeEnvOnly(path, env)
+                                      for path, env in variant["variant"]]
         self.variants = state
 
     def map_method_with_return(self, method, *args, **kwargs):
@@ -183,7 +358,20 @@ class FakeVariantDispatcher:
         return iter(self.variants)
 
     def __len__(self):
-        return sum(1 for _ in self)
+        return len(self.variants)
+
+    def get_variant(self, index):
+        """
+        Reports the loaded variant at a given position
+
+        :raise NotImplementedError: when the variants are only iterated,
+                                    as the ones loaded from a
+                                    :class:`CompactVariants` file
+        """
+        if isinstance(self.variants, CompactVariants):
+            raise NotImplementedError("Variants loaded from a compact "
+                                      "file do not support random access")
+        return self.variants[index]
 
 
 class Varianter:
@@ -295,8 +483,9 @@ class Varianter:
         Load the variants state
 
         Current implementation supports loading from a list of loadable
-        variants. It replaces the VariantDispatcher with fake implementation
-        which reports the loaded (and initialized) variants.
+        variants, or from a :class:`CompactVariants`. It replaces the
+        VariantDispatcher with fake implementation which reports the loaded
+        (and initialized) variants.
 
         :param state: loadable Varianter representation
         """
@@ -326,9 +515,29 @@ class Varianter:
             for variant in iter(iter_variants):
                 yield variant
         else:   # No real variants, but currently *something* needs to be returned
-            yield {"variant": self.node_class('').get_leaves(),
-                   "variant_id": None,
-                   "paths": ["/run/*"]}
+            yield self._get_empty_variant()
+
+    def _get_empty_variant(self):
+        return {"variant": self.node_class('').get_leaves(),
+                "variant_id": None,
+                "paths": ["/run/*"]}
+
+    def get_variant(self, index):
+        """
+        Reports the variant at a given position, in the same format and
+        order as :meth:`itertests`, without producing the preceding ones
+
+        :param index: position of the variant
+        :type index: int
+        :raise IndexError: when the index is out of range
+        :raise NotImplementedError: when the plugin producing the variant
+                                    has no random access to its variants
+        """
+        if self._no_variants:
+            return self._variant_plugins.get_variant(index)
+        if index != 0:
+            raise IndexError("Variant index out of range")
+        return self._get_empty_variant()
 
     @classmethod
     def from_resultsdir(cls, resultsdir):
@@ -342,6 +551,10 @@ class Varianter:
         if not os.path.exists(path):
             return None
 
+        suites = CompactVariants.suites(path)
+        if suites is not None:
+            return [cls(state=suite) for suite in suites]
+
         variants = []
         with open(path, 'r') as variants_file:
             for variant in json.load(variants_file):
@@ -57,13 +57,23 @@ class Jobs(CLICmd):
             status = test.get('status')
             decorator = output.TEST_STATUS_DECORATOR_MAPPING.get(status)
             end = datetime.fromtimestamp(test.get('end'))
+            usage = test.get('resource_usage') or {}
+            if 'cpu_user' in usage and 'cpu_system' in usage:
+                cpu_time = "%5f" % (usage['cpu_user'] + usage['cpu_system'])
+            else:
+                cpu_time = '-'
+            max_rss = usage.get('max_rss', '-')
             test_matrix.append((test.get('id'),
                                 end.strftime(date_fmt),
                                 "%5f" % float(test.get('time')),
+                                cpu_time,
+                                max_rss,
                                 decorator(status, '')))
         header = (output.TERM_SUPPORT.header_str('Test ID'),
                   output.TERM_SUPPORT.header_str('End Time'),
                   output.TERM_SUPPORT.header_str('Run Time'),
+                  output.TERM_SUPPORT.header_str('CPU Time'),
+                  output.TERM_SUPPORT.header_str('Max RSS (KiB)'),
                   output.TERM_SUPPORT.header_str('Status'))
         for line in astring.iter_tabular_output(test_matrix,
                                                 header=header,
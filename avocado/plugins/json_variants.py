@@ -80,8 +80,15 @@ class JsonVariants(Varianter):
             self.variants = _NO_VARIANTS
             return
         try:
-            with open(load_variants, 'r') as var_file:
-                self.variants = varianter.Varianter(state=json.load(var_file))
+            # a (compact) variants file recorded on a job's jobdata, where
+            # the first test suite is the one used
+            suites = varianter.CompactVariants.suites(load_variants)
+            if suites:
+                self.variants = varianter.Varianter(state=suites[0])
+            else:
+                with open(load_variants, 'r') as var_file:
+                    self.variants = varianter.Varianter(
+                        state=json.load(var_file))
         except IOError:
             LOG_UI.error("JSON serialized file '%s' could not be found or "
                          "is not readable", load_variants)
@@ -54,11 +54,12 @@ class NRun(CLICmd):
                                  parser=parser,
                                  long_arg='--parallel-tasks')
 
-        help_msg = 'Host and port for the status server'
+        help_msg = ('Host and port ("HOST:PORT"), or the path of a UNIX '
+                    'domain socket ("unix:PATH"), for the status server')
         settings.register_option(section='nrun.status_server',
                                  key='listen',
                                  default='127.0.0.1:8888',
-                                 metavar="HOST:PORT",
+                                 metavar="HOST:PORT|unix:PATH",
                                  help_msg=help_msg,
                                  parser=parser,
                                  long_arg='--status-server')
@@ -137,16 +138,16 @@ class NRun(CLICmd):
 
         try:
             if config.get('nrun.spawner') == 'podman':
-                if not os.path.exists(PodmanSpawner.PODMAN_BIN):
+                self.spawner = PodmanSpawner(config)  # pylint: disable=W0201
+                if not os.path.exists(self.spawner.podman_bin):
                     msg = ('Podman Spawner selected, but podman binary "%s" '
                            'is not available on the system.  Please install '
                            'podman before attempting to use this feature.')
-                    msg %= PodmanSpawner.PODMAN_BIN
+                    msg %= self.spawner.podman_bin
                     LOG_UI.error(msg)
                     sys.exit(exit_codes.AVOCADO_JOB_FAIL)
-                self.spawner = PodmanSpawner()  # pylint: disable=W0201
             elif config.get('nrun.spawner') == 'process':
-                self.spawner = ProcessSpawner()  # pylint: disable=W0201
+                self.spawner = ProcessSpawner(config)  # pylint: disable=W0201
             else:
                 LOG_UI.error("Spawner not implemented or invalid.")
                 sys.exit(exit_codes.AVOCADO_JOB_FAIL)
@@ -163,6 +164,7 @@ class NRun(CLICmd):
             loop = asyncio.get_event_loop()
             loop.run_until_complete(self.spawn_tasks(parallel_tasks))
             loop.run_until_complete(self.status_server.wait())
+            loop.run_until_complete(self.spawner.cleanup())
             self.report_results()
             exit_code = exit_codes.AVOCADO_ALL_OK
             if self.status_server.result.get('fail') is not None:
@@ -19,7 +19,8 @@ Base Test Runner Plugins.
 import argparse
 import sys
 
-from avocado.core import exit_codes, job, loader, output, parser_common_args
+from avocado.core import (exit_codes, job, loader, output, parser_common_args,
+                          tracing)
 from avocado.core.dispatcher import JobPrePostDispatcher
 from avocado.core.output import LOG_UI
 from avocado.core.plugin_interfaces import CLICmd, Init
@@ -167,6 +168,11 @@ class Run(CLICmd):
                                          parser=parser,
                                          long_arg='--job-timeout')
 
+        settings.add_argparser_to_option(namespace='job.run.trace',
+                                         parser=parser,
+                                         action='store_true',
+                                         long_arg='--trace')
+
         help_msg = 'Enable the job interruption on first failed test.'
         settings.register_option(section='run',
                                  key='failfast',
@@ -187,6 +193,34 @@ class Run(CLICmd):
                                  parser=parser,
                                  long_arg='--keep-tmp')
 
+        help_msg = ('Run Python unittests in long lived worker processes, '
+                    'one per module, instead of starting a new Python '
+                    'interpreter for each test.  Test modules are imported '
+                    'only once, so state may leak between tests of the '
+                    'same module. Only used by the legacy runner.')
+        settings.register_option(section='run',
+                                 key='python_unittest_batch',
+                                 default=False,
+                                 key_type=bool,
+                                 action='store_true',
+                                 help_msg=help_msg,
+                                 parser=parser,
+                                 long_arg='--python-unittest-batch')
+
+        help_msg = ('Import the modules of INSTRUMENTED tests once, in the '
+                    'job process, before running the tests, so that test '
+                    'processes inherit them instead of importing them '
+                    'again.  Import time side effects will happen in the '
+                    'job process. Only used by the legacy runner.')
+        settings.register_option(section='run',
+                                 key='preload_test_modules',
+                                 default=False,
+                                 key_type=bool,
+                                 action='store_true',
+                                 help_msg=help_msg,
+                                 parser=parser,
+                                 long_arg='--preload-test-modules')
+
         help_msg = ('Force the job execution, even if some of the test '
                     'references are not resolved to tests. "on" and '
                     '"off" will be deprecated soon.')
@@ -294,6 +328,10 @@ class Run(CLICmd):
                 LOG_UI.error('Unique Job ID needs to be a 40 digit hex number')
                 sys.exit(exit_codes.AVOCADO_FAIL)
 
+        if config.get('job.run.trace'):
+            # the test suite is created before the job, so the events
+            # are kept in memory until the job results directory exists
+            tracing.TRACER.enable()
         try:
             suite = TestSuite.from_config(config, name='suite01')
             if suite.size == 0:
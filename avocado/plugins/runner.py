@@ -25,15 +25,16 @@ import sys
 import time
 from queue import Full as queueFullException
 
-from avocado.core import output, tree, varianter
+from avocado.core import output, tracing, tree, varianter
 from avocado.core.loader import loader
 from avocado.core.output import LOG_JOB as TEST_LOG
 from avocado.core.output import LOG_UI as APP_LOG
 from avocado.core.plugin_interfaces import Runner
 from avocado.core.runner import TestStatus, add_runner_failure
-from avocado.core.test import TimeOutSkipTest
+from avocado.core.test import PythonUnittest, TimeOutSkipTest
 from avocado.core.test_id import TestID
 from avocado.core.teststatus import mapping, user_facing_status
+from avocado.core.unittest_worker import UnittestWorkerPool
 from avocado.utils import process, stacktrace, wait
 
 
@@ -87,7 +88,9 @@ class TestRunner(Runner):
         # `multiprocessing.Process()`
         os.dup2(sys.stdin.fileno(), 0)
 
-        instance = loader.load_test(test_factory)
+        tracing.TRACER.set_process_name(str(test_factory[1].get('name')))
+        with tracing.span('load_test', 'test'):
+            instance = loader.load_test(test_factory)
         if instance.runner_queue is None:
             instance.set_runner_queue(queue)
         early_state = instance.get_state()
@@ -114,7 +117,8 @@ class TestRunner(Runner):
                         TEST_LOG.info('  %s: %s', source, location)
                 TEST_LOG.info('')
         try:
-            instance.run_avocado()
+            with tracing.span(str(instance.name), 'test'):
+                instance.run_avocado()
         finally:
             try:
                 state = instance.get_state()
@@ -294,8 +298,11 @@ class TestRunner(Runner):
         if "params" not in template[1]:
             factory = [template[0], template[1].copy()]
             if test_parameters and empty_variants:
-                var[0] = tree.TreeNode().get_node("/", True)
-                var[0].value = test_parameters
+                # the variants are shared by all tests, so the node with
+                # the parameters replaces the empty one on a new list
+                node = tree.TreeNode().get_node("/", True)
+                node.value = test_parameters
+                var = [node] + var[1:]
                 paths = ["/"]
             factory[1]["params"] = (var, paths)
             return factory, variant
@@ -313,27 +320,21 @@ class TestRunner(Runner):
                           "variant_id": varianter.generate_variant_id(var),
                           "paths": paths}
 
-    def _iter_suite(self, test_suite, execution_order):
+    @staticmethod
+    def _preload_test_modules(test_suite):
         """
-        Iterates through test_suite and variants in defined order
+        Imports, in the job process, the modules of INSTRUMENTED tests
 
         :param test_suite: a TestSuite object to run
-        :param execution_order: way of iterating through tests/variants
-        :return: generator yielding tuple(test_factory, variant)
         """
-        if execution_order == "variants-per-test":
-            return (self._template_to_factory(test_suite.test_parameters,
-                                              template, variant)
-                    for template in test_suite.tests
-                    for variant in test_suite.variants.itertests())
-        elif execution_order == "tests-per-variant":
-            return (self._template_to_factory(test_suite.test_parameters,
-                                              template, variant)
-                    for variant in test_suite.variants.itertests()
-                    for template in test_suite.tests)
-        else:
-            raise NotImplementedError("Suite_order %s is not supported"
-                                      % execution_order)
+        for test_class, test_parameters in test_suite.tests:
+            test_path = test_parameters.get('modulePath')
+            if not isinstance(test_class, str) or test_path is None:
+                continue
+            import_time = loader.preload_test_module(test_path)
+            if import_time is not None:
+                TEST_LOG.debug('Preloaded test module "%s" in %.2f s',
+                               test_path, import_time)
 
     def run_suite(self, job, test_suite):
         """
@@ -347,22 +348,34 @@ class TestRunner(Runner):
         replay_map = job.config.get('replay_map')
         execution_order = job.config.get('run.execution_order')
         queue = multiprocessing.SimpleQueue()
+        if job.config.get('run.python_unittest_batch'):
+            unittest_workers = UnittestWorkerPool()
+        else:
+            unittest_workers = None
         if job.timeout > 0:
             deadline = time.time() + job.timeout
         else:
             deadline = None
 
-        test_result_total = test_suite.variants.get_number_of_tests(test_suite.tests)
+        # only the modules preloaded for this suite are used by its tests
+        loader.clear_preloaded_modules()
+        if job.config.get('run.preload_test_modules'):
+            self._preload_test_modules(test_suite)
+
+        # the tests are combined with the variants, and turned into test
+        # factories, one at a time, as they are run
+        matrix = test_suite.get_matrix(execution_order)
+        test_result_total = len(matrix)
         no_digits = len(str(test_result_total))
         job.result.tests_total = test_result_total
         index = 1
         try:
-            for test_factory in test_suite.tests:
-                test_factory[1]["base_logdir"] = job.logdir
-                test_factory[1]["job"] = job
-            for test_factory, variant in self._iter_suite(test_suite,
-                                                          execution_order):
+            for template, variant in matrix:
+                test_factory, variant = self._template_to_factory(
+                    test_suite.test_parameters, template, variant)
                 test_parameters = test_factory[1]
+                test_parameters["base_logdir"] = job.logdir
+                test_parameters["job"] = job
                 name = test_parameters.get("name")
                 test_parameters["name"] = TestID(index, name,
                                                  variant,
@@ -380,6 +393,12 @@ class TestRunner(Runner):
                         test_parameters["methodName"] = "test"
                         test_factory = (replay_map[index], test_parameters)
 
+                    if (unittest_workers is not None and
+                            test_factory[0] is PythonUnittest):
+                        # the worker is inherited by the forked test process
+                        module = name.rsplit('.', 2)[0]
+                        test_parameters["unittest_worker"] = unittest_workers.get(
+                            test_parameters.get("test_dir"), module)
                     if not self.run_test(job, test_factory, queue, summary,
                                          deadline):
                         break
@@ -387,6 +406,10 @@ class TestRunner(Runner):
         except KeyboardInterrupt:
             TEST_LOG.error('Job interrupted by ctrl+c.')
             summary.add('INTERRUPTED')
+        finally:
+            if unittest_workers is not None:
+                unittest_workers.stop()
+            loader.clear_preloaded_modules()
 
         job.result.end_tests()
         job.funcatexit.run()
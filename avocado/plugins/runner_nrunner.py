@@ -16,16 +16,118 @@
 NRunner based implementation of job compliant runner
 """
 
+import asyncio
 import json
+import multiprocessing
 import os
+import shutil
 import time
-from copy import copy
 
-from avocado.core import nrunner
+from avocado.core import nrunner, status_server, tracing
+from avocado.core.dispatcher import SpawnerDispatcher
+from avocado.core.output import LOG_JOB
+from avocado.core.plugin_interfaces import CLI, Init
 from avocado.core.plugin_interfaces import Runner as RunnerInterface
+from avocado.core.settings import settings
 from avocado.core.status.repo import StatusRepo
+from avocado.core.task import statemachine
+from avocado.core.task.runtime import RuntimeTask
 from avocado.core.test_id import TestID
 
+#: The test result, and the reason for it, of tasks that did not
+#: complete normally, keyed by the status given by the state machine
+RUNTIME_STATUS_RESULTS = {
+    statemachine.FAILED_ON_TRIAGE: (
+        'ERROR', 'Task requirements are not available'),
+    statemachine.FAILED_ON_START: (
+        'ERROR', 'Task could not be spawned'),
+    statemachine.FAILED_WITH_TIMEOUT: (
+        'INTERRUPTED', 'Task did not finish within its timeout'),
+    statemachine.FAILED_WITHOUT_STATUS: (
+        'ERROR', 'Task finished without reporting its result'),
+    statemachine.NOT_STARTED: (
+        'SKIP', 'Task not started because the job timeout was reached'),
+}
+
+
+class RunnerInit(Init):
+
+    name = 'nrunner'
+    description = 'nrunner initialization'
+
+    def initialize(self):
+        help_msg = ('Maximum number of tasks running in parallel.  You can '
+                    'disable parallel execution by setting this to 1')
+        settings.register_option(section='nrunner',
+                                 key='max_parallel_tasks',
+                                 default=multiprocessing.cpu_count(),
+                                 key_type=int,
+                                 help_msg=help_msg)
+
+        help_msg = ('Spawn tasks in a specific spawner, from the ones '
+                    'listed by "avocado plugins", such as "process" and '
+                    '"podman"')
+        settings.register_option(section='nrunner',
+                                 key='spawner',
+                                 default='process',
+                                 help_msg=help_msg)
+
+        help_msg = ('URI ("HOST:PORT", or "unix:PATH" for an UNIX domain '
+                    'socket) the status server listens on.  Defaults to an '
+                    'UNIX domain socket on the job temporary directory')
+        settings.register_option(section='nrunner',
+                                 key='status_server_uri',
+                                 default=None,
+                                 help_msg=help_msg)
+
+        help_msg = ('Maximum time (in seconds) a task is allowed to run '
+                    'for, after which it is interrupted.  Values <= zero '
+                    'means "no timeout"')
+        settings.register_option(section='nrunner',
+                                 key='task_timeout',
+                                 default=0,
+                                 key_type=int,
+                                 help_msg=help_msg)
+
+
+class RunnerCLI(CLI):
+
+    name = 'nrunner'
+    description = 'nrunner command line options for "run"'
+
+    def configure(self, parser):
+        parser = parser.subcommands.choices.get('run', None)
+        if parser is None:
+            return
+
+        parser = parser.add_argument_group('nrunner specific options')
+        settings.add_argparser_to_option(
+            namespace='nrunner.max_parallel_tasks',
+            parser=parser,
+            long_arg='--nrunner-max-parallel-tasks',
+            metavar='NUMBER_OF_TASKS')
+
+        settings.add_argparser_to_option(
+            namespace='nrunner.spawner',
+            parser=parser,
+            long_arg='--nrunner-spawner',
+            metavar='SPAWNER')
+
+        settings.add_argparser_to_option(
+            namespace='nrunner.status_server_uri',
+            parser=parser,
+            long_arg='--nrunner-status-server-uri',
+            metavar='HOST:PORT|unix:PATH')
+
+        settings.add_argparser_to_option(
+            namespace='nrunner.task_timeout',
+            parser=parser,
+            long_arg='--nrunner-task-timeout',
+            metavar='SECONDS')
+
+    def run(self, config):
+        pass
+
 
 class Runner(RunnerInterface):
 
@@ -36,10 +138,9 @@ class Runner(RunnerInterface):
         with open(filename, mode) as fp:
             fp.write(buff)
 
-    def _populate_task_logdir(self, base_path, task, statuses, debug=False):
-        # We are copying here to avoid printing duplicated information
-        local_statuses = copy(statuses)
-        last = local_statuses[-1]
+    def _populate_task_logdir(self, base_path, task, status_repo,
+                              debug=False):
+        last = status_repo.get_latest_task_data(task.identifier) or {}
         try:
             stdout = last.pop('stdout')
         except KeyError:
@@ -53,92 +154,182 @@ class Runner(RunnerInterface):
         task_path = os.path.join(base_path, task.identifier.replace('/', '_'))
         os.makedirs(task_path, exist_ok=True)
 
-        # Save stdout and stderr
-        if stdout is not None:
-            stdout_file = os.path.join(task_path, 'stdout')
-            self._save_to_file(stdout_file, stdout)
-        if stderr is not None:
-            stderr_file = os.path.join(task_path, 'stderr')
-            self._save_to_file(stderr_file, stderr)
+        # Save stdout and stderr, preferably from the complete output
+        # saved by the runner, as the one on the status may be truncated
+        for name, content in (('stdout', stdout), ('stderr', stderr)):
+            output_file = os.path.join(task_path, name)
+            output_path = last.get('%s_path' % name)
+            if output_path is not None and os.path.isfile(output_path):
+                shutil.copyfile(output_path, output_file)
+            elif content is not None:
+                self._save_to_file(output_file, content)
 
         # Save debug
         if debug:
             debug = os.path.join(task_path, 'debug')
+            # All messages are read back from the status journal, but the
+            # output is only saved once, on the files above
+            statuses = status_repo.get_task_data(task.identifier) or []
+            if statuses:
+                statuses[-1] = last
             with open(debug, 'w') as fp:
-                json.dump(local_statuses, fp)
+                json.dump(statuses, fp)
 
+        # The output dir is created, and reported, by the spawned runner
+        task_summary = status_repo.get_task_summary(task.identifier)
+        output_dir = task.output_dir
+        if task_summary is not None and task_summary.output_dir is not None:
+            output_dir = task_summary.output_dir
         data_file = os.path.join(task_path, 'data')
         with open(data_file, 'w') as fp:
-            fp.write("{}\n".format(task.output_dir))
+            fp.write("{}\n".format(output_dir))
+
+    def _report_task(self, job, runtime_task, status_repo, early_states):
+        task = runtime_task.task
+        index, early_state = early_states[task.identifier]
+        task_summary = status_repo.get_task_summary(task.identifier)
+        latest = status_repo.get_latest_task_data(task.identifier) or {}
+
+        # since 358e800e81 all runners all produce the result in a key called
+        # 'result', instead of 'status'.  But the Avocado result plugins rely
+        # on the current runner approach
+        if runtime_task.status is None and task_summary.result is not None:
+            test_state = {'status': task_summary.result.upper()}
+        else:
+            status, fail_reason = RUNTIME_STATUS_RESULTS.get(
+                runtime_task.status, ('ERROR', runtime_task.status))
+            test_state = {'status': status, 'fail_reason': fail_reason}
+        test_state.update(early_state)
+
+        time_start = time_end = time.time()
+        # the status messages may have been lost or be late, but the
+        # task was certainly not running before it was spawned
+        if runtime_task.spawned is not None:
+            time_start = runtime_task.spawned
+        if task_summary is not None and task_summary.time_start is not None:
+            time_start = min(time_start, task_summary.time_start)
+            if runtime_task.status is None:
+                time_end = task_summary.time_end
+        test_state['time_start'] = time_start
+        test_state['time_end'] = time_end
+        test_state['time_elapsed'] = time_end - time_start
+        test_state['resource_usage'] = latest.get('resource_usage')
+
+        # fake log dir, needed by some result plugins such as HTML
+        test_state['logdir'] = ''
+
+        # Populate task dir
+        base_path = os.path.join(job.logdir, 'test-results')
+        self._populate_task_logdir(base_path,
+                                   task,
+                                   status_repo,
+                                   job.config.get('core.debug'))
+
+        if tracing.TRACER.enabled:
+            # tasks run in parallel, so each one gets its own lane
+            tracing.TRACER.emit({'name': task.identifier,
+                                 'cat': 'test',
+                                 'ph': 'X',
+                                 'ts': int(time_start * 1000000),
+                                 'dur': int((time_end - time_start) * 1000000),
+                                 'tid': index,
+                                 'args': {'kind': task.runnable.kind}})
+
+        # tasks finish in any order, and the start is only reported now,
+        # so that the output of each test is not mixed with others
+        job.result.start_test(early_state)
+        job.result_events_dispatcher.map_method('start_test',
+                                                job.result,
+                                                early_state)
+        job.result.check_test(test_state)
+        job.result_events_dispatcher.map_method('end_test',
+                                                job.result,
+                                                test_state)
+
+    @staticmethod
+    def _get_status_server_uri(job):
+        uri = job.config.get('nrunner.status_server_uri')
+        if uri is None:
+            uri = '%s%s' % (nrunner.STATUS_URI_UNIX_PREFIX,
+                            os.path.join(job.tmpdir, 'status.sock'))
+        return uri
 
     def run_suite(self, job, test_suite):
         summary = set()
         if job.timeout > 0:
-            deadline = time.time() + job.timeout
+            job_deadline = time.monotonic() + job.timeout
         else:
-            deadline = None
+            job_deadline = None
 
         test_suite.tests, _ = nrunner.check_tasks_requirements(test_suite.tests)
         job.result.tests_total = test_suite.size  # no support for variants yet
-        result_dispatcher = job.result_events_dispatcher
-        no_digits = len(str(len(test_suite)))
-        status_repo = StatusRepo()
 
-        for index, task in enumerate(test_suite.tests, start=1):
-            if deadline is not None and time.time() > deadline:
-                break
+        spawner_name = job.config.get('nrunner.spawner')
+        try:
+            spawner = SpawnerDispatcher(job.config)[spawner_name].obj
+        except KeyError:
+            LOG_JOB.error('Spawner "%s" not found or not enabled',
+                          spawner_name)
+            summary.add('FAIL')
+            return summary
 
-            task.known_runners = nrunner.RUNNERS_REGISTRY_PYTHON_CLASS
+        status_server_uri = self._get_status_server_uri(job)
+        no_digits = len(str(len(test_suite)))
+        early_states = {}
+        runtime_tasks = []
+        for index, task in enumerate(test_suite.tests, start=1):
             # this is all rubbish data
             test_id = TestID("{}-{}".format(test_suite.name, index),
                              task.runnable.uri,
                              None,
                              no_digits)
             task.identifier = str(test_id)
-            early_state = {
+            task.status_services = [
+                nrunner.TaskStatusService(status_server_uri)]
+            early_states[task.identifier] = (index, {
                 'name': test_id,
                 'job_logdir': job.logdir,
                 'job_unique_id': job.unique_id,
-            }
-            job.result.start_test(early_state)
-            job.result_events_dispatcher.map_method('start_test',
-                                                    job.result,
-                                                    early_state)
-
-            task.status_services = []
-            for status in task.run():
-                status_repo.process_message(status)
-                result_dispatcher.map_method('test_progress', False)
-
-                if status['status'] not in ["started", "running"]:
-                    break
-
-            # test execution time is currently missing
-            # since 358e800e81 all runners all produce the result in a key called
-            # 'result', instead of 'status'.  But the Avocado result plugins rely
-            # on the current runner approach
-            this_task_data = status_repo.get_task_data(task.identifier)
-            test_state = {'status': this_task_data[-1]['result'].upper()}
-            test_state.update(early_state)
-
-            time_start = this_task_data[0]['time']
-            time_end = this_task_data[-1]['time']
-            time_elapsed = time_end - time_start
-            test_state['time_start'] = time_start
-            test_state['time_end'] = time_end
-            test_state['time_elapsed'] = time_elapsed
-
-            # fake log dir, needed by some result plugins such as HTML
-            test_state['logdir'] = ''
-
-            # Populate task dir
-            base_path = os.path.join(job.logdir, 'test-results')
-            self._populate_task_logdir(base_path,
-                                       task,
-                                       this_task_data,
-                                       job.config.get('core.debug'))
-
-            job.result.check_test(test_state)
-            result_dispatcher.map_method('end_test', job.result, test_state)
+            })
+            runtime_tasks.append(RuntimeTask(task))
+
+        status_repo = StatusRepo()
+        server = status_server.StatusServer(status_server_uri,
+                                            repo=status_repo)
+        state_machine = statemachine.TaskStateMachine(
+            runtime_tasks,
+            status_repo,
+            lambda runtime_task: self._report_task(job, runtime_task,
+                                                   status_repo,
+                                                   early_states))
+
+        max_running = min(job.config.get('nrunner.max_parallel_tasks'),
+                          len(runtime_tasks))
+        task_timeout = job.config.get('nrunner.task_timeout')
+        if task_timeout <= 0:
+            task_timeout = None
+        workers = [statemachine.Worker(state_machine, spawner, max_running,
+                                       task_timeout, job_deadline).run()
+                   for _ in range(max_running)]
+
+        loop = asyncio.get_event_loop()
+        server.start()
+        try:
+            loop.run_until_complete(asyncio.gather(*workers))
+        except KeyboardInterrupt:
+            LOG_JOB.error('Job interrupted by ctrl+c.')
+            summary.add('INTERRUPTED')
+            for runtime_task in state_machine.started:
+                loop.run_until_complete(
+                    spawner.terminate_task(runtime_task.task))
+        finally:
+            loop.run_until_complete(spawner.cleanup())
+            server.close()
+            loop.run_until_complete(server.wait())
+            status_repo.close()
+
+        if any(runtime_task.status == statemachine.FAILED_WITH_TIMEOUT
+               for runtime_task in state_machine.finished):
+            summary.add('INTERRUPTED')
         job.result.end_tests()
         return summary
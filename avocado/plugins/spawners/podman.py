@@ -1,12 +1,54 @@
 import asyncio
 import json
 import os
+import shlex
 import subprocess
+import time
 
-from avocado.core.plugin_interfaces import Spawner
+from avocado.core.nrunner import STATUS_URI_UNIX_PREFIX
+from avocado.core.plugin_interfaces import Init, Spawner
+from avocado.core.settings import settings
 from avocado.core.spawners.common import SpawnerMixin, SpawnMethod
 
 
+class PodmanSpawnerInit(Init):
+
+    name = 'podman'
+    description = 'Podman (container) based spawner initialization'
+
+    def initialize(self):
+        section = 'spawner.podman'
+
+        help_msg = 'Path to the podman binary'
+        settings.register_option(section=section,
+                                 key='bin',
+                                 default=PodmanSpawner.PODMAN_BIN,
+                                 help_msg=help_msg)
+
+        help_msg = 'Image used to create the containers tasks are run in'
+        settings.register_option(section=section,
+                                 key='image',
+                                 default=PodmanSpawner.IMAGE,
+                                 help_msg=help_msg)
+
+        help_msg = ('Command of the runner already installed on the image, '
+                    'such as "avocado-runner".  If not set, the standalone '
+                    'runner is copied into the containers')
+        settings.register_option(section=section,
+                                 key='image_runner',
+                                 default=None,
+                                 help_msg=help_msg)
+
+        help_msg = ('Number of containers kept running, and reused to run '
+                    'tasks, one at a time each.  If 0, a new container is '
+                    'created for each task')
+        settings.register_option(section=section,
+                                 key='pool_size',
+                                 default=0,
+                                 key_type=int,
+                                 help_msg=help_msg)
+
+
 class PodmanSpawner(Spawner, SpawnerMixin):
 
     description = 'Podman (container) based spawner'
@@ -14,80 +56,230 @@ class PodmanSpawner(Spawner, SpawnerMixin):
     IMAGE = 'fedora:31'
     PODMAN_BIN = "/usr/bin/podman"
 
-    @staticmethod
-    def is_task_alive(task):
-        if task.spawn_handle is None:
-            return False
+    #: Where the standalone runner is copied to, inside the containers
+    ENTRY_POINT_CMD = '/tmp/avocado-runner'
 
-        cmd = [PodmanSpawner.PODMAN_BIN, "ps", "--all", "--format={{.State}}",
-               "--filter=id=%s" % task.spawn_handle]
-        process = subprocess.Popen(cmd,
-                                   stdin=subprocess.DEVNULL,
-                                   stdout=subprocess.PIPE,
-                                   stderr=subprocess.DEVNULL)
-        out, _ = process.communicate()
-        # we have to be lenient and allow for the configured state to
-        # be considered "alive" because it happens before the
-        # container transitions into "running"
-        return out in [b'configured\n', b'running\n']
+    #: The command that keeps the containers on the pool running
+    POOL_CONTAINER_CMD = ['sleep', 'infinity']
 
-    async def spawn_task(self, task):
-        entry_point_cmd = '/tmp/avocado-runner'
-        entry_point_args = task.get_command_args()
-        entry_point_args.insert(0, "task-run")
-        entry_point_args.insert(0, entry_point_cmd)
-        entry_point = json.dumps(entry_point_args)
-        entry_point_arg = "--entrypoint=" + entry_point
+    #: For how long (in seconds) the states of the containers, queried
+    #: for all of them at once, are reused when checking if tasks are alive
+    STATES_INTERVAL = 1.0
+
+    def __init__(self, config=None):
+        super(PodmanSpawner, self).__init__(config)
+        if config is None:
+            config = settings.as_dict()
+        self.podman_bin = config.get('spawner.podman.bin', self.PODMAN_BIN)
+        self.image = config.get('spawner.podman.image', self.IMAGE)
+        self.image_runner = config.get('spawner.podman.image_runner')
+        self.pool_size = config.get('spawner.podman.pool_size', 0)
+        self._states = None
+        self._states_time = None
+        # pool of idle containers, created on the first spawned task
+        self._pool = None
+        self._pool_lock = asyncio.Lock()
+        self._pool_containers = []
+        # the containers the tasks spawned on the pool were run in
+        self._pool_tasks = {}
+
+    def _runner_cmd(self):
+        if self.image_runner:
+            return shlex.split(self.image_runner)
+        return [self.ENTRY_POINT_CMD]
+
+    @staticmethod
+    def _volume_args(task):
+        # status servers listening on UNIX domain sockets are reached
+        # by sharing the directory of the socket with the container
+        volume_args = []
+        for status_service in task.status_services:
+            if status_service.uri.startswith(STATUS_URI_UNIX_PREFIX):
+                socket_dir = os.path.dirname(
+                    status_service.uri[len(STATUS_URI_UNIX_PREFIX):])
+                volume_args.append("--volume=%s:%s" % (socket_dir,
+                                                       socket_dir))
+        return volume_args
+
+    async def _podman(self, *args):
+        """Runs a podman command, returning its output, or None on failure."""
         try:
             # pylint: disable=E1133
             proc = await asyncio.create_subprocess_exec(
-                self.PODMAN_BIN, "create",
-                "--net=host",
-                entry_point_arg,
-                self.IMAGE,
+                self.podman_bin,
+                *args,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE)
         except (FileNotFoundError, PermissionError):
-            return False
+            return None
 
-        await proc.wait()
+        stdout, _ = await proc.communicate()
         if proc.returncode != 0:
-            return False
-
-        stdout = await proc.stdout.read()
-        container_id = stdout.decode().strip()
-
-        task.spawn_handle = container_id
+            return None
+        return stdout
 
+    async def _copy_runner(self, container_id):
         # Currently limited to avocado-runner, we'll expand on that
         # when the runner requirements system is in place
+        if self.image_runner:
+            return True
         this_path = os.path.abspath(__file__)
         base_path = os.path.dirname(os.path.dirname(this_path))
         avocado_runner_path = os.path.join(base_path, 'core', 'nrunner.py')
+        copied = await self._podman(
+            "cp",
+            avocado_runner_path,
+            "%s:%s" % (container_id, self.ENTRY_POINT_CMD))
+        return copied is not None
+
+    def _container_states(self, refresh=False):
+        """Returns the states of all containers, keyed by their IDs.
+
+        A single "podman ps" is run for all containers, and its result is
+        reused for :attr:`STATES_INTERVAL` seconds, unless refreshed.
+        """
+        now = time.monotonic()
+        if (refresh or self._states is None or
+                now - self._states_time > self.STATES_INTERVAL):
+            cmd = [self.podman_bin, "ps", "--all", "--no-trunc",
+                   "--format={{.ID}} {{.State}}"]
+            try:
+                out = subprocess.run(cmd,
+                                     stdin=subprocess.DEVNULL,
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL,
+                                     check=False).stdout
+            except (FileNotFoundError, PermissionError):
+                out = b''
+            self._states = {}
+            for line in out.decode().splitlines():
+                try:
+                    container_id, state = line.split()
+                except ValueError:
+                    continue
+                self._states[container_id] = state.lower()
+            self._states_time = now
+        return self._states
+
+    def is_task_alive(self, task):  # pylint: disable=W0221
+        if task.spawn_handle is None:
+            return False
+
+        if task in self._pool_tasks:
+            return task.spawn_handle.returncode is None
+
+        states = self._container_states()
+        if task.spawn_handle not in states:
+            # the container may have been created after the last check
+            states = self._container_states(refresh=True)
+        # we have to be lenient and allow for the configured (or created)
+        # state to be considered "alive" because it happens before the
+        # container transitions into "running"
+        return states.get(task.spawn_handle) in ('configured', 'created',
+                                                 'running')
+
+    async def _start_pool_container(self, task):
+        entry_point_arg = "--entrypoint=" + json.dumps(self.POOL_CONTAINER_CMD)
+        out = await self._podman("run", "--detach", "--net=host",
+                                 *self._volume_args(task),
+                                 entry_point_arg,
+                                 self.image)
+        if out is None:
+            return None
+        container_id = out.decode().strip()
+        if not await self._copy_runner(container_id):
+            await self._podman("rm", "--force", container_id)
+            return None
+        self._pool_containers.append(container_id)
+        return container_id
+
+    async def _acquire_pool_container(self, task):
+        async with self._pool_lock:
+            if self._pool is None:
+                self._pool = asyncio.Queue()
+                containers = await asyncio.gather(
+                    *[self._start_pool_container(task)
+                      for _ in range(self.pool_size)])
+                for container_id in containers:
+                    if container_id is not None:
+                        self._pool.put_nowait(container_id)
+            if not self._pool_containers:
+                return None
+        container_id = await self._pool.get()
+        if container_id is None:
+            # the pool is gone, so let the other waiting tasks know too
+            self._pool.put_nowait(None)
+        return container_id
+
+    async def _collect_pool_task(self, task):
+        await task.spawn_handle.wait()
+        container_id = self._pool_tasks[task]
+        if container_id in self._pool_containers:
+            self._pool.put_nowait(container_id)
+
+    async def _spawn_pool_task(self, task):
+        container_id = await self._acquire_pool_container(task)
+        if container_id is None:
+            return False
         try:
             # pylint: disable=E1133
-            proc = await asyncio.create_subprocess_exec(
-                self.PODMAN_BIN,
-                "cp",
-                avocado_runner_path,
-                "%s:%s" % (container_id, entry_point_cmd))
+            task.spawn_handle = await asyncio.create_subprocess_exec(
+                self.podman_bin, "exec", container_id,
+                *self._runner_cmd(), "task-run", *task.get_command_args(),
+                # the status messages are sent to the status server
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL)
         except (FileNotFoundError, PermissionError):
+            self._pool.put_nowait(container_id)
             return False
+        self._pool_tasks[task] = container_id
+        asyncio.ensure_future(self._collect_pool_task(task))
+        return True
 
-        await proc.wait()
-        if proc.returncode != 0:
+    async def spawn_task(self, task):
+        if self.pool_size > 0:
+            return await self._spawn_pool_task(task)
+
+        entry_point_args = self._runner_cmd()
+        entry_point_args.append("task-run")
+        entry_point_args.extend(task.get_command_args())
+        entry_point_arg = "--entrypoint=" + json.dumps(entry_point_args)
+        out = await self._podman("create",
+                                 "--net=host",
+                                 *self._volume_args(task),
+                                 entry_point_arg,
+                                 self.image)
+        if out is None:
             return False
 
-        try:
-            # pylint: disable=E1133
-            proc = await asyncio.create_subprocess_exec(
-                self.PODMAN_BIN,
-                "start",
-                container_id,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE)
-        except (FileNotFoundError, PermissionError):
+        container_id = out.decode().strip()
+        task.spawn_handle = container_id
+
+        if not await self._copy_runner(container_id):
             return False
 
-        await proc.wait()
-        return proc.returncode == 0
+        return await self._podman("start", container_id) is not None
+
+    async def terminate_task(self, task):
+        if task.spawn_handle is None:
+            return
+        container_id = self._pool_tasks.get(task)
+        if container_id is None:
+            await self._podman("kill", task.spawn_handle)
+            return
+        # whatever the task left running on the container goes with it,
+        # and a new container takes its place on the pool
+        self._pool_containers.remove(container_id)
+        await self._podman("rm", "--force", container_id)
+        container_id = await self._start_pool_container(task)
+        if container_id is not None:
+            self._pool.put_nowait(container_id)
+        elif not self._pool_containers:
+            # no container will ever be returned to the pool, so the
+            # tasks waiting for one would otherwise wait forever
+            self._pool.put_nowait(None)
+
+    async def cleanup(self):
+        containers, self._pool_containers = self._pool_containers, []
+        if containers:
+            await self._podman("rm", "--force", *containers)
@@ -1,4 +1,6 @@
 import asyncio
+import os
+import signal
 
 from avocado.core.plugin_interfaces import Spawner
 from avocado.core.spawners.common import SpawnerMixin, SpawnMethod
@@ -9,6 +11,10 @@ class ProcessSpawner(Spawner, SpawnerMixin):
     description = 'Process based spawner'
     METHODS = [SpawnMethod.STANDALONE_EXECUTABLE]
 
+    #: How long (in seconds) to wait for a task to finish after being
+    #: asked to terminate, before it gets killed
+    TERMINATE_TIMEOUT = 1.0
+
     async def _collect_task(self, task_handle):
         await task_handle.wait()
 
@@ -28,9 +34,29 @@ class ProcessSpawner(Spawner, SpawnerMixin):
             task.spawn_handle = await asyncio.create_subprocess_exec(
                 runner,
                 *args,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE)
+                # the status messages printed by the runner are also sent
+                # to the status server, so nothing needs to read them here
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+                start_new_session=True)
         except (FileNotFoundError, PermissionError):
             return False
         asyncio.ensure_future(self._collect_task(task.spawn_handle))
         return True
+
+    async def terminate_task(self, task):
+        if not self.is_task_alive(task):
+            return
+        # the runner and the processes it started (such as the test) are
+        # all on the session (and process group) created when spawning
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(task.spawn_handle.pid, sig)
+            except ProcessLookupError:
+                return
+            try:
+                await asyncio.wait_for(task.spawn_handle.wait(),
+                                       self.TERMINATE_TIMEOUT)
+                return
+            except asyncio.TimeoutError:
+                pass
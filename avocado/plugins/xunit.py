@@ -60,6 +60,28 @@ class XUnitResult(Result):
         testcase.setAttribute('time', self._format_time(self._get_attr(state, 'time_elapsed')))
         return testcase
 
+    def _create_resource_usage_properties(self, document, tests):
+        """
+        Creates the properties with the resource usage of the tests
+
+        The JUnit schema only allows properties at the testsuite level,
+        so their names are given as "$TEST_NAME.resource_usage.$KEY".
+        """
+        properties = document.createElement('properties')
+        for test in tests:
+            usage = test.get('resource_usage')
+            if not usage:
+                continue
+            name = self._get_attr(test, 'name')
+            for key, value in sorted(usage.items()):
+                prop = document.createElement('property')
+                prop.setAttribute('name', '%s.resource_usage.%s' % (name, key))
+                prop.setAttribute('value', self._escape_attr(value))
+                properties.appendChild(prop)
+        if properties.hasChildNodes():
+            return properties
+        return None
+
     def _create_failure_or_error(self, document, test, element_type,
                                  max_log_size=None):
         element = document.createElement(element_type)
@@ -107,6 +129,10 @@ class XUnitResult(Result):
         testsuite.setAttribute('time', self._escape_attr(self._format_time(result.tests_total_time)))
         testsuite.setAttribute('timestamp', self._escape_attr(datetime.datetime.now().isoformat()))
         document.appendChild(testsuite)
+        properties = self._create_resource_usage_properties(document,
+                                                            result.tests)
+        if properties is not None:
+            testsuite.appendChild(properties)
         for test in result.tests:
             testcase = self._create_testcase_element(document, test)
             status = test.get('status', 'ERROR')
@@ -32,7 +32,7 @@ import urllib.parse
 from . import astring, crypto
 from . import path as utils_path
 from .download import url_download
-from .filelock import FileLock
+from .filelock import FcntlLock
 
 LOG = logging.getLogger('avocado.test')
 #: The default hash algorithm to use on asset cache operations
@@ -96,16 +96,34 @@ class Asset:
         self.relative_dir = os.path.join(self._get_relative_dir(),
                                          self.asset_name)
 
-    def _create_hash_file(self, asset_path):
+    def _create_hash_file(self, asset_path, algorithms=None):
         """
         Compute the hash of the asset file and add it to the CHECKSUM
         file.
 
         :param asset_path: full path of the asset file.
+        :param algorithms: other hash algorithms to record in the CHECKSUM
+                           file, besides the one used by this asset.
         """
-        result = crypto.hash_file(asset_path, algorithm=self.algorithm)
-        with open(self._get_hash_file(asset_path), 'w') as hash_file:
-            hash_file.write('%s %s\n' % (self.algorithm, result))
+        algorithms = sorted(set(algorithms or []) | {self.algorithm})
+        digests = crypto.hash_file_digests(asset_path, algorithms, cache=True)
+        hash_file_path = self._get_hash_file(asset_path)
+        # the hash file may be created while holding just a shared lock,
+        # so write it atomically to never expose a partial file to readers
+        temp = '%s.%s' % (hash_file_path,
+                          next(tempfile._get_candidate_names()))  # pylint: disable=W0212
+        try:
+            with open(temp, 'x') as hash_file:
+                for algorithm in algorithms:
+                    hash_file.write('%s %s\n' % (algorithm,
+                                                 digests[algorithm]))
+            os.rename(temp, hash_file_path)
+        except Exception:
+            try:
+                os.remove(temp)
+            except FileNotFoundError:
+                pass
+            raise
 
     def _create_metadata_file(self, asset_file):
         """
@@ -137,7 +155,7 @@ class Asset:
             url_download(url_obj.geturl(), temp)
 
             # Acquire lock only after download the file
-            with FileLock(asset_path, 1):
+            with FcntlLock(asset_path, 1):
                 shutil.copy(temp, asset_path)
                 self._create_hash_file(asset_path)
                 return self._verify_hash(asset_path)
@@ -163,24 +181,42 @@ class Asset:
         """
         Read the CHECKSUM file from the asset and return the hash.
 
+        When the CHECKSUM file does not contain a hash for the algorithm
+        of this asset, it's computed and added to the CHECKSUM file.
+
         :param asset_path: full path of the asset file.
         :returns: the hash, if it exists.
         :rtype: str
         """
-        discovered = None
         hash_file = self._get_hash_file(asset_path)
         if not os.path.isfile(hash_file):
             self._create_hash_file(asset_path)
 
-        with open(hash_file, 'r') as hash_file:
-            for line in hash_file:
-                # md5 is 32 chars big and sha512 is 128 chars big.
-                # others supported algorithms are between those.
-                pattern = '%s [a-f0-9]{32,128}' % self.algorithm
-                if re.match(pattern, line):
-                    discovered = line.split()[1]
-                    break
-        return discovered
+        recorded = self._read_hash_file(hash_file)
+        if self.algorithm not in recorded:
+            self._create_hash_file(asset_path, recorded.keys())
+            recorded = self._read_hash_file(hash_file)
+        return recorded.get(self.algorithm)
+
+    @staticmethod
+    def _read_hash_file(hash_file):
+        """
+        Read all the hashes recorded in a CHECKSUM file.
+
+        :param hash_file: full path of the CHECKSUM file.
+        :returns: the hashes, indexed by algorithm.
+        :rtype: dict
+        """
+        # md5 is 32 chars big and sha512 is 128 chars big.
+        # others supported algorithms are between those.
+        pattern = re.compile(r'(\w+) ([a-f0-9]{32,128})$')
+        recorded = {}
+        with open(hash_file, 'r') as hash_file_obj:
+            for line in hash_file_obj:
+                match = pattern.match(line.strip())
+                if match:
+                    recorded.setdefault(match.group(1), match.group(2))
+        return recorded
 
     def _get_local_file(self, url_obj, asset_path):
         """
@@ -196,7 +232,7 @@ class Asset:
         else:
             path = url_obj.path
 
-        with FileLock(asset_path, 1):
+        with FcntlLock(asset_path, 1):
             try:
                 os.symlink(path, asset_path)
                 self._create_hash_file(asset_path)
@@ -379,7 +415,9 @@ class Asset:
             if (os.path.isfile(asset_file) and
                     not self._is_expired(asset_file, self.expire)):
                 try:
-                    with FileLock(asset_file, 30):
+                    # readers only need to keep writers away, so many
+                    # jobs can check the same cached asset concurrently
+                    with FcntlLock(asset_file, 30, shared=True):
                         if self._verify_hash(asset_file):
                             return asset_file
                 except Exception:  # pylint: disable=W0703
@@ -13,12 +13,129 @@
 # Author: Lucas Meneghel Rodrigues <lmr@redhat.com>
 
 import hashlib
-import io
+import json
 import logging
 import os
+import time
 
+#: Size of the buffer used to read files that are being hashed.  Large
+#: reads amortize the cost of the system calls and of the interpreter
+#: loop, and hashlib releases the GIL while processing them
+CHUNK_SIZE = 1024 * 1024
 
-def hash_file(filename, size=None, algorithm="md5"):
+#: Suffix of the sidecar files where computed digests are cached
+CACHE_SUFFIX = '.hashcache'
+
+#: Files modified less than this number of seconds ago are not cached,
+#: as further modifications may not change their size nor modification
+#: time, depending on the resolution of the filesystem timestamps
+CACHE_MIN_AGE = 2
+
+
+def _file_signature(stat_result):
+    return [stat_result.st_dev, stat_result.st_ino,
+            stat_result.st_size, stat_result.st_mtime_ns]
+
+
+def _get_cache_path(filename):
+    return '%s%s' % (filename, CACHE_SUFFIX)
+
+
+def _load_cache(filename, signature):
+    try:
+        with open(_get_cache_path(filename), 'r') as cache_file:
+            cache = json.load(cache_file)
+        if cache.get('signature') == signature:
+            return cache.get('digests', {})
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def _save_cache(filename, signature, digests):
+    path = _get_cache_path(filename)
+    temp = '%s.%s' % (path, os.getpid())
+    try:
+        with open(temp, 'w') as cache_file:
+            json.dump({'signature': signature, 'digests': digests},
+                      cache_file)
+        os.rename(temp, path)
+    except OSError as details:
+        logging.debug('Unable to save hash cache "%s": %s', path, details)
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+
+
+def _hash_fileobj(file_obj, hash_objs, size):
+    buf = bytearray(min(CHUNK_SIZE, max(size, 1)))
+    view = memoryview(buf)
+    while size > 0:
+        if size < len(buf):
+            view = view[:size]
+        read = file_obj.readinto(view)
+        if not read:
+            logging.debug("Nothing left to read but size=%d", size)
+            break
+        data = view[:read]
+        for hash_obj in hash_objs:
+            hash_obj.update(data)
+        size -= read
+
+
+def hash_file_digests(filename, algorithms, size=None, cache=False):
+    """
+    Calculate the hash values of filename for many algorithms at once.
+
+    The file is read a single time, no matter the number of algorithms.
+
+    :param filename: Path of the file that will have its hashes calculated.
+    :param algorithms: Methods used to calculate the hashes.
+    :type algorithms: list of str
+    :param size: If provided, hash only the first size bytes of the file.
+    :param cache: Whether to reuse and record the digests of the whole file
+                  in a sidecar file (named after filename with the
+                  :data:`CACHE_SUFFIX` suffix).  Cached digests are only
+                  used while the file device, inode, size and modification
+                  time are unchanged.  It's ignored if size is given.
+    :type cache: bool
+    :return: the hashes of the file, indexed by algorithm.
+    :rtype: dict
+    :raises ValueError: if any of the algorithms is not supported.
+    """
+    stat_result = os.stat(filename)
+    fsize = stat_result.st_size
+
+    if not size or size >= fsize:
+        size = fsize
+    else:
+        cache = False
+
+    digests = {}
+    if cache:
+        signature = _file_signature(stat_result)
+        cached = _load_cache(filename, signature)
+        digests = {algorithm: cached[algorithm] for algorithm in algorithms
+                   if algorithm in cached}
+    missing = [algorithm for algorithm in algorithms
+               if algorithm not in digests]
+    if not missing:
+        return digests
+
+    hash_objs = [hashlib.new(algorithm) for algorithm in missing]
+    with open(filename, 'rb', buffering=0) as file_to_hash:
+        _hash_fileobj(file_to_hash, hash_objs, size)
+    for algorithm, hash_obj in zip(missing, hash_objs):
+        digests[algorithm] = hash_obj.hexdigest()
+
+    if cache and time.time() - stat_result.st_mtime > CACHE_MIN_AGE:
+        cached.update(digests)
+        _save_cache(filename, signature, cached)
+    return digests
+
+
+def hash_file(filename, size=None, algorithm="md5", cache=False):
     """
     Calculate the hash value of filename.
 
@@ -31,30 +148,15 @@ def hash_file(filename, size=None, algorithm="md5"):
     :param filename: Path of the file that will have its hash calculated.
     :param algorithm: Method used to calculate the hash (default is md5).
     :param size: If provided, hash only the first size bytes of the file.
+    :param cache: Whether to use a persistent cache of digests, see
+                  :func:`hash_file_digests`.
     :return: Hash of the file, if something goes wrong, return None.
     """
-    chunksize = io.DEFAULT_BUFFER_SIZE
-    fsize = os.path.getsize(filename)
-
-    if not size or size > fsize:
-        size = fsize
-
     try:
-        hash_obj = hashlib.new(algorithm)
+        hashlib.new(algorithm)
     except ValueError as detail:
         logging.error('Returning "None" due to inability to create hash '
                       'object: "%s"', detail)
         return None
 
-    with open(filename, 'rb') as file_to_hash:
-        while size > 0:
-            if chunksize > size:
-                chunksize = size
-            data = file_to_hash.read(chunksize)
-            if len(data) == 0:
-                logging.debug("Nothing left to read but size=%d", size)
-                break
-            hash_obj.update(data)
-            size -= len(data)
-
-    return hash_obj.hexdigest()
+    return hash_file_digests(filename, [algorithm], size, cache)[algorithm]
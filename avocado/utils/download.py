@@ -128,7 +128,7 @@ def _get_file(src, dst, permissions=None):
 
 
 def get_file(src, dst, permissions=None, hash_expected=None,
-             hash_algorithm="md5", download_retries=1):
+             hash_algorithm="md5", download_retries=1, hash_cache=False):
     """
     Gets a file from a source location, optionally using caching.
 
@@ -148,12 +148,16 @@ def get_file(src, dst, permissions=None, hash_expected=None,
             (md5, sha1).
     :param download_retries: Number of times we are going to retry a failed
             download.
+    :param hash_cache: Whether to cache the hash of dst in a sidecar file,
+            so that an unchanged dst is not read again on further calls.
+            See :func:`avocado.utils.crypto.hash_file_digests`.
     :raise: EnvironmentError.
     :return: destination path.
     """
     def _verify_hash(filename):
         if os.path.isfile(filename):
-            return crypto.hash_file(filename, algorithm=hash_algorithm)
+            return crypto.hash_file(filename, algorithm=hash_algorithm,
+                                    cache=hash_cache)
         return None
 
     if hash_expected is None:
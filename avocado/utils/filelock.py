@@ -14,10 +14,12 @@
 
 """
 Utility for individual file access control implemented
-via PID lock files.
+via PID lock files or via :func:`fcntl.flock` based locks.
 """
 
+import fcntl
 import os
+import random
 import time
 
 from .process import pid_exists
@@ -94,3 +96,110 @@ class FileLock:
                 self.locked = False
             except OSError:
                 pass
+
+
+class FcntlLock:
+
+    """
+    Creates a shared or exclusive advisory lock for a file.
+
+    The lock is held with :func:`fcntl.flock` on a companion lock file,
+    so waiters are queued by the kernel instead of polling for a PID
+    file, and a lock held by a process that dies is released
+    automatically.  Any number of shared (reader) locks can be held at
+    the same time, while an exclusive (writer) lock excludes all others.
+
+    The same rules of :class:`FileLock` apply: all processes should use
+    and honor the advisory locking scheme.
+    """
+
+    #: Initial interval, in seconds, between attempts when waiting
+    #: for a lock with a finite timeout
+    MIN_INTERVAL = 0.001
+    #: Maximum interval, in seconds, between attempts when waiting
+    #: for a lock with a finite timeout
+    MAX_INTERVAL = 0.1
+
+    def __init__(self, filename, timeout=0, shared=False):
+        """
+        :param filename: path of the file to be locked
+        :type filename: str
+        :param timeout: time in seconds to wait for the lock.  A value of
+                        zero (the default) does not wait at all, while None
+                        blocks until the lock is acquired
+        :type timeout: float or None
+        :param shared: whether a shared (reader) lock should be taken
+                       instead of an exclusive (writer) one
+        :type shared: bool
+        """
+        self.filename = '%s.flock' % filename
+        self.timeout = timeout
+        self.shared = shared
+        self.locked = False
+        self._fd = None
+
+    def _try_lock(self, operation):
+        try:
+            fcntl.flock(self._fd, operation | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def acquire(self):
+        """
+        Acquires the lock, waiting up to the configured timeout.
+
+        :raises AlreadyLocked: when the lock can not be acquired in time
+        :raises LockFailed: when the lock file can not be opened
+        """
+        operation = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+        try:
+            self._fd = os.open(self.filename, os.O_RDWR | os.O_CREAT, 0o666)
+        except OSError as details:
+            raise LockFailed('Failed to open lock file "%s": %s'
+                             % (self.filename, details))
+        try:
+            if self.timeout is None:
+                fcntl.flock(self._fd, operation)
+            elif not self._try_lock(operation):
+                if self.timeout <= 0:
+                    raise AlreadyLocked('File is already locked.')
+                timelimit = time.monotonic() + self.timeout
+                interval = self.MIN_INTERVAL
+                while not self._try_lock(operation):
+                    remaining = timelimit - time.monotonic()
+                    if remaining <= 0:
+                        raise AlreadyLocked('Timeout waiting for the lock.')
+                    # randomized exponential backoff, so that a crowd of
+                    # waiters do not wake up all at the same time
+                    time.sleep(min(random.uniform(interval / 2, interval),
+                                   remaining))
+                    interval = min(interval * 2, self.MAX_INTERVAL)
+        except Exception:
+            os.close(self._fd)
+            self._fd = None
+            raise
+        self.locked = True
+        return self
+
+    def release(self):
+        """
+        Releases the lock, if it is held.
+
+        The lock file is intentionally left in place: removing it would
+        allow a waiter to hold a lock on an unlinked file while a new
+        process locks a freshly created one.
+        """
+        if self._fd is not None:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+        self.locked = False
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *args):
+        self.release()
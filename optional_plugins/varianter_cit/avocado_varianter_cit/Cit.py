@@ -190,14 +190,12 @@ class Cit:
             for index, item in enumerate(parameters):
                 solution[item] = combination[index]
             if self.combination_matrix.is_valid_combination(solution, parameters):
-                self.combination_matrix.uncover_combination(matrix[row_index], parameters)
-                self.combination_matrix.cover_combination(solution, parameters)
-                if self.combination_matrix.total_uncovered < best_uncover:
-                    best_uncover = self.combination_matrix.total_uncovered
+                uncover = (self.combination_matrix.total_uncovered +
+                           self.combination_matrix.coverage_difference(matrix[row_index], solution, parameters))
+                if uncover < best_uncover:
+                    best_uncover = uncover
                     best_solution = solution
                     best_row_index = row_index
-                self.combination_matrix.uncover_combination(solution, parameters)
-                self.combination_matrix.cover_combination(matrix[row_index], parameters)
                 if best_uncover == 0:
                     break
         return best_solution, best_row_index, parameters
@@ -234,14 +232,12 @@ class Cit:
                 solution, row_index, parameters = self.change_one_value(matrix, row_index, column_index)
             except ValueError:
                 continue
-            self.combination_matrix.uncover_combination(matrix[row_index], parameters)
-            self.combination_matrix.cover_combination(solution, parameters)
-            if self.combination_matrix.total_uncovered < best_uncover:
-                best_uncover = self.combination_matrix.total_uncovered
+            uncover = (self.combination_matrix.total_uncovered +
+                       self.combination_matrix.coverage_difference(matrix[row_index], solution, parameters))
+            if uncover < best_uncover:
+                best_uncover = uncover
                 best_solution = solution
                 best_row_index = row_index
-            self.combination_matrix.uncover_combination(solution, parameters)
-            self.combination_matrix.cover_combination(matrix[row_index], parameters)
             if best_uncover == 0:
                 break
         return best_solution, best_row_index, [column_index]
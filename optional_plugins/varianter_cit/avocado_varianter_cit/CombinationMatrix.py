@@ -1,8 +1,20 @@
 import itertools
+import operator
 
 from .CombinationRow import CombinationRow as Row
 
 
+def _cell_getter(key):
+    """
+    :param key: parameters of combinations
+    :return: function which gets the combination of these parameters from a row
+    """
+    if len(key) == 1:
+        index = key[0]
+        return lambda row: (row[index],)
+    return operator.itemgetter(*key)
+
+
 class CombinationMatrix:
     """
     CombinationMatrix object stores Rows of combinations into dictionary.
@@ -21,35 +33,81 @@ class CombinationMatrix:
         self.uncovered_rows = {}
         self.total_uncovered = 0
         self.total_covered_more_than_ones = 0
+        # Functions which get the combination of each row from a solution
+        self._cell_getters = {}
+        # Rows which contain each parameter
+        self._keys_by_parameter = {parameter: []
+                                   for parameter in range(len(input_data))}
+        # Rows which contain any of some parameters, by these parameters
+        self._keys_by_parameters = {}
+        # Cell getters and combinations of the rows which contain any of
+        # some parameters, by these parameters
+        self._cells_by_parameters = {}
+        # Constrained rows which contain any of some parameters, by these
+        # parameters
+        self._constrained_by_parameters = {}
+        # Rows with disabled combinations, the only ones which can make
+        # a solution invalid
+        self._constrained_keys = {}
         # Creation of rows
         for c in itertools.combinations(range(len(input_data)), t_value):
             row = Row(input_data, t_value, c)
             self.total_uncovered += row.uncovered
             self.hash_table[c] = row
             self.uncovered_rows[c] = c
+            self._cell_getters[c] = _cell_getter(c)
+            for parameter in c:
+                self._keys_by_parameter[parameter].append(c)
 
-    def cover_solution_row(self, row):
+    def _get_keys(self, parameters):
         """
-        Cover all combination by one row from possible solution
-
-        :param row: one row from solution
-        :return: number of still uncovered combinations
+        :param parameters: parameters from row
+        :return: keys of the rows which contain any of the parameters
         """
-        for key, value in self.hash_table.items():
-            val = []
-            # Getting combination from solution
-            for i in key:
-                val.append(row[i])
-
-            uncovered_difference, covered_more_than_ones_difference = value.cover_cell(val)
+        parameters = tuple(parameters)
+        keys = self._keys_by_parameters.get(parameters)
+        if keys is None:
+            keys = set()
+            for parameter in parameters:
+                keys.update(self._keys_by_parameter[parameter])
+            # keeps the order of the hash table
+            keys = [key for key in self.hash_table if key in keys]
+            self._keys_by_parameters[parameters] = keys
+        return keys
+
+    def _cover_keys(self, row, keys):
+        for key in keys:
+            value = self.hash_table[key]
+            uncovered_difference, covered_more_than_ones_difference = value.cover_cell(
+                self._cell_getters[key](row))
             # Deleting covered row from uncovered rows
             if value.uncovered == 0:
                 self.uncovered_rows.pop(key, None)
             self.total_uncovered += uncovered_difference
             self.total_covered_more_than_ones += covered_more_than_ones_difference
+        return self.total_uncovered
 
+    def _uncover_keys(self, row, keys):
+        for key in keys:
+            value = self.hash_table[key]
+            uncovered_difference, covered_more_than_ones_difference = value.uncover_cell(
+                self._cell_getters[key](row))
+            # Adding uncovered row to uncovered rows
+            if value.uncovered != 0:
+                self.uncovered_rows[key] = key
+            self.total_uncovered += uncovered_difference
+            self.total_covered_more_than_ones += covered_more_than_ones_difference
         return self.total_uncovered
 
+    def cover_solution_row(self, row):
+        """
+        Cover all combination by one row from possible solution
+
+        :param row: one row from solution
+        :return: number of still uncovered combinations
+        """
+        return self._cover_keys(row, self.hash_table)
+
     def cover_combination(self, row, parameters):
         """
         Cover combination of specific parameters by one row from possible solution
@@ -58,22 +116,7 @@ class CombinationMatrix:
         :param parameters: parameters which has to be covered
         :return: number of still uncovered combinations
         """
-        for key, value in self.hash_table.items():
-            for parameter in parameters:
-                if parameter in key:
-                    val = []
-                    # Getting combination from solution
-                    for i in key:
-                        val.append(row[i])
-
-                    uncovered_difference, covered_more_than_ones_difference = value.cover_cell(val)
-                    # Deleting covered row from uncovered rows
-                    if value.uncovered == 0:
-                        self.uncovered_rows.pop(key, None)
-                    self.total_uncovered += uncovered_difference
-                    self.total_covered_more_than_ones += covered_more_than_ones_difference
-                    break
-        return self.total_uncovered
+        return self._cover_keys(row, self._get_keys(parameters))
 
     def uncover_solution_row(self, row):
         """
@@ -82,20 +125,7 @@ class CombinationMatrix:
         :param row: one row from solution
         :return: number of uncovered combinations
         """
-        for key, value in self.hash_table.items():
-            val = []
-            # Getting combination from solution
-            for i in key:
-                val.append(row[i])
-
-            uncovered_difference, covered_more_than_ones_difference = value.uncover_cell(val)
-            # Adding uncovered row to uncovered rows
-            if value.uncovered != 0:
-                self.uncovered_rows[key] = key
-            self.total_uncovered += uncovered_difference
-            self.total_covered_more_than_ones += covered_more_than_ones_difference
-
-        return self.total_uncovered
+        return self._uncover_keys(row, self.hash_table)
 
     def uncover_combination(self, row, parameters):
         """
@@ -105,22 +135,7 @@ class CombinationMatrix:
         :param parameters: parameters which has to be covered
         :return: number of uncovered combinations
         """
-        for key, value in self.hash_table.items():
-            for parameter in parameters:
-                if parameter in key:
-                    val = []
-                    # Getting combination from solution
-                    for i in key:
-                        val.append(row[i])
-
-                    uncovered_difference, covered_more_than_ones_difference = value.uncover_cell(val)
-                    # Adding uncovered row to uncovered rows
-                    if value.uncovered != 0:
-                        self.uncovered_rows[key] = key
-                    self.total_uncovered += uncovered_difference
-                    self.total_covered_more_than_ones += covered_more_than_ones_difference
-                    break
-        return self.total_uncovered
+        return self._uncover_keys(row, self._get_keys(parameters))
 
     def uncover(self):
         """
@@ -138,12 +153,8 @@ class CombinationMatrix:
 
         :param row: one row from solution
         """
-        for key, value in self.hash_table.items():
-            val = []
-            for i in key:
-                val.append(row[i])
-
-            if not value.is_valid(val):
+        for key, value in self._constrained_keys.items():
+            if not value.is_valid(self._cell_getters[key](row)):
                 return False
 
         return True
@@ -155,18 +166,46 @@ class CombinationMatrix:
         :param row: one row from solution
         :param parameters: parameters from row
         """
-        for key, value in self.hash_table.items():
-            for parameter in parameters:
-                if parameter in key:
-                    val = []
-                    for i in key:
-                        val.append(row[i])
-
-                    if not value.is_valid(val):
-                        return False
-                    break
+        parameters = tuple(parameters)
+        constrained = self._constrained_by_parameters.get(parameters)
+        if constrained is None:
+            constrained = [(self._cell_getters[key], self._constrained_keys[key].hash_table)
+                           for key in self._get_keys(parameters)
+                           if key in self._constrained_keys]
+            self._constrained_by_parameters[parameters] = constrained
+        for get_cell, hash_table in constrained:
+            # disabled combinations are the ones set to None
+            if hash_table.get(get_cell(row), 0) is None:
+                return False
         return True
 
+    def coverage_difference(self, row, solution, parameters):
+        """
+        Difference in the number of uncovered combinations, if the specific
+        parameters of row, which is part of the solution, were replaced by
+        the ones of another solution row. Nothing is covered nor uncovered.
+
+        :param row: one row from solution
+        :param solution: row which would replace it
+        :param parameters: parameters which differ between the rows
+        :return: difference of the number of uncovered combinations
+        """
+        # only the combinations with changed parameters are affected
+        changed = tuple(parameter for parameter in parameters
+                        if row[parameter] != solution[parameter])
+        cells = self._cells_by_parameters.get(changed)
+        if cells is None:
+            cells = [(self._cell_getters[key], self.hash_table[key].hash_table)
+                     for key in self._get_keys(changed)]
+            self._cells_by_parameters[changed] = cells
+        difference = 0
+        for get_cell, hash_table in cells:
+            if hash_table[get_cell(row)] == 1:
+                difference += 1
+            if hash_table[get_cell(solution)] == 0:
+                difference -= 1
+        return difference
+
     def del_cell(self, parameters, combination):
         """
         Disable one combination. If combination is disabled it means that
@@ -176,6 +215,8 @@ class CombinationMatrix:
         :param combination: combination to be disabled
         """
         row = self.hash_table[tuple(parameters)]
+        self._constrained_keys[tuple(parameters)] = row
+        self._constrained_by_parameters.clear()
         uncovered_difference = row.del_cell(combination)
         if row.uncovered == 0:
             self.uncovered_rows.pop(tuple(parameters), None)
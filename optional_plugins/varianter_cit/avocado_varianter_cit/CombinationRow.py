@@ -38,17 +38,18 @@ class CombinationRow:
         :return: number of new covered combinations and number of new covered combinations more than ones
         """
 
-        old_uncovered = self.uncovered
-        old_covered_more_than_ones = self.covered_more_than_ones
-        value = self.hash_table[tuple(key)]
-        if value is not None:
-            if value == 0:
-                self.uncovered -= 1
-            elif value == 1:
-                self.covered_more_than_ones += 1
-            self.hash_table[tuple(key)] += 1
-
-        return self.uncovered - old_uncovered, self.covered_more_than_ones - old_covered_more_than_ones
+        key = tuple(key)
+        value = self.hash_table[key]
+        if value is None:
+            return 0, 0
+        self.hash_table[key] = value + 1
+        if value == 0:
+            self.uncovered -= 1
+            return -1, 0
+        if value == 1:
+            self.covered_more_than_ones += 1
+            return 0, 1
+        return 0, 0
 
     def uncover_cell(self, key):
 
@@ -59,17 +60,18 @@ class CombinationRow:
         :return: number of new covered combinations and number of new covered combinations more than ones
         """
 
-        old_uncovered = self.uncovered
-        old_covered_more_than_ones = self.covered_more_than_ones
-        value = self.hash_table[tuple(key)]
-        if value is not None and value > 0:
-            if value == 1:
-                self.uncovered += 1
-            elif value == 2:
-                self.covered_more_than_ones -= 1
-            self.hash_table[tuple(key)] -= 1
-
-        return self.uncovered - old_uncovered, self.covered_more_than_ones - old_covered_more_than_ones
+        key = tuple(key)
+        value = self.hash_table[key]
+        if value is None or value == 0:
+            return 0, 0
+        self.hash_table[key] = value - 1
+        if value == 1:
+            self.uncovered += 1
+            return 1, 0
+        if value == 2:
+            self.covered_more_than_ones -= 1
+            return 0, -1
+        return 0, 0
 
     def completely_uncover(self):
 
@@ -193,3 +193,24 @@ class CombinationMatrixTest(unittest.TestCase):
         for key in self.matrix.hash_table:
             with self.subTest(combination=key):
                 self.assertTrue(combination_row_equals(self.matrix.hash_table[key], self.excepted_hash_table[key]))
+
+    def test_coverage_difference(self):
+        solution_row = [1, 0, 2, 3]
+        other_row = [0, 1, 2, 3]
+        self.matrix.cover_solution_row(solution_row)
+        self.matrix.cover_solution_row([1, 1, 0, 0])
+        for parameters, solution in (((0,), [2, 0, 2, 3]),
+                                     ((0, 1), [0, 1, 2, 3]),
+                                     ((1, 3), [1, 1, 2, 0]),
+                                     ((2,), solution_row)):
+            with self.subTest(parameters=parameters):
+                total_uncovered = self.matrix.total_uncovered
+                difference = self.matrix.coverage_difference(solution_row, solution, parameters)
+                self.assertEqual(total_uncovered, self.matrix.total_uncovered, "Coverage was changed")
+                self.matrix.uncover_combination(solution_row, parameters)
+                self.matrix.cover_combination(solution, parameters)
+                self.assertEqual(total_uncovered + difference, self.matrix.total_uncovered,
+                                 "Coverage difference is wrong")
+                self.matrix.uncover_combination(solution, parameters)
+                self.matrix.cover_combination(solution_row, parameters)
+        self.assertEqual(0, self.matrix.coverage_difference(solution_row, other_row, ()))
@@ -17,17 +17,19 @@
 import ast
 import collections
 import copy
+import hashlib
 import os
+import pickle
 import re
 import sys
 
 import yaml
 
-from avocado.core import exit_codes
+from avocado.core import data_dir, exit_codes
 from avocado.core.output import LOG_UI
 from avocado.core.plugin_interfaces import CLI, Init, Varianter
 from avocado.core.settings import settings
-from avocado.utils import astring
+from avocado.utils import astring, crypto
 
 from . import mux  # pylint: disable=W0406
 
@@ -49,6 +51,14 @@ YAML_FILTER_OUT = 104
 __RE_FILE_SPLIT = re.compile(r'(?<!\\):')   # split by ':' but not '\\:'
 __RE_FILE_SUBS = re.compile(r'(?<!\\)\\:')  # substitute '\\:' but not '\\\\:'
 
+#: Version of the format of the cached trees, changed whenever the
+#: structure of the pickled trees changes
+CACHE_VERSION = 3
+
+#: The YAML files read while creating a tree, including the ones pulled
+#: by "!include", when it's being recorded on the cache
+_LOADED_FILES = None
+
 
 class ListOfNodeObjects(list):     # Few methods pylint: disable=R0903
 
@@ -299,6 +309,9 @@ def _create_from_yaml(path):
             using.insert(0, 'run')
         path = __RE_FILE_SUBS.sub(':', path[1])
 
+    if _LOADED_FILES is not None:
+        _LOADED_FILES.append(path)
+
     # For loader instance needs different "path" and "using" values
     class Loader(_BaseLoader):
         _BaseLoader.path = path
@@ -323,16 +336,96 @@ def _create_from_yaml(path):
     return loaded_tree
 
 
-def create_from_yaml(paths):
+def _get_cache_path(path, cache_dir):
+    """
+    Returns the path of the cached tree of a ([$using:]$path) yaml file
+    """
+    spec = __RE_FILE_SPLIT.split(path, 1)
+    spec[-1] = os.path.abspath(__RE_FILE_SUBS.sub(':', spec[-1]))
+    key = hashlib.sha1(repr(spec).encode(astring.ENCODING)).hexdigest()
+    return os.path.join(cache_dir, '%s.pickle' % key)
+
+
+def _load_cached_tree(cache_path):
+    """
+    Returns the cached tree, or None if missing or if any file changed
+    """
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            version, digests, loaded_tree = pickle.load(cache_file)
+    except (OSError, EOFError, ValueError, TypeError, AttributeError,
+            ImportError, pickle.UnpicklingError):
+        return None
+    if version != CACHE_VERSION:
+        return None
+    for path, digest in digests:
+        if (not os.path.isfile(path) or
+                crypto.hash_file(path, algorithm='sha1') != digest):
+            return None
+    return loaded_tree
+
+
+def _save_cached_tree(cache_path, files, loaded_tree):
+    """
+    Saves the tree on the cache, along with the digests of its files
+    """
+    digests = [(path, crypto.hash_file(path, algorithm='sha1'))
+               for path in files]
+    temp = '%s.%s' % (cache_path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temp, 'wb') as cache_file:
+            pickle.dump((CACHE_VERSION, digests, loaded_tree), cache_file,
+                        pickle.HIGHEST_PROTOCOL)
+        os.rename(temp, cache_path)
+    except (OSError, RecursionError, pickle.PicklingError) as details:
+        LOG_UI.debug('Unable to cache multiplex tree "%s": %s', cache_path,
+                     details)
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+
+
+def _create_from_yaml_cached(path, cache_dir):
+    """
+    Create tree structure from yaml stream, reusing it from the cache
+
+    The cached tree is only used while the contents of all the files it
+    was created from, including the included ones, are unchanged.
+    """
+    global _LOADED_FILES  # pylint: disable=W0603
+    cache_path = _get_cache_path(path, cache_dir)
+    loaded_tree = _load_cached_tree(cache_path)
+    if loaded_tree is not None:
+        return loaded_tree
+
+    _LOADED_FILES = []
+    try:
+        loaded_tree = _create_from_yaml(path)
+        files = [os.path.abspath(_) for _ in _LOADED_FILES]
+    finally:
+        _LOADED_FILES = None
+    if loaded_tree is not None:
+        _save_cached_tree(cache_path, files, loaded_tree)
+    return loaded_tree
+
+
+def create_from_yaml(paths, cache_dir=None):
     """Create tree structure from yaml-like file.
 
     :param paths: File object to be processed
+    :param cache_dir: directory where the created trees are cached, and
+                      reused from, or None to not use a cache
     :raise SyntaxError: When yaml-file is corrupted
     :return: Root of the created tree structure
     """
     def _merge(data, path):
         """Normal run"""
-        tmp = _create_from_yaml(path)
+        if cache_dir is None:
+            tmp = _create_from_yaml(path)
+        else:
+            tmp = _create_from_yaml_cached(path, cache_dir)
         if tmp:
             data.merge(tmp)
 
@@ -399,6 +492,15 @@ class YamlToMuxInit(Init):
                                  help_msg=help_msg,
                                  key_type=list)
 
+        help_msg = ("Cache the trees created from the multiplex files, "
+                    "which are reused while the contents of the files "
+                    "(and of the ones they include) are unchanged")
+        settings.register_option(section=self.name,
+                                 key='cache',
+                                 default=True,
+                                 key_type=bool,
+                                 help_msg=help_msg)
+
 
 class YamlToMuxCLI(CLI):
 
@@ -478,8 +580,12 @@ class YamlToMux(mux.MuxPlugin, Varianter):
         multiplex_files = config.get("yaml_to_mux.files")
         if multiplex_files:
             data = mux.MuxTreeNode()
+            cache_dir = None
+            if config.get("yaml_to_mux.cache"):
+                cache_dir = os.path.join(data_dir.get_cache_dirs()[0],
+                                         'yaml_to_mux')
             try:
-                data.merge(create_from_yaml(multiplex_files))
+                data.merge(create_from_yaml(multiplex_files, cache_dir))
             except IOError as details:
                 error_msg = "%s : %s" % (details.strerror, details.filename)
                 LOG_UI.error(error_msg)
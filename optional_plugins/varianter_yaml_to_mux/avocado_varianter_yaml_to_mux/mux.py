@@ -21,6 +21,8 @@ a custom Varianter plugin.
 # Multiplex-enabled tree objects
 #
 
+import array
+import bisect
 import collections
 import itertools
 import re
@@ -34,6 +36,114 @@ REMOVE_NODE = 0
 REMOVE_VALUE = 1
 
 
+class CompiledFilters:
+
+    """
+    Internal filters (filter-only and filter-out) of a set of nodes compiled
+    into bitmasks, so that validating a variant only takes a few integer
+    operations per node instead of string comparisons with every filter.
+
+    Each distinct filter gets a bit.  For each node it's precomputed:
+
+     * which filters it defines (inherited from its environment)
+     * which filter-out filters match its path
+     * which filter-only filters apply to it (the filter parent is one of
+       the node's parents), grouped by filter level and split in the ones
+       that keep and the ones that remove the node
+
+    A node is then removed when the highest level filter-only defined in the
+    variant that applies to it does not keep it (see
+    :meth:`MuxTree._valid_variant` for the reference semantics).
+    """
+
+    def __init__(self, nodes):
+        """
+        :param nodes: all the nodes that might be part of the variants
+        """
+        self._only_bits = {}
+        self._out_bits = {}
+        for node in nodes:
+            for item in node.environment.filter_only:
+                self._only_bits.setdefault(item, 1 << len(self._only_bits))
+            for item in node.environment.filter_out:
+                self._out_bits.setdefault(item, 1 << len(self._out_bits))
+        self._only_parents = [(item, str(item).rsplit('/', 2)[0] + '/',
+                               item.count('/'), bit)
+                              for item, bit in self._only_bits.items()]
+        self._records = {}
+
+    def __bool__(self):
+        return bool(self._only_bits or self._out_bits)
+
+    def _compile_node(self, node):
+        env = node.environment
+        defined_only = 0
+        for item in env.filter_only:
+            defined_only |= self._only_bits[item]
+        defined_out = 0
+        for item in env.filter_out:
+            defined_out |= self._out_bits[item]
+        path = node.path + '/'
+        matching_out = 0
+        for item, bit in self._out_bits.items():
+            if path.startswith(item):
+                matching_out |= bit
+        ppath = path.rsplit('/', 2)[0] + '/'
+        levels = {}
+        for item, parent, level, bit in self._only_parents:
+            if ppath.startswith(parent):
+                keep_remove = levels.setdefault(level, [0, 0])
+                keep_remove[0 if path.startswith(item) else 1] |= bit
+        levels = tuple(tuple(levels[level])
+                       for level in sorted(levels, reverse=True))
+        return defined_only, defined_out, matching_out, levels
+
+    def compile(self, nodes):
+        """
+        Compiles the filters of (part of) a variant
+
+        :param nodes: nodes of the (partial) variant
+        :return: bitmasks of the defined filter-only filters, defined
+                 filter-out filters, filter-out filters matching the nodes,
+                 and the filter-only levels of each node, which can be
+                 evaluated by :meth:`is_valid`
+        """
+        defined_only = defined_out = matching_out = 0
+        levels = ()
+        for node in nodes:
+            record = self._records.get(id(node))
+            if record is None:
+                # the node is kept as part of the record, so its id is
+                # not reused by another object while this cache lives
+                record = self._records[id(node)] = (self._compile_node(node),
+                                                    node)
+            record = record[0]
+            defined_only |= record[0]
+            defined_out |= record[1]
+            matching_out |= record[2]
+            if record[3]:
+                levels += (record[3],)
+        return defined_only, defined_out, matching_out, levels
+
+    @staticmethod
+    def is_valid(defined_only, defined_out, matching_out, levels):
+        """
+        Evaluates a compiled variant, see :meth:`compile`
+
+        :return: whether the variant is valid or should be ignored/filtered
+        """
+        if defined_out & matching_out:
+            return False
+        if defined_only:
+            for node_levels in levels:
+                for keep, remove in node_levels:
+                    if defined_only & keep:
+                        break
+                    if defined_only & remove:
+                        return False
+        return True
+
+
 class MuxTree:
 
     """
@@ -46,12 +156,32 @@ class MuxTree:
         """
         :param root: Root of this tree slice
         """
+        self.root = root
         self.pools = []
         for node in self._iter_mux_leaves(root):
             if node.is_leaf:
                 self.pools.append(node)
             else:
                 self.pools.append([MuxTree(child) for child in node.children])
+        # Number of (unfiltered) variants in each pool and the offsets of
+        # the sub-trees of the multiplexed pools, used for random access
+        self._pool_sizes = []
+        self._pool_offsets = []
+        for pool in self.pools:
+            if isinstance(pool, list):
+                offsets = list(itertools.accumulate(
+                    subtree.get_number_of_raw_variants() for subtree in pool))
+                self._pool_sizes.append(offsets[-1] if offsets else 0)
+                self._pool_offsets.append([0] + offsets[:-1])
+            else:
+                self._pool_sizes.append(1)
+                self._pool_offsets.append(None)
+        self._no_raw_variants = 1
+        for size in self._pool_sizes:
+            self._no_raw_variants *= size
+        self._has_filters = None
+        self._filters = None
+        self._valid_indexes = None
 
     @staticmethod
     def _iter_mux_leaves(node):
@@ -73,9 +203,171 @@ class MuxTree:
 
         :yield valid variants
         """
-        for variant in self.iter_variants():
-            if self._valid_variant(variant):
-                yield variant
+        if not self.has_filters():
+            yield from self.iter_variants()
+            return
+        for _, variant in self._iter_valid_variants():
+            yield variant
+
+    def __len__(self):
+        """
+        Reports the number of valid variants
+
+        When there are no internal filters, it's computed without producing
+        any variant.  Otherwise all variants are evaluated once and the
+        result is kept for further calls (and for random access).
+        """
+        if not self.has_filters():
+            return self._no_raw_variants
+        return len(self._get_valid_indexes())
+
+    def __getitem__(self, index):
+        """
+        Reports the valid variant at a given position
+
+        The variant is built directly from its index, so when there are no
+        internal filters this is proportional to the depth of the tree and
+        not to the number of variants.
+
+        :param index: position of the variant, in the same order as produced
+                      by :meth:`__iter__` (negative values are supported)
+        :type index: int
+        :rtype: list
+        """
+        if self.has_filters():
+            return self.get_raw_variant(self._get_valid_indexes()[index])
+        if index < 0:
+            index += self._no_raw_variants
+        return self.get_raw_variant(index)
+
+    def has_filters(self):
+        """
+        Reports whether any node of this tree defines internal filters
+        """
+        if self._has_filters is None:
+            self._filters = CompiledFilters(self.root.iter_leaves())
+            self._has_filters = bool(self._filters)
+        return self._has_filters
+
+    def get_number_of_raw_variants(self):
+        """
+        Reports the number of variants without verifying the internal filters
+        """
+        return self._no_raw_variants
+
+    def get_raw_variant(self, index):
+        """
+        Reports the variant at a given position without verifying the
+        internal filters
+
+        :param index: position of the variant, in the same order as produced
+                      by :meth:`iter_variants`
+        :type index: int
+        :raise IndexError: when the index is out of range
+        :rtype: list
+        """
+        if not 0 <= index < self._no_raw_variants:
+            raise IndexError("Variant index out of range")
+        # itertools.product varies the last pool first, so the index is
+        # decomposed using the pool sizes as a mixed radix
+        digits = []
+        for size in reversed(self._pool_sizes):
+            index, digit = divmod(index, size)
+            digits.append(digit)
+        digits.reverse()
+        variant = []
+        for pool, offsets, digit in zip(self.pools, self._pool_offsets,
+                                        digits):
+            if offsets is None:
+                variant.append(pool)
+                continue
+            position = bisect.bisect_right(offsets, digit) - 1
+            variant.extend(pool[position].get_raw_variant(
+                digit - offsets[position]))
+        return variant
+
+    def _iter_valid_variants(self):
+        """
+        Iterates through the valid variants using the compiled filters
+
+        The pools are walked depth first (with an explicit stack, as trees
+        may have many pools), and a partial variant is pruned as soon as a
+        filter-out matches it, as adding more nodes can not make it valid
+        again.  The parts of each pool, and their compiled filters, are
+        produced as they're reached, and kept for the following walks.
+
+        :yield: tuple(index, variant), where index is the position of the
+                variant as reported by :meth:`iter_variants`
+        """
+        if not self.pools:
+            yield 0, []
+            return
+        filters = self._filters
+        sources = []
+        for pool in self.pools:
+            if isinstance(pool, list):
+                sources.append(itertools.chain.from_iterable(
+                    subtree.iter_variants() for subtree in pool))
+            else:
+                sources.append(iter([[pool]]))
+        caches = [[] for _ in self.pools]
+
+        def iter_parts(number):
+            # a pool is only walked by one iterator at a time, so the
+            # first one fills the cache the following ones are read from
+            cache = caches[number]
+            yield from cache
+            for part in sources[number]:
+                record = (part, filters.compile(part))
+                cache.append(record)
+                yield record
+
+        strides = []
+        stride = 1
+        for size in reversed(self._pool_sizes):
+            strides.append(stride)
+            stride *= size
+        strides.reverse()
+        last = len(self.pools) - 1
+        parts = [None] * len(self.pools)
+        levels = [None] * len(self.pools)
+        # each level of the stack: the parts of its pool still to be
+        # walked, and the index and filters of the variant up to it
+        stack = [(enumerate(iter_parts(0)), 0, 0, 0, 0)]
+        while stack:
+            depth = len(stack) - 1
+            iter_pool, index, only, out, matching = stack[-1]
+            for i, (part, record) in iter_pool:
+                part_out = out | record[1]
+                part_matching = matching | record[2]
+                if part_out & part_matching:
+                    continue
+                parts[depth] = part
+                levels[depth] = record[3]
+                part_index = index + i * strides[depth]
+                if depth < last:
+                    stack.append((enumerate(iter_parts(depth + 1)),
+                                  part_index, only | record[0], part_out,
+                                  part_matching))
+                    break
+                if filters.is_valid(only | record[0], part_out,
+                                    part_matching,
+                                    itertools.chain.from_iterable(levels)):
+                    yield part_index, list(itertools.chain.from_iterable(
+                        parts))
+            else:
+                stack.pop()
+
+    def _get_valid_indexes(self):
+        """
+        Evaluates the internal filters of all variants only once
+
+        :return: indexes of the valid variants, see :meth:`get_raw_variant`
+        """
+        if self._valid_indexes is None:
+            self._valid_indexes = array.array(
+                'Q', (index for index, _ in self._iter_valid_variants()))
+        return self._valid_indexes
 
     def iter_variants(self):
         """
@@ -103,43 +395,18 @@ class MuxTree:
         """
         Check the variant for validity of internal filters
 
+        A path is filtered out when it starts with any of the filter-out
+        filters.  The filter-only filters are only applied to nodes whose
+        parent matches the filter's parent: the node is kept when the
+        highest level (number of path elements) filter-only that applies
+        to it matches its path, and removed otherwise.
+
         :return: whether the variant is valid or should be ignored/filtered
         """
-        _filter_out = set()
-        _filter_only = set()
-        for node in variant:
-            _filter_only.update(node.environment.filter_only)
-            _filter_out.update(node.environment.filter_out)
-        if not (_filter_only or _filter_out):
+        filters = CompiledFilters(variant)
+        if not filters:
             return True
-        filter_only = tuple(_filter_only)
-        filter_out = tuple(_filter_out)
-        filter_only_parents = [str(_).rsplit('/', 2)[0] + '/'
-                               for _ in filter_only
-                               if _]
-
-        for out in filter_out:
-            for node in variant:
-                path = node.path + '/'
-                if path.startswith(out):
-                    return False
-        for node in variant:
-            keep = 0
-            remove = 0
-            path = node.path + '/'
-            ppath = path.rsplit('/', 2)[0] + '/'
-            for i in range(len(filter_only)):
-                level = filter_only[i].count('/')
-                if level < max(keep, remove):
-                    continue
-                if ppath.startswith(filter_only_parents[i]):
-                    if path.startswith(filter_only[i]):
-                        keep = level
-                    else:
-                        remove = level
-            if remove > keep:
-                return False
-        return True
+        return filters.is_valid(*filters.compile(variant))
 
 
 class MuxPlugin:
@@ -151,7 +418,6 @@ class MuxPlugin:
     root = None
     variants = None
     paths = None
-    variant_ids = []
 
     def initialize_mux(self, root, paths):
         """
@@ -163,27 +429,43 @@ class MuxPlugin:
         self.root = root
         self.paths = paths
         if self.root is not None:
-            self.variant_ids = [varianter.generate_variant_id(variant)
-                                for variant in MuxTree(self.root)]
             self.variants = MuxTree(self.root)
 
     def __iter__(self):
         """
         See :meth:`avocado.core.plugin_interfaces.Varianter.__iter__`
+
+        Variants (and their ids) are produced lazily, as they're consumed.
         """
         if self.root is None:
             return
 
-        for vid, variant in zip(self.variant_ids, self.variants):
-            yield {"variant_id": vid,
-                   "variant": variant,
-                   "paths": self.paths}
+        for variant in self.variants:
+            yield self._to_variant_dict(variant)
+
+    def _to_variant_dict(self, variant):
+        return {"variant_id": varianter.generate_variant_id(variant),
+                "variant": variant,
+                "paths": self.paths}
+
+    def get_variant(self, index):
+        """
+        Reports the variant at a given position, in the same format and
+        order as :meth:`__iter__`, without producing the preceding ones.
+
+        :param index: position of the variant
+        :type index: int
+        :raise IndexError: when the index is out of range
+        """
+        if self.root is None:
+            raise IndexError("Variant index out of range")
+        return self._to_variant_dict(self.variants[index])
 
     def to_str(self, summary, variants, **kwargs):
         """
         See :meth:`avocado.core.plugin_interfaces.Varianter.to_str`
         """
-        if not self.variants:
+        if self.variants is None:
             return ""
         out = []
         if summary:
@@ -210,7 +492,7 @@ class MuxPlugin:
         """
         if self.root is None:
             return 0
-        return sum(1 for _ in self)
+        return len(self.variants)
 
 
 class OutputValue:  # only container pylint: disable=R0903
@@ -321,8 +603,9 @@ class MuxTreeNode(tree.TreeNode):
     def __repr__(self):
         return '%s(name=%r)' % (self.__class__.__name__, self.name)
 
-    def fingerprint(self):
-        return "%s%s" % (super(MuxTreeNode, self).fingerprint(), self.ctrl)
+    def _compute_fingerprint(self):
+        return "%s%s" % (super(MuxTreeNode, self)._compute_fingerprint(),
+                         self.ctrl)
 
     def merge(self, other):
         """
@@ -341,7 +624,7 @@ class MuxTreeNode(tree.TreeNode):
                         if regexp.match(child.name):
                             remove.append(child)
                     for child in remove:
-                        self.children.remove(child)
+                        self.remove_child(child)
                 elif ctrl.code == REMOVE_VALUE:
                     remove = []
                     regexp = re.compile(ctrl.value)
@@ -2,7 +2,10 @@ import copy
 import itertools
 import os
 import pickle
+import shutil
+import tempfile
 import unittest
+import unittest.mock
 
 import yaml
 
@@ -275,6 +278,64 @@ class TestMultiplex(unittest.TestCase):
         from_file = mux.MuxTree(from_file)
         self.assertEqual(self.mux_full, tuple(from_file))
 
+    def test_len_and_index(self):
+        root = mux.MuxTreeNode()
+        for name, children in (('a', 3), ('b', 1), ('c', 4)):
+            node = root.get_node(name, True)
+            node.multiplex = True
+            for i in range(children):
+                node.get_node('%s%s' % (name, i), True)
+        variants = mux.MuxTree(root)
+        exp = tuple(variants)
+        self.assertEqual(len(exp), 12)
+        self.assertFalse(variants.has_filters())
+        self.assertEqual(len(variants), len(exp))
+        self.assertEqual(tuple(variants[i] for i in range(len(variants))),
+                         exp)
+        self.assertEqual(variants[-1], exp[-1])
+        self.assertRaises(IndexError, variants.__getitem__, len(exp))
+
+    def test_len_and_index_full(self):
+        variants = mux.MuxTree(self.mux_tree)
+        self.assertEqual(len(variants), len(self.mux_full))
+        self.assertEqual(tuple(variants[i] for i in range(len(variants))),
+                         self.mux_full)
+        self.assertEqual(variants[-1], self.mux_full[-1])
+        self.assertRaises(IndexError, variants.__getitem__, 12)
+
+    def test_len_and_index_internal_filters(self):
+        tree_yaml_path = os.path.join(BASEDIR, 'tests/.data/mux-selftest.yaml')
+        variants = mux.MuxTree(yaml_to_mux.create_from_yaml(
+            ['/virt:%s' % tree_yaml_path]))
+        self.assertTrue(variants.has_filters())
+        exp = tuple(variants)
+        # pruned generation matches the evaluation of every single variant
+        self.assertEqual(exp, tuple(
+            variant for variant in variants.iter_variants()
+            if mux.MuxTree._valid_variant(variant)))  # pylint: disable=W0212
+        self.assertLess(len(exp), variants.get_number_of_raw_variants())
+        self.assertEqual(len(variants), len(exp))
+        self.assertEqual(tuple(variants[i] for i in range(len(variants))),
+                         exp)
+        self.assertRaises(IndexError, variants.__getitem__, len(exp))
+
+    def test_internal_filters_many_pools(self):
+        root = mux.MuxTreeNode()
+        node = root.get_node('mux', True)
+        node.multiplex = True
+        for name in ('a', 'b', 'c'):
+            node.get_node(name, True)
+        for i in range(1200):
+            root.get_node('leaf%s' % i, True)
+        root.get_node('leaf0').filters[1].append('/mux/b')
+        variants = mux.MuxTree(root)
+        self.assertTrue(variants.has_filters())
+        exp = tuple(variants)
+        self.assertEqual([variant[0].name for variant in exp], ['a', 'c'])
+        self.assertEqual([len(variant) for variant in exp], [1201, 1201])
+        self.assertEqual(len(variants), 2)
+        self.assertEqual(variants[1], exp[1])
+
     # Filters are tested in tree_unittests, only verify `multiplex_yamls` calls
     def test_filter_only(self):
         exp = (['intel', 'scsi'], ['intel', 'virtio'])
@@ -576,6 +637,44 @@ class TestCreateFromYaml(unittest.TestCase):
         self.assertEqual(node.path, '/foo')
 
 
+class TestCreateFromYamlCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory(prefix='avocado_mux_cache_')
+        self.cache_dir = os.path.join(self.tmpdir.name, 'cache')
+        for name in ('mux-selftest-advanced.yaml', 'mux-selftest.yaml',
+                     'mux-šelftest-distro.yaml'):
+            shutil.copy(os.path.join(BASEDIR, 'tests', '.data', name),
+                        self.tmpdir.name)
+        self.yaml_url = '/:%s' % os.path.join(self.tmpdir.name,
+                                              'mux-selftest-advanced.yaml')
+
+    def test_cached(self):
+        tree1 = yaml_to_mux.create_from_yaml([self.yaml_url], self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        with unittest.mock.patch('avocado_varianter_yaml_to_mux.'
+                                 '_create_from_yaml') as create:
+            tree2 = yaml_to_mux.create_from_yaml([self.yaml_url],
+                                                 self.cache_dir)
+            create.assert_not_called()
+        self.assertEqual(tree1, tree2)
+        self.assertEqual(yaml_to_mux.create_from_yaml([self.yaml_url]),
+                         tree2)
+
+    def test_included_file_changed(self):
+        tree1 = yaml_to_mux.create_from_yaml([self.yaml_url], self.cache_dir)
+        with open(os.path.join(self.tmpdir.name,
+                               'mux-šelftest-distro.yaml'), 'a') as distro:
+            distro.write('mint:\n    init: systemd\n')
+        tree2 = yaml_to_mux.create_from_yaml([self.yaml_url], self.cache_dir)
+        self.assertNotEqual(tree1, tree2)
+        self.assertEqual(tree2.get_node('/švirt/distro/mint').value,
+                         {'init': 'systemd'})
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
 class TestFingerprint(unittest.TestCase):
 
     def test_fingerprint(self):
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the generation of variants by the yaml_to_mux varianter.
+
+A synthetic multiplex file is generated with a configurable number of
+multiplexed nodes and children per node (by default 6 x 10, that is,
+10^6 variants), with internal filter-only and filter-out filters, and
+the time taken to count and to produce all the valid variants is
+reported for:
+
+ * the compiled filters, pruned while the variants are being built
+ * the same filters evaluated one by one, after building each variant
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from avocado_varianter_yaml_to_mux import create_from_yaml, mux
+
+
+def generate_yaml(muxes, children):
+    """
+    Generates a multiplex file with "muxes" x "children" nodes
+
+    The first child of the first mux only allows the first child of the
+    second mux (filter-only) and the last child of the first mux removes
+    the last child of the third mux (filter-out).
+    """
+    lines = []
+    for mux_no in range(muxes):
+        lines.append("mux%d: !mux" % mux_no)
+        for child_no in range(children):
+            lines.append("    child%d:" % child_no)
+            if mux_no == 0 and child_no == 0 and muxes > 1:
+                lines.append("        !filter-only : /run/mux1/child0")
+            if mux_no == 0 and child_no == children - 1 and muxes > 2:
+                lines.append("        !filter-out : /run/mux2/child%d"
+                             % (children - 1))
+            lines.append("        value%d: %d" % (mux_no, child_no))
+    return "\n".join(lines) + "\n"
+
+
+def measure(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def unpruned(tree):
+    # pylint: disable=W0212
+    return sum(1 for variant in tree.iter_variants()
+               if mux.MuxTree._valid_variant(variant))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--muxes", type=int, default=6,
+                        help="number of multiplexed nodes")
+    parser.add_argument("--children", type=int, default=10,
+                        help="number of children of each multiplexed node")
+    parser.add_argument("--skip-unpruned", action="store_true",
+                        help="skip the (slow) one-by-one filter evaluation")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "mux.yaml")
+        with open(path, "w") as yaml_file:
+            yaml_file.write(generate_yaml(args.muxes, args.children))
+        root, load_time = measure(lambda: create_from_yaml(["/run:" + path]))
+
+    results = {"benchmark": "mux_variants",
+               "raw_variants": args.children ** args.muxes,
+               "load": load_time}
+    tree, results["tree"] = measure(lambda: mux.MuxTree(root))
+    results["variants"], results["len"] = measure(lambda: len(tree))
+    tree = mux.MuxTree(root)
+    _, results["iterate"] = measure(lambda: sum(1 for _ in tree))
+    if not args.skip_unpruned:
+        count, results["iterate_unpruned"] = measure(lambda: unpruned(tree))
+        assert count == results["variants"]
+    json.dump(results, sys.stdout, indent=4)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the overhead of Avocado itself, as opposed to the tests it runs.
+
+All benchmarks run offline, on synthetic test trees, status messages and
+result sets generated in a temporary directory.  Every measurement is a
+time in seconds (so lower is better), and the best of a number of
+repetitions is reported:
+
+ * startup: running "avocado --version"
+ * list: running "avocado list" on a tree of INSTRUMENTED test files
+ * run.runner and run.nrunner: the time per no-op test, with the
+   startup time subtracted, of a job run by the legacy runner and the
+   nrunner
+ * status_server, status_server.json_lines and status_server.unix:
+   sending a number of status messages, with a binary payload, from
+   another process to a status server, until all tasks are reported
+   finished, with the binary and the JSON lines protocols over TCP, and
+   with the binary protocol over a UNIX domain socket
+ * status_protocol and status_protocol.json_lines: encoding and
+   decoding those same messages, in process, with each protocol
+ * status_repo: processing a number of raw status messages
+ * variants: producing all the variants of a multiplex file
+ * render.json and render.xunit: rendering a result with many tests
+
+The results are written as JSON, and two of those files can be compared
+with the "compare" command, which exits with an error if any of the
+measurements regressed above a given threshold.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from avocado.core.nrunner import TaskStatusService, json_dumps
+from avocado.core.result import Result
+from avocado.core.status import protocol
+from avocado.core.status.repo import StatusRepo
+from avocado.core.status.utils import json_loads
+from avocado.core.status_server import StatusServer
+from avocado.core.version import VERSION
+from avocado.plugins.jsonresult import JSONResult
+from avocado.plugins.xunit import XUnitResult
+
+try:
+    from avocado_varianter_yaml_to_mux import create_from_yaml, mux
+    from mux_variants import generate_yaml
+    MUX_AVAILABLE = True
+except ImportError:
+    MUX_AVAILABLE = False
+
+#: Version of the results format
+FORMAT_VERSION = 1
+
+TEST_FILE_HEADER = """from avocado import Test
+
+
+class NoOp(Test):
+"""
+
+TEST_METHOD = """
+    def test_%d(self):
+        pass
+"""
+
+STATUSES = ('PASS', 'PASS', 'PASS', 'FAIL', 'ERROR', 'SKIP', 'CANCEL')
+
+
+def best_of(repeat, func):
+    """
+    Runs func a number of times, returning the best time and last result
+    """
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def avocado(*args):
+    result = subprocess.run([sys.executable, "-m", "avocado"] + list(args),
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE,
+                            check=False)
+    if result.returncode != 0:
+        raise RuntimeError("avocado %s failed:\n%s"
+                           % (" ".join(args), result.stderr.decode()))
+
+
+def write_test_file(path, methods):
+    with open(path, "w") as test_file:
+        test_file.write(TEST_FILE_HEADER)
+        for number in range(methods):
+            test_file.write(TEST_METHOD % number)
+
+
+def bench_startup(args, _):
+    return {"startup": best_of(args.repeat, lambda: avocado("--version"))[0]}
+
+
+def bench_list(args, tmpdir):
+    tree = os.path.join(tmpdir, "list")
+    os.mkdir(tree)
+    for number in range(args.files):
+        write_test_file(os.path.join(tree, "test_%d.py" % number),
+                        args.methods)
+    return {"list": best_of(args.repeat, lambda: avocado("list", tree))[0]}
+
+
+def bench_run(args, tmpdir):
+    path = os.path.join(tmpdir, "noop.py")
+    write_test_file(path, args.tests)
+    results_dir = os.path.join(tmpdir, "job-results")
+    startup = best_of(args.repeat, lambda: avocado("--version"))[0]
+    results = {}
+    for runner in ("runner", "nrunner"):
+        elapsed = best_of(args.repeat,
+                          lambda: avocado("run", "--disable-sysinfo",
+                                          "--job-results-dir", results_dir,
+                                          "--test-runner", runner,
+                                          path))[0]
+        results["run.%s" % runner] = (elapsed - startup) / args.tests
+    return results
+
+
+def status_messages(tasks, messages, payload):
+    log = os.urandom(payload)
+    for number in range(messages):
+        yield {"id": "task-%d" % (number % tasks), "status": "running",
+               "time": time.time(), "log": log}
+    for number in range(tasks):
+        yield {"id": "task-%d" % number, "status": "finished",
+               "result": "pass", "time": time.time()}
+
+
+def send_statuses(uri, binary, tasks, messages, payload):
+    service = TaskStatusService(uri, binary=binary)
+    for message in status_messages(tasks, messages, payload):
+        service.post(message)
+    service.close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def status_server_once(uri, binary, tasks, messages, payload):
+    server = StatusServer(uri, ["task-%d" % number for number in range(tasks)])
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        server.start()
+        # let the server start listening before connecting to it
+        loop.run_until_complete(asyncio.sleep(0.1))
+        sender = multiprocessing.Process(target=send_statuses,
+                                         args=(uri, binary, tasks,
+                                               messages, payload))
+        start = time.perf_counter()
+        sender.start()
+        loop.run_until_complete(server.wait())
+        elapsed = time.perf_counter() - start
+        sender.join()
+    finally:
+        loop.close()
+        asyncio.set_event_loop(None)
+    return elapsed
+
+
+def bench_status_server(args, tmpdir):
+    # the server prints its own progress, which is not of interest here
+    with open(os.devnull, "w") as devnull:
+        stdout = sys.stdout
+        sys.stdout = devnull
+        try:
+            results = {}
+            unix_uri = "unix:%s" % os.path.join(tmpdir, "status.sock")
+            for name, uri, binary in (
+                    ("status_server", None, True),
+                    ("status_server.json_lines", None, False),
+                    ("status_server.unix", unix_uri, True)):
+                results[name] = min(
+                    status_server_once(uri or "127.0.0.1:%d" % free_port(),
+                                       binary, args.tasks, args.messages,
+                                       args.payload)
+                    for _ in range(args.repeat))
+        finally:
+            sys.stdout = stdout
+    return results
+
+
+def bench_status_protocol(args, _):
+    messages = list(status_messages(args.tasks, args.messages, args.payload))
+
+    def binary():
+        for message in messages:
+            data = protocol.encode_frame(message)
+            header_size, chunk_count = protocol.FRAME.unpack_from(data)
+            offset = protocol.FRAME.size + header_size
+            chunks = []
+            for _ in range(chunk_count):
+                chunk_size, = protocol.CHUNK.unpack_from(data, offset)
+                offset += protocol.CHUNK.size
+                chunks.append(data[offset:offset + chunk_size])
+                offset += chunk_size
+            protocol.decode_frame(data[protocol.FRAME.size:
+                                       protocol.FRAME.size + header_size],
+                                  chunks)
+
+    def json_lines():
+        for message in messages:
+            json_loads(json_dumps(message).encode("ascii") + b"\n")
+
+    return {"status_protocol": best_of(args.repeat, binary)[0],
+            "status_protocol.json_lines": best_of(args.repeat,
+                                                  json_lines)[0]}
+
+
+def bench_status_repo(args, _):
+    messages = []
+    for number in range(args.tasks):
+        messages.append(json.dumps({"id": "task-%d" % number,
+                                    "status": "started",
+                                    "output_dir": "/tmp",
+                                    "time": time.time()}))
+    for number in range(args.messages):
+        messages.append(json.dumps({"id": "task-%d" % (number % args.tasks),
+                                    "status": "running",
+                                    "time": time.time()}))
+
+    def process():
+        repo = StatusRepo()
+        for message in messages:
+            repo.process_raw_message(message)
+        repo.close()
+
+    return {"status_repo": best_of(args.repeat, process)[0]}
+
+
+def bench_variants(args, tmpdir):
+    if not MUX_AVAILABLE:
+        return {}
+    path = os.path.join(tmpdir, "mux.yaml")
+    with open(path, "w") as yaml_file:
+        yaml_file.write(generate_yaml(args.muxes, args.children))
+    root = create_from_yaml(["/run:" + path])
+
+    def variants():
+        return sum(1 for _ in mux.MuxTree(root))
+
+    return {"variants": best_of(args.repeat, variants)[0]}
+
+
+def synthetic_result(tmpdir, tests):
+    logfile = os.path.join(tmpdir, "debug.log")
+    with open(logfile, "w") as log:
+        log.write("Test log line\n" * 100)
+    result = Result("0" * 40, os.path.join(tmpdir, "job.log"))
+    result.tests_total = tests
+    for number in range(tests):
+        status = STATUSES[number % len(STATUSES)]
+        state = {"name": "%d-noop.py:NoOp.test_%d" % (number + 1, number),
+                 "status": status,
+                 "time_start": 1.0,
+                 "time_end": 2.0,
+                 "time_elapsed": 1.0,
+                 "whiteboard": "",
+                 "logdir": tmpdir,
+                 "logfile": logfile,
+                 "fail_reason": "None" if status == "PASS" else "reason",
+                 "traceback": "Traceback",
+                 "resource_usage": {"cpu_user": 0.5, "max_rss": 1024}}
+        result.check_test(state)
+    result.end_tests()
+    return result
+
+
+def bench_render(args, tmpdir):
+    result = synthetic_result(tmpdir, args.results)
+    # pylint: disable=W0212
+    json_time = best_of(args.repeat,
+                        lambda: JSONResult()._render(result))[0]
+    xunit_time = best_of(args.repeat,
+                         lambda: XUnitResult()._render(result, 100000,
+                                                       None))[0]
+    return {"render.json": json_time,
+            "render.xunit": xunit_time}
+
+
+BENCHMARKS = {"startup": bench_startup,
+              "list": bench_list,
+              "run": bench_run,
+              "status_server": bench_status_server,
+              "status_protocol": bench_status_protocol,
+              "status_repo": bench_status_repo,
+              "variants": bench_variants,
+              "render": bench_render}
+
+
+def run(args):
+    names = args.benchmark or list(BENCHMARKS)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="avocado-benchmarks-") as tmpdir:
+        for name in names:
+            bench_dir = os.path.join(tmpdir, name)
+            os.mkdir(bench_dir)
+            results.update(BENCHMARKS[name](args, bench_dir))
+    parameters = {key: value for key, value in vars(args).items()
+                  if key not in ("func", "command", "benchmark", "output")}
+    content = {"format": FORMAT_VERSION,
+               "avocado": VERSION,
+               "python": platform.python_version(),
+               "machine": platform.machine(),
+               "parameters": parameters,
+               "results": results}
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(content, output, indent=4)
+    json.dump(content, sys.stdout, indent=4)
+    sys.stdout.write("\n")
+    return 0
+
+
+def compare(args):
+    with open(args.old) as old_file:
+        old = json.load(old_file)
+    with open(args.new) as new_file:
+        new = json.load(new_file)
+    if old.get("parameters") != new.get("parameters"):
+        sys.stderr.write("Warning: the runs were made with different "
+                         "parameters\n")
+    regressions = []
+    print("%-16s %12s %12s %8s" % ("benchmark", "old (s)", "new (s)",
+                                   "change"))
+    for name, old_time in sorted(old["results"].items()):
+        new_time = new["results"].get(name)
+        if new_time is None or old_time <= 0:
+            continue
+        change = (new_time - old_time) / old_time
+        flag = ""
+        if change > args.threshold:
+            regressions.append(name)
+            flag = " REGRESSION"
+        print("%-16s %12.6f %12.6f %+7.1f%%%s" % (name, old_time, new_time,
+                                                  change * 100, flag))
+    if regressions:
+        print("Regressions above %.0f%%: %s" % (args.threshold * 100,
+                                                ", ".join(regressions)))
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip(),
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks")
+    run_parser.set_defaults(func=run)
+    run_parser.add_argument("--benchmark", action="append",
+                            choices=list(BENCHMARKS),
+                            help="benchmark to run (may be given multiple "
+                                 "times), defaults to all of them")
+    run_parser.add_argument("--output", help="also write the results to "
+                                             "this file")
+    run_parser.add_argument("--repeat", type=int, default=3,
+                            help="number of repetitions of each measurement")
+    run_parser.add_argument("--files", type=int, default=50,
+                            help="number of test files listed")
+    run_parser.add_argument("--methods", type=int, default=10,
+                            help="number of tests on each listed file")
+    run_parser.add_argument("--tests", type=int, default=20,
+                            help="number of no-op tests run on each runner")
+    run_parser.add_argument("--tasks", type=int, default=100,
+                            help="number of tasks reporting status")
+    run_parser.add_argument("--messages", type=int, default=20000,
+                            help="number of running status messages")
+    run_parser.add_argument("--payload", type=int, default=4096,
+                            help="size of the binary payload (bytes) of "
+                                 "each running status message")
+    run_parser.add_argument("--muxes", type=int, default=4,
+                            help="number of multiplexed nodes for variants")
+    run_parser.add_argument("--children", type=int, default=10,
+                            help="number of children of each multiplexed "
+                                 "node for variants")
+    run_parser.add_argument("--results", type=int, default=5000,
+                            help="number of tests on the rendered result")
+
+    compare_parser = subparsers.add_parser("compare",
+                                           help="compare two result files")
+    compare_parser.set_defaults(func=compare)
+    compare_parser.add_argument("old", help="baseline results file")
+    compare_parser.add_argument("new", help="results file to compare")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="relative slowdown considered a "
+                                     "regression (default: 0.1, i.e. 10%%)")
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the memory used by the environments of the tree nodes.
+
+A synthetic tree is generated with a configurable depth, number of
+children per node on the last levels and number of values per node
+(by default, a chain of 50 nodes, ending on 2 levels of 30 children,
+that is, 900 leaves, with 20 values of their own each), and the memory
+allocated, and the time taken, to get the environment of every node is
+reported for:
+
+ * the layered environments, which share the values of their parents
+ * flat copies of those, as the environments used to be
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from avocado.core import tree
+
+
+def generate_tree(depth, children, values):
+    """
+    Generates a chain of "depth" nodes, ending on two levels of "children"
+    """
+    def node_values(level):
+        return {"key%d_%d" % (level, number): level
+                for number in range(values)}
+
+    root = tree.TreeNode("", node_values(0))
+    node = root
+    for level in range(1, depth):
+        child = tree.TreeNode("level%d" % level, node_values(level))
+        node.add_child(child)
+        node = child
+    for child_no in range(children):
+        child = tree.TreeNode("child%d" % child_no, node_values(depth))
+        node.add_child(child)
+        for grandchild_no in range(children):
+            child.add_child(tree.TreeNode("grandchild%d" % grandchild_no,
+                                          node_values(depth + 1)))
+    return root
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--depth", type=int, default=50,
+                        help="number of nodes on the chain")
+    parser.add_argument("--children", type=int, default=30,
+                        help="number of children on each of the last levels")
+    parser.add_argument("--values", type=int, default=20,
+                        help="number of values of each node")
+    args = parser.parse_args()
+
+    root = generate_tree(args.depth, args.children, args.values)
+    nodes = list(root.iter_children_preorder())
+    results = {"benchmark": "tree_environment", "nodes": len(nodes)}
+
+    environments, results["layered_memory"], results["layered_time"] = \
+        measure(lambda: [node.environment for node in nodes])
+    _, results["flat_memory"], results["flat_time"] = \
+        measure(lambda: [environment.copy() for environment in environments])
+    leaves = root.get_leaves()
+    _, _, results["layered_items"] = measure(
+        lambda: [list(leaf.environment.items()) for leaf in leaves])
+    json.dump(results, sys.stdout, indent=4)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the generation of the variant ids during the job setup.
+
+A tree is generated with two groups of leaves (by default, 10 leaves
+each, that is, 100 variants of 2 nodes), and the time taken to generate
+the id of every variant, along with the test id, for each one of a
+configurable number of tests (by default 10000) is reported.
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import time
+
+from avocado.core import tree, varianter
+from avocado.core.test_id import TestID
+
+
+def generate_variants(leaves):
+    """
+    Generates the variants out of a tree with two groups of "leaves"
+    """
+    root = tree.TreeNode("")
+    groups = []
+    for group_no in range(2):
+        group = tree.TreeNode("group%d" % group_no, {"group": group_no})
+        root.add_child(group)
+        for leaf_no in range(leaves):
+            group.add_child(tree.TreeNode("leaf%d" % leaf_no,
+                                          {"leaf%d" % group_no: leaf_no}))
+        groups.append(group.children)
+    return itertools.product(*groups)
+
+
+def setup_job(tests, variants):
+    for test_no in range(tests):
+        for variant in variants:
+            variant_id = varianter.generate_variant_id(list(variant))
+            TestID(test_no + 1, "test.py:Test.test", {"variant_id": variant_id})
+
+
+def measure(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--tests", type=int, default=10000,
+                        help="number of tests")
+    parser.add_argument("--leaves", type=int, default=10,
+                        help="number of leaves on each group")
+    args = parser.parse_args()
+
+    variants = list(generate_variants(args.leaves))
+    results = {"benchmark": "variant_id",
+               "tests": args.tests,
+               "variants": len(variants)}
+    results["setup"] = measure(lambda: setup_job(args.tests, variants))
+    json.dump(results, sys.stdout, indent=4)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
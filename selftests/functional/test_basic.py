@@ -202,6 +202,21 @@ class RunnerOperationTest(TestCaseTmpDir):
         self.assertIn('["/run/*"]', variants, "paths stored in jobdata "
                       "does not contains [\"/run/*\"]\n%s" % variants)
 
+    def test_runner_trace(self):
+        cmd_line = ('%s run --disable-sysinfo --job-results-dir %s --trace '
+                    'passtest.py' % (AVOCADO, self.tmpdir.name))
+        process.run(cmd_line)
+        trace_path = os.path.join(self.tmpdir.name, "latest", "trace.json")
+        with open(trace_path) as trace_file:
+            events = json.load(trace_file)['traceEvents']
+        names = [event['name'] for event in events]
+        for name in ('create_test_suite', 'pre_tests', 'run_suite', 'load_test',
+                     'setUp', 'test', 'tearDown', 'post_tests', 'run'):
+            self.assertIn(name, names)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name,
+                                                     "latest",
+                                                     "trace.jsonl")))
+
     def test_runner_failfast(self):
         cmd_line = ('%s run --disable-sysinfo --job-results-dir %s '
                     'passtest.py failtest.py passtest.py --failfast'
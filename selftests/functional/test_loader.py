@@ -259,10 +259,10 @@ class LoaderTestFunctional(TestCaseTmpDir):
                     % (AVOCADO, self.tmpdir.name, mytest))
         self._run_with_timeout(cmd_line, 5)
 
-    def test_python_unittest(self):
+    def _check_python_unittest(self, extra_args=""):
         test_path = os.path.join(BASEDIR, "selftests", ".data", "unittests.py")
-        cmd = ("%s run --disable-sysinfo --job-results-dir %s --json - -- %s"
-               % (AVOCADO, self.tmpdir.name, test_path))
+        cmd = ("%s run --disable-sysinfo --job-results-dir %s --json - %s -- %s"
+               % (AVOCADO, self.tmpdir.name, extra_args, test_path))
         result = process.run(cmd, ignore_status=True)
         jres = json.loads(result.stdout_text)
         self.assertEqual(result.exit_status, 1, result)
@@ -283,6 +283,12 @@ class LoaderTestFunctional(TestCaseTmpDir):
         self.assertFalse(exps, "Some expected result not matched to actual"
                          "results:\n%s\n\nexps = %s" % (result, exps))
 
+    def test_python_unittest(self):
+        self._check_python_unittest()
+
+    def test_python_unittest_batch(self):
+        self._check_python_unittest("--python-unittest-batch")
+
     def test_list_subtests_filter(self):
         """
         Check whether the subtests filter works for both INSTRUMENTED
@@ -3,7 +3,7 @@ import tempfile
 import unittest
 
 from avocado.utils import asset
-from avocado.utils.filelock import FileLock
+from avocado.utils.filelock import FcntlLock
 
 from .. import TestCaseTmpDir, setup_avocado_loggers
 
@@ -56,6 +56,25 @@ class TestAsset(TestCaseTmpDir):
                                          self.assetname)
         self.assertEqual(foo_tarball, expected_location)
 
+    def test_fetch_other_algorithm(self):
+        foo_tarball = asset.Asset(self.assetname,
+                                  asset_hash=self.assethash,
+                                  algorithm='sha1',
+                                  locations=[self.url],
+                                  cache_dirs=[self.cache_dir],
+                                  expire=None).fetch()
+        md5 = 'a258ca9eb8765b2b5541f42c9b232226'
+        self.assertEqual(asset.Asset(self.assetname,
+                                     asset_hash=md5,
+                                     algorithm='md5',
+                                     locations=[self.url],
+                                     cache_dirs=[self.cache_dir],
+                                     expire=None).find_asset_file(),
+                         foo_tarball)
+        with open('%s-CHECKSUM' % foo_tarball, 'r') as hash_file:
+            self.assertEqual(hash_file.read(),
+                             'md5 %s\nsha1 %s\n' % (md5, self.assethash))
+
     def test_fetch_expire(self):
         foo_tarball = asset.Asset(self.assetname,
                                   asset_hash=self.assethash,
@@ -114,7 +133,7 @@ class TestAsset(TestCaseTmpDir):
     def test_fetch_lockerror(self):
         dirname = os.path.join(self.cache_dir, 'by_name')
         os.makedirs(dirname)
-        with FileLock(os.path.join(dirname, self.assetname)):
+        with FcntlLock(os.path.join(dirname, self.assetname)):
             a = asset.Asset(self.assetname,
                             asset_hash=self.assethash,
                             algorithm='sha1',
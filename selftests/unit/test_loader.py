@@ -1,3 +1,4 @@
+import inspect
 import os
 import stat
 import tempfile
@@ -415,5 +416,87 @@ class LoaderTest(unittest.TestCase):
         self.tmpdir.cleanup()
 
 
+PRELOAD_TEST = """from avocado import Test
+
+class PassTest(Test):
+    def test(self):
+        pass
+"""
+
+
+class PreloadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.proxy = loader.TestLoaderProxy()
+        prefix = temp_dir_prefix(__name__, self, 'setUp')
+        self.tmpdir = tempfile.TemporaryDirectory(prefix=prefix)
+        self.imports_path = os.path.join(self.tmpdir.name, 'imports')
+
+    def _write_module(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w') as module:
+            module.write(content)
+        return path
+
+    def _load(self, test_path, index=1):
+        return self.proxy.load_test(('PassTest',
+                                     {'name': TestID(index, 'PassTest.test'),
+                                      'base_logdir': self.tmpdir.name,
+                                      'methodName': 'test',
+                                      'modulePath': test_path}))
+
+    def test_preloaded_once(self):
+        content = ("open(%r, 'a').write('x')\n%s"
+                   % (self.imports_path, PRELOAD_TEST))
+        test_path = self._write_module('preloadtest.py', content)
+        self.assertIsNotNone(self.proxy.preload_test_module(test_path))
+        self.assertIsNone(self.proxy.preload_test_module(test_path))
+        for index in range(1, 3):
+            instance = self._load(test_path, index)
+            self.assertEqual(instance.__class__.__name__, 'PassTest')
+            self.assertGreaterEqual(instance.time_import, 0)
+        with open(self.imports_path) as imports:
+            self.assertEqual(imports.read(), 'x')
+
+    def test_not_preloaded(self):
+        test_path = self._write_module('notpreloaded.py', PRELOAD_TEST)
+        instance = self._load(test_path)
+        self.assertEqual(instance.__class__.__name__, 'PassTest')
+        self.assertGreaterEqual(instance.time_import, 0)
+
+    def test_preload_same_name(self):
+        paths = []
+        for directory in ('a', 'b'):
+            os.mkdir(os.path.join(self.tmpdir.name, directory))
+            paths.append(self._write_module(
+                os.path.join(directory, 'sametest.py'), PRELOAD_TEST))
+        self.assertIsNotNone(self.proxy.preload_test_module(paths[0]))
+        # it would replace the module preloaded from the other directory
+        self.assertIsNone(self.proxy.preload_test_module(paths[1]))
+        for index, path in enumerate(paths, 1):
+            instance = self._load(path, index)
+            self.assertEqual(inspect.getfile(instance.__class__), path)
+
+    def test_preload_cleared(self):
+        content = ("open(%r, 'a').write('x')\n%s"
+                   % (self.imports_path, PRELOAD_TEST))
+        test_path = self._write_module('clearedtest.py', content)
+        self.assertIsNotNone(self.proxy.preload_test_module(test_path))
+        self.proxy.clear_preloaded_modules()
+        instance = self._load(test_path)
+        self.assertEqual(instance.__class__.__name__, 'PassTest')
+        with open(self.imports_path) as imports:
+            self.assertEqual(imports.read(), 'xx')
+
+    def test_preload_broken(self):
+        test_path = self._write_module('brokenpreload.py',
+                                       'import fmaslkfdsaf\n' + PRELOAD_TEST)
+        self.assertIsNone(self.proxy.preload_test_module(test_path))
+        self.assertIsInstance(self._load(test_path), test.TestError)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,8 @@
+import json
 import os
+import shutil
+import socket
+import subprocess
 import sys
 import tempfile
 import unittest.mock
@@ -219,6 +223,21 @@ class Runner(unittest.TestCase):
         self.assertEqual(last_result['stderr'], b'')
         self.assertIn('time', last_result)
 
+    def test_task_resource_usage(self):
+        runnable = nrunner.Runnable('exec-test', sys.executable, '-c',
+                                    'data = bytearray(64 * 1024 * 1024)')
+        task = nrunner.Task(
+            '1-resource-usage', runnable,
+            known_runners=nrunner.RUNNERS_REGISTRY_PYTHON_CLASS)
+        try:
+            last_result = list(task.run())[-1]
+        finally:
+            shutil.rmtree(task.output_dir)
+        self.assertEqual(last_result['result'], 'pass')
+        usage = last_result['resource_usage']
+        self.assertGreater(usage['max_rss'], 64 * 1024)
+        self.assertGreater(usage['cpu_user'] + usage['cpu_system'], 0)
+
     @skipUnlessPathExists('/bin/false')
     def test_runner_exec_test_fail(self):
         runnable = nrunner.Runnable('exec-test', '/bin/false')
@@ -390,6 +409,116 @@ echo 'ok 2 - description 2'"""
         self.assertEqual(last_result['result'], 'error')
         self.assertEqual(last_result['returncode'], 0)
 
+    @skipUnlessPathExists('/bin/sh')
+    def test_runner_tap_running_statuses(self):
+        tap_script = """#!/bin/sh
+echo '1..2'
+echo 'ok 1 - description 1'
+echo 'ok 2 - description 2'"""
+        tap_path = os.path.join(self.tmpdir.name, 'tap.sh')
+
+        with open(tap_path, 'w') as fp:
+            fp.write(tap_script)
+
+        runnable = nrunner.Runnable('tap', '/bin/sh', tap_path)
+        runner = nrunner_tap.TAPRunner(runnable)
+        tap_tests = [status['tap_test'] for status in runner.run()
+                     if 'tap_test' in status]
+        self.assertEqual(tap_tests,
+                         [{'number': 1, 'name': '- description 1',
+                           'result': 'PASS'},
+                          {'number': 2, 'name': '- description 2',
+                           'result': 'PASS'}])
+
+    @skipUnlessPathExists('/bin/sh')
+    def test_runner_tap_large_output(self):
+        tap_script = """#!/bin/sh
+echo '1..1'
+i=0
+while [ $i -lt 2000 ]; do
+    echo '# some very long diagnostic line, to fill up the pipe buffer'
+    i=$((i + 1))
+done
+echo 'ok 1 - description 1'"""
+        tap_path = os.path.join(self.tmpdir.name, 'tap.sh')
+
+        with open(tap_path, 'w') as fp:
+            fp.write(tap_script)
+
+        runnable = nrunner.Runnable('tap', '/bin/sh', tap_path)
+        runner = nrunner_tap.TAPRunner(runnable)
+        last_result = list(runner.run())[-1]
+        self.assertEqual(last_result['status'], 'finished')
+        self.assertEqual(last_result['result'], 'pass')
+
+    def test_runner_tap_long_lines(self):
+        code = ("import sys; sys.stdout.write('a' * 250 + '\\n' + "
+                "'b' * 1000)")
+        process = subprocess.Popen([sys.executable, '-c', code],
+                                   stdout=subprocess.PIPE)
+        with unittest.mock.patch('avocado.core.nrunner.'
+                                 'EXEC_RUNNER_OUTPUT_LIMIT', 100):
+            lines = [line for line in
+                     nrunner_tap.TAPRunner._iter_lines(process)
+                     if line is not None]
+        process.stdout.close()
+        process.wait()
+        # the rest of the long lines is discarded
+        self.assertEqual(lines, [b'a' * 100, b'b' * 100])
+
+    @skipUnlessPathExists('/bin/sh')
+    def test_runner_tap_long_line_not_parsed(self):
+        tap_script = """#!/bin/sh
+echo '1..1'
+echo 'ok 1 - description 1'
+echo '# %snot ok 2 - bogus'""" % ('x' * 98)
+        tap_path = os.path.join(self.tmpdir.name, 'tap.sh')
+
+        with open(tap_path, 'w') as fp:
+            fp.write(tap_script)
+
+        runnable = nrunner.Runnable('tap', '/bin/sh', tap_path)
+        runner = nrunner_tap.TAPRunner(runnable)
+        with unittest.mock.patch('avocado.core.nrunner.'
+                                 'EXEC_RUNNER_OUTPUT_LIMIT', 100):
+            last_result = list(runner.run())[-1]
+        self.assertEqual(last_result['result'], 'pass')
+
+    def test_runner_exec_large_output(self):
+        # much more than what fits on a pipe buffer, on both streams
+        code = ("import sys; sys.stdout.write('a' * 1000000 + 'end'); "
+                "sys.stderr.write('b' * 1000000)")
+        runnable = nrunner.Runnable('exec-test', sys.executable, '-c', code,
+                                    AVOCADO_TEST_OUTPUT_DIR=self.tmpdir.name)
+        runner = nrunner.ExecTestRunner(runnable)
+        with unittest.mock.patch('avocado.core.nrunner.'
+                                 'EXEC_RUNNER_OUTPUT_LIMIT', 10):
+            last_result = list(runner.run())[-1]
+        self.assertEqual(last_result['result'], 'pass')
+        self.assertEqual(last_result['stdout'], b'aaaaaaaend')
+        self.assertEqual(last_result['stderr'], b'b' * 10)
+        self.assertEqual(last_result['stdout_size'], 1000003)
+        self.assertEqual(last_result['stderr_size'], 1000000)
+        stdout_path = os.path.join(self.tmpdir.name, 'stdout')
+        self.assertEqual(last_result['stdout_path'], stdout_path)
+        self.assertEqual(os.path.getsize(stdout_path), 1000003)
+        self.assertEqual(os.path.getsize(last_result['stderr_path']),
+                         1000000)
+
+    def test_runner_exec_running_sizes(self):
+        code = ("import sys, time; sys.stdout.write('a' * 10); "
+                "sys.stdout.flush(); time.sleep(0.2)")
+        runnable = nrunner.Runnable('exec', sys.executable, '-c', code)
+        runner = nrunner.ExecRunner(runnable)
+        results = list(runner.run())
+        running = [result for result in results
+                   if result['status'] == 'running']
+        self.assertTrue(running)
+        self.assertIn(running[-1]['stdout_size'], (0, 10))
+        self.assertEqual(running[-1]['stderr_size'], 0)
+        self.assertNotIn('stdout_path', results[-1])
+        self.assertEqual(results[-1]['stdout'], b'a' * 10)
+
     @skipUnlessPathExists('/bin/sh')
     def test_runner_tap_error(self):
         tap_script = """#!/bin/sh
@@ -453,5 +582,111 @@ class PickRunner(unittest.TestCase):
         self.assertFalse(self.runnable.pick_runner_command({}))
 
 
+class TaskStatusService(unittest.TestCase):
+
+    def setUp(self):
+        prefix = temp_dir_prefix(__name__, self, 'setUp')
+        self.tmpdir = tempfile.TemporaryDirectory(prefix=prefix)
+        self.path = os.path.join(self.tmpdir.name, 'status.sock')
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.path)
+        self.server.listen(1)
+        self.server.settimeout(5)
+
+    def _received(self, connection):
+        connection.settimeout(5)
+        data = b''
+        while True:
+            received = connection.recv(65536)
+            if not received:
+                break
+            data += received
+        connection.close()
+        return [json.loads(line) for line in data.splitlines()]
+
+    def test_unix_buffered(self):
+        service = nrunner.TaskStatusService('unix:%s' % self.path,
+                                            binary=False)
+        service.post({'id': '1', 'status': 'started', 'time': 1})
+        connection, _ = self.server.accept()
+        for number in range(3):
+            service.post({'id': '1', 'status': 'running', 'time': number})
+        service.post({'id': '1', 'status': 'running', 'time': 3,
+                      'log': 'foo'})
+        service.post({'id': '1', 'status': 'running', 'time': 4})
+        service.post({'id': '1', 'status': 'finished', 'time': 5,
+                      'result': 'pass'})
+        service.close()
+        # heartbeats superseded by newer heartbeats are not sent at all
+        self.assertEqual([message['time']
+                          for message in self._received(connection)],
+                         [1, 2, 3, 4, 5])
+
+    def test_first_message(self):
+        service = nrunner.TaskStatusService('unix:%s' % self.path,
+                                            binary=False)
+        service.post({'id': '1', 'status': 'running', 'time': 1})
+        connection, _ = self.server.accept()
+        service.post({'id': '1', 'status': 'running', 'time': 2})
+        service.post({'id': '1', 'status': 'finished', 'time': 3,
+                      'result': 'pass'})
+        service.close()
+        # the first message tells when the task started, even if it is
+        # just a heartbeat
+        self.assertEqual([message['time']
+                          for message in self._received(connection)],
+                         [1, 2, 3])
+
+    def test_heartbeat_flush_interval(self):
+        service = nrunner.TaskStatusService('unix:%s' % self.path,
+                                            binary=False)
+        service.post({'id': '1', 'status': 'started', 'time': 1})
+        connection, _ = self.server.accept()
+        with unittest.mock.patch('avocado.core.nrunner.'
+                                 'STATUS_SERVICE_FLUSH_INTERVAL', 0):
+            service.post({'id': '1', 'status': 'running', 'time': 2})
+        connection.settimeout(5)
+        data = b''
+        while data.count(b'\n') < 2:
+            data += connection.recv(65536)
+        self.assertEqual(json.loads(data.splitlines()[1])['time'], 2)
+        service.close()
+        connection.close()
+
+    def test_reconnect(self):
+        service = nrunner.TaskStatusService('unix:%s' % self.path,
+                                            binary=False)
+        service.post({'id': '1', 'status': 'started', 'time': 1})
+        connection, _ = self.server.accept()
+        self.assertEqual(len(self._received_once(connection)), 1)
+        connection.shutdown(socket.SHUT_RDWR)
+        connection.close()
+        # the first writes after the peer is gone may still succeed
+        for number in range(2, 10):
+            service.post({'id': '1', 'status': 'finished', 'time': number,
+                          'result': 'pass'})
+        connection, _ = self.server.accept()
+        service.close()
+        self.assertEqual(self._received(connection)[-1]['time'], 9)
+
+    @staticmethod
+    def _received_once(connection):
+        connection.settimeout(5)
+        return connection.recv(65536).splitlines()
+
+    def test_connect_attempts(self):
+        self.server.close()
+        os.unlink(self.path)
+        service = nrunner.TaskStatusService('unix:%s' % self.path)
+        with unittest.mock.patch('avocado.core.nrunner.'
+                                 'STATUS_SERVICE_RECONNECT_DELAY', 0):
+            with self.assertRaises(OSError):
+                service.post({'id': '1', 'status': 'started', 'time': 1})
+
+    def tearDown(self):
+        self.server.close()
+        self.tmpdir.cleanup()
+
+
 if __name__ == '__main__':
     unittest.main()
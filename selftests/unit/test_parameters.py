@@ -49,6 +49,24 @@ class Parameters(unittest.TestCase):
         # Note: Different origin of the same value, which should produce
         # a crash, are tested in yaml2mux selftest
 
+    def test_lookup_by_path(self):
+        root = tree.TreeNode()
+        root.value = {'timeout': 1}
+        foo = root.get_node("/run/foo", True)
+        foo.value = {'image': 'foo.img'}
+        bar = root.get_node("/run/bar", True)
+        bar.value = {'image': 'bar.img', 'size': 10}
+        params = parameters.AvocadoParams([foo, bar], ['/run/*'])
+        self.assertEqual(params.get('timeout'), 1)
+        self.assertEqual(params.get('size'), 10)
+        self.assertEqual(params.get('image', '/run/foo/*'), 'foo.img')
+        self.assertEqual(params.get('image', '/run/bar/*'), 'bar.img')
+        self.assertEqual(params.get('size', '/run/foo/*', 'none'), 'none')
+        self.assertEqual(params.get('missing', default='none'), 'none')
+        # same key, different origins matched by the same path
+        self.assertRaises(ValueError, params.get, 'image')
+        self.assertRaises(ValueError, params.get, 'image', '/run/*')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+import unittest
+
+from avocado.core import resource_usage
+
+
+@unittest.skipUnless(resource_usage.RESOURCE_AVAILABLE,
+                     'resource module is not available')
+class ResourceUsageTracker(unittest.TestCase):
+
+    def test_self(self):
+        tracker = resource_usage.ResourceUsageTracker()
+        tracker.start()
+        sum(range(10 ** 6))
+        usage = tracker.stop()
+        self.assertGreater(usage['cpu_user'] + usage['cpu_system'], 0)
+        self.assertGreater(usage['max_rss'], 0)
+        for key in usage:
+            self.assertIn(key, resource_usage.USAGE_KEYS)
+            self.assertGreaterEqual(usage[key], 0)
+
+    def test_children_only(self):
+        tracker = resource_usage.ResourceUsageTracker(include_self=False)
+        tracker.start()
+        subprocess.run([sys.executable, '-c', 'sum(range(10 ** 6))'],
+                       check=True)
+        usage = tracker.stop()
+        self.assertGreater(usage['cpu_user'] + usage['cpu_system'], 0)
+        self.assertNotIn('read_bytes', usage)
+
+    def test_not_started(self):
+        self.assertIsNone(resource_usage.ResourceUsageTracker().stop())
+
+
+if __name__ == '__main__':
+    unittest.main()
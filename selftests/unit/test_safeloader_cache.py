@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest.mock
+
+from avocado.core import safeloader
+
+from .. import temp_dir_prefix
+
+
+class DiscoveryCache(unittest.TestCase):
+
+    def setUp(self):
+        prefix = temp_dir_prefix(__name__, self, 'setUp')
+        self.tmpdir = tempfile.TemporaryDirectory(prefix=prefix)
+        self.cache_dir = os.path.join(self.tmpdir.name, 'cache')
+        self.base_path = os.path.join(self.tmpdir.name, 'base.py')
+        self.test_path = os.path.join(self.tmpdir.name, 'test.py')
+        self._write(self.base_path, ('from avocado import Test\n'
+                                     'class Base(Test):\n'
+                                     '    def test_base(self):\n'
+                                     '        pass\n'))
+        self._write(self.test_path, ('from base import Base\n'
+                                     'class Child(Base):\n'
+                                     '    def test_child(self):\n'
+                                     '        pass\n'))
+
+    @staticmethod
+    def _write(path, content):
+        with open(path, 'w') as source_file:
+            source_file.write(content)
+
+    def _find(self):
+        with safeloader.discovery_cache(self.cache_dir):
+            return safeloader.find_avocado_tests(self.test_path)
+
+    def _methods(self):
+        return [method for method, _, _ in self._find()[0]['Child']]
+
+    def test_cached(self):
+        found = self._find()
+        self.assertEqual(found, safeloader.find_avocado_tests(self.test_path))
+        with unittest.mock.patch('avocado.core.safeloader.'
+                                 '_find_python_tests') as find:
+            self.assertEqual(self._find(), found)
+            find.assert_not_called()
+
+    def test_changed(self):
+        self.assertEqual(self._methods(), ['test_child', 'test_base'])
+        self._write(self.test_path, ('from base import Base\n'
+                                     'class Child(Base):\n'
+                                     '    def test_other(self):\n'
+                                     '        pass\n'))
+        self.assertEqual(self._methods(), ['test_other', 'test_base'])
+
+    def test_parent_changed(self):
+        self.assertEqual(self._methods(), ['test_child', 'test_base'])
+        self._write(self.base_path, ('from avocado import Test\n'
+                                     'class Base(Test):\n'
+                                     '    def test_other(self):\n'
+                                     '        pass\n'))
+        self.assertEqual(self._methods(), ['test_child', 'test_other'])
+
+    def test_parent_created(self):
+        os.rename(self.base_path, self.base_path + '.orig')
+        self.assertEqual(self._find()[0], {})
+        os.rename(self.base_path + '.orig', self.base_path)
+        self.assertEqual(self._methods(), ['test_child', 'test_base'])
+
+    def test_not_used(self):
+        with safeloader.discovery_cache(None):
+            safeloader.find_avocado_tests(self.test_path)
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,105 @@
 import asyncio
+import os
+import sys
+import tempfile
 import unittest
 
 from avocado.core import nrunner
+from avocado.core.plugin_interfaces import Spawner
 from avocado.core.spawners.mock import MockRandomAliveSpawner, MockSpawner
+from avocado.plugins.spawners.podman import PodmanSpawner
 from avocado.plugins.spawners.process import ProcessSpawner
 
+from .. import temp_dir_prefix
+
+#: A stand-in for the podman binary, that runs the "containers" as local
+#: processes, and logs the commands it was given
+FAKE_PODMAN = """#!%s
+import json
+import os
+import subprocess
+import sys
+import uuid
+
+state_dir = os.path.dirname(os.path.abspath(__file__))
+with open(os.path.join(state_dir, 'calls'), 'a') as calls:
+    calls.write(' '.join(sys.argv[1:2]) + '\\n')
+# commands can be made to fail by creating a "fail-<command>" file
+if os.path.exists(os.path.join(state_dir, 'fail-' + sys.argv[1])):
+    sys.exit(125)
+
+
+def detached(command):
+    return subprocess.Popen(command, stdin=subprocess.DEVNULL,
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL).pid
+
+
+def container_path(container_id):
+    return os.path.join(state_dir, 'container-' + container_id)
+
+
+def new_container(args, detach):
+    entry_point = [arg for arg in args if arg.startswith('--entrypoint=')]
+    entry_point = json.loads(entry_point[0][len('--entrypoint='):])
+    container_id = uuid.uuid4().hex * 2
+    pid = 0
+    if detach:
+        pid = detached(entry_point)
+    with open(container_path(container_id), 'w') as container:
+        json.dump({'entry_point': entry_point, 'pid': pid}, container)
+    print(container_id)
+
+
+def state(pid):
+    if not pid:
+        return 'Created'
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return 'Exited'
+    with open('/proc/%%d/stat' %% pid) as stat:
+        if stat.read().split(')')[-1].split()[0] == 'Z':
+            return 'Exited'
+    return 'Running'
+
+
+command, args = sys.argv[1], sys.argv[2:]
+if command in ('create', 'run'):
+    new_container(args, command == 'run')
+elif command == 'start':
+    with open(container_path(args[0])) as container:
+        data = json.load(container)
+    data['pid'] = detached(data['entry_point'])
+    with open(container_path(args[0]), 'w') as container:
+        json.dump(data, container)
+elif command == 'exec':
+    # processes run on a container end with it
+    with open(container_path(args[0])) as container:
+        data = json.load(container)
+    data.setdefault('exec_pids', []).append(os.getpid())
+    with open(container_path(args[0]), 'w') as container:
+        json.dump(data, container)
+    os.execvp(args[1], args[1:])
+elif command == 'ps':
+    for name in os.listdir(state_dir):
+        if name.startswith('container-'):
+            with open(os.path.join(state_dir, name)) as container:
+                pid = json.load(container)['pid']
+            print(name[len('container-'):], state(pid))
+elif command in ('kill', 'rm'):
+    for container_id in args:
+        if container_id.startswith('--'):
+            continue
+        with open(container_path(container_id)) as container:
+            data = json.load(container)
+        for pid in [data['pid']] + data.get('exec_pids', []):
+            if pid and state(pid) == 'Running':
+                os.kill(pid, 9)
+        if command == 'rm':
+            os.unlink(container_path(container_id))
+""" % sys.executable
+
 
 class Process(unittest.TestCase):
     def setUp(self):
@@ -16,6 +111,9 @@ class Process(unittest.TestCase):
         loop = asyncio.get_event_loop()
         spawned = loop.run_until_complete(self.spawner.spawn_task(self.task))
         self.assertTrue(spawned)
+        # the wait for the runner to finish, otherwise destroyed while
+        # still pending
+        loop.run_until_complete(asyncio.gather(*asyncio.all_tasks(loop)))
 
     def test_never_spawned(self):
         self.assertFalse(self.spawner.is_task_alive(self.task))
@@ -58,5 +156,139 @@ class RandomMock(Mock):
         self.assertTrue(finished)
 
 
+class NoTerminateSpawner(Spawner):
+    """A spawner that relies on the default termination of tasks."""
+
+    @staticmethod
+    def is_task_alive(task):
+        return False
+
+    async def spawn_task(self, task):
+        return True
+
+
+class NoTerminate(unittest.TestCase):
+
+    def test_terminate_not_supported(self):
+        task = nrunner.Task('1', nrunner.Runnable('noop', 'uri'))
+        spawner = NoTerminateSpawner()
+        loop = asyncio.get_event_loop()
+        with self.assertLogs('avocado.test', 'WARNING') as logs:
+            loop.run_until_complete(spawner.terminate_task(task))
+        self.assertIn('NoTerminateSpawner', logs.output[0])
+
+
+class Podman(unittest.TestCase):
+
+    def setUp(self):
+        prefix = temp_dir_prefix(__name__, self, 'setUp')
+        self.tmpdir = tempfile.TemporaryDirectory(prefix=prefix)
+        podman_bin = os.path.join(self.tmpdir.name, 'podman')
+        with open(podman_bin, 'w') as podman:
+            podman.write(FAKE_PODMAN)
+        os.chmod(podman_bin, 0o755)
+        self.config = {'spawner.podman.bin': podman_bin,
+                       'spawner.podman.image_runner':
+                       '%s -m avocado.core.nrunner' % sys.executable}
+        self.tasks = [nrunner.Task(str(number),
+                                   nrunner.Runnable('noop', 'uri'))
+                      for number in range(3)]
+        self.loop = asyncio.new_event_loop()
+
+    def _calls(self):
+        with open(os.path.join(self.tmpdir.name, 'calls')) as calls:
+            return calls.read().split()
+
+    async def _spawn_and_wait(self, spawner):
+        for task in self.tasks:
+            self.assertTrue(await spawner.spawn_task(task))
+        while any(spawner.is_task_alive(task) for task in self.tasks):
+            await asyncio.sleep(0.1)
+        await spawner.cleanup()
+
+    def test_container_per_task(self):
+        spawner = PodmanSpawner(self.config)
+        self.loop.run_until_complete(self._spawn_and_wait(spawner))
+        calls = self._calls()
+        self.assertEqual(calls.count('create'), 3)
+        self.assertEqual(calls.count('start'), 3)
+        # the runner is already on the image
+        self.assertEqual(calls.count('cp'), 0)
+        # the liveness of all tasks is checked at once
+        self.assertLess(calls.count('ps'), calls.count('start') * 2)
+
+    def test_pool(self):
+        self.config['spawner.podman.pool_size'] = 2
+        spawner = PodmanSpawner(self.config)
+        self.loop.run_until_complete(self._spawn_and_wait(spawner))
+        calls = self._calls()
+        self.assertEqual(calls.count('run'), 2)
+        self.assertEqual(calls.count('exec'), 3)
+        self.assertEqual(calls.count('create'), 0)
+        self.assertEqual(calls.count('ps'), 0)
+        self.assertEqual(calls[-1], 'rm')
+        self.assertEqual([name for name in os.listdir(self.tmpdir.name)
+                          if name.startswith('container-')], [])
+
+    def test_pool_terminate(self):
+        self.config['spawner.podman.pool_size'] = 1
+        spawner = PodmanSpawner(self.config)
+        task = self.tasks[0]
+        task.runnable = nrunner.Runnable('exec', 'sleep', '10')
+        self.loop.run_until_complete(spawner.spawn_task(task))
+        self.assertTrue(spawner.is_task_alive(task))
+        # waits for the task to be running on the container
+        container = os.path.join(self.tmpdir.name,
+                                 'container-' + spawner._pool_tasks[task])
+        for _ in range(100):
+            with open(container) as container_file:
+                if 'exec_pids' in container_file.read():
+                    break
+            self.loop.run_until_complete(asyncio.sleep(0.1))
+        self.loop.run_until_complete(spawner.terminate_task(task))
+        self.loop.run_until_complete(task.spawn_handle.wait())
+        self.assertFalse(spawner.is_task_alive(task))
+        # the container was replaced on the pool
+        self.assertEqual(self._calls().count('run'), 2)
+        self.loop.run_until_complete(spawner.cleanup())
+
+    def _fail(self, command):
+        open(os.path.join(self.tmpdir.name, 'fail-' + command), 'w').close()
+
+    def _containers(self):
+        return [name for name in os.listdir(self.tmpdir.name)
+                if name.startswith('container-')]
+
+    def test_pool_copy_fails(self):
+        self.config['spawner.podman.pool_size'] = 2
+        del self.config['spawner.podman.image_runner']
+        self._fail('cp')
+        spawner = PodmanSpawner(self.config)
+        self.assertFalse(self.loop.run_until_complete(
+            asyncio.wait_for(spawner.spawn_task(self.tasks[0]), 10)))
+        self.assertEqual(self._containers(), [])
+
+    def test_pool_replacement_fails(self):
+        self.config['spawner.podman.pool_size'] = 1
+        spawner = PodmanSpawner(self.config)
+        task = self.tasks[0]
+        task.runnable = nrunner.Runnable('exec', 'sleep', '10')
+        self.loop.run_until_complete(spawner.spawn_task(task))
+        waiting = asyncio.ensure_future(spawner.spawn_task(self.tasks[1]),
+                                        loop=self.loop)
+        self._fail('run')
+        self.loop.run_until_complete(spawner.terminate_task(task))
+        self.loop.run_until_complete(task.spawn_handle.wait())
+        self.assertFalse(self.loop.run_until_complete(
+            asyncio.wait_for(waiting, 10)))
+        self.assertFalse(self.loop.run_until_complete(
+            asyncio.wait_for(spawner.spawn_task(self.tasks[2]), 10)))
+        self.assertEqual(self._containers(), [])
+
+    def tearDown(self):
+        self.loop.close()
+        self.tmpdir.cleanup()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,171 @@
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from avocado.core.nrunner import TaskStatusService
+from avocado.core.status import protocol
+from avocado.core.status_server import StatusServer
+
+from .. import temp_dir_prefix
+
+
+class Frame(unittest.TestCase):
+
+    def _roundtrip(self, message):
+        data = protocol.encode_frame(message)
+        header_size, chunk_count = protocol.FRAME.unpack_from(data)
+        offset = protocol.FRAME.size
+        header = data[offset:offset + header_size]
+        offset += header_size
+        chunks = []
+        for _ in range(chunk_count):
+            chunk_size, = protocol.CHUNK.unpack_from(data, offset)
+            offset += protocol.CHUNK.size
+            chunks.append(data[offset:offset + chunk_size])
+            offset += chunk_size
+        self.assertEqual(offset, len(data))
+        return protocol.decode_frame(header, chunks)
+
+    def test_no_bytes(self):
+        message = {'id': '1-foo', 'status': 'running', 'time': 1.5}
+        self.assertEqual(self._roundtrip(message), message)
+
+    def test_bytes(self):
+        output = bytes(range(256)) * 1000
+        message = {'id': '1-foo', 'status': 'finished', 'result': 'pass',
+                   'stdout': output, 'stderr': b''}
+        data = protocol.encode_frame(message)
+        # the raw bytes are sent as they are, and not base64 encoded
+        self.assertLess(len(data), len(output) + 200)
+        self.assertEqual(self._roundtrip(message), message)
+
+    def test_nested_bytes(self):
+        message = {'id': '1-foo', 'status': 'running',
+                   'files': {'log': b'\x00\xff'}}
+        self.assertEqual(self._roundtrip(message), message)
+
+    def test_invalid_header(self):
+        with self.assertRaises(protocol.StatusProtocolError):
+            protocol.decode_frame(b'+-+-InvalidJSON-AFAICT-+-+', [])
+        with self.assertRaises(protocol.StatusProtocolError):
+            protocol.decode_frame(b'[]', [])
+        with self.assertRaises(protocol.StatusProtocolError):
+            protocol.decode_frame(b'{"stdout": {"__chunk__": 1}}', [b''])
+
+    def test_read_frame(self):
+        message = {'id': '1-foo', 'status': 'running', 'log': b'foo\n'}
+        loop = asyncio.new_event_loop()
+        reader = asyncio.StreamReader(loop=loop)
+        reader.feed_data(protocol.encode_frame(message))
+        reader.feed_eof()
+        try:
+            self.assertEqual(
+                loop.run_until_complete(protocol.read_frame(reader)),
+                message)
+            with self.assertRaises(asyncio.IncompleteReadError):
+                loop.run_until_complete(protocol.read_frame(reader))
+        finally:
+            loop.close()
+
+
+class Hello(unittest.TestCase):
+
+    def test_roundtrip(self):
+        self.assertEqual(protocol.decode_hello(protocol.encode_hello(3)), 3)
+
+    def test_invalid(self):
+        with self.assertRaises(protocol.StatusProtocolError):
+            protocol.decode_hello(b'{"id": ')
+        with self.assertRaises(protocol.StatusProtocolError):
+            protocol.decode_hello(b'\x00AVSX\x01')
+
+    def test_choose_version(self):
+        self.assertEqual(protocol.choose_version(0), 0)
+        self.assertEqual(protocol.choose_version(1), 1)
+        self.assertEqual(protocol.choose_version(protocol.VERSION + 1),
+                         protocol.VERSION)
+
+    def test_negotiate(self):
+        client, server = socket.socketpair()
+        try:
+            server.sendall(protocol.encode_hello(1))
+            self.assertEqual(protocol.negotiate(client, timeout=1), 1)
+            self.assertEqual(server.recv(protocol.HELLO.size),
+                             protocol.encode_hello())
+        finally:
+            client.close()
+            server.close()
+
+    def test_negotiate_no_reply(self):
+        client, server = socket.socketpair()
+        try:
+            self.assertEqual(protocol.negotiate(client, timeout=0.01), 0)
+            self.assertIsNone(client.gettimeout())
+        finally:
+            client.close()
+            server.close()
+
+
+class Server(unittest.TestCase):
+
+    def setUp(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.uri = '127.0.0.1:%d' % sock.getsockname()[1]
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def _post(self, task_id, binary, versions):
+        service = TaskStatusService(self.uri, binary=binary)
+        service.post({'id': task_id, 'status': 'started',
+                      'output_dir': '/tmp'})
+        service.post({'id': task_id, 'status': 'finished',
+                      'result': 'pass', 'stdout': b'\x00\xff'})
+        versions[task_id] = service.protocol_version
+        service.close()
+
+    def test_both_protocols(self):
+        server = StatusServer(self.uri, ['binary', 'json'])
+        server.start()
+        self.loop.run_until_complete(asyncio.sleep(0.1))
+        versions = {}
+        clients = [threading.Thread(target=self._post,
+                                    args=(task_id, task_id == 'binary',
+                                          versions))
+                   for task_id in ('binary', 'json')]
+        for client in clients:
+            client.start()
+        self.loop.run_until_complete(asyncio.wait_for(server.wait(), 10))
+        for client in clients:
+            client.join()
+        self.assertEqual(sorted(server.result['pass']), ['binary', 'json'])
+        self.assertEqual(versions, {'binary': protocol.VERSION, 'json': 0})
+
+    def test_unix_socket(self):
+        prefix = temp_dir_prefix(__name__, self, 'test_unix_socket')
+        with tempfile.TemporaryDirectory(prefix=prefix) as tmpdir:
+            path = os.path.join(tmpdir, 'status.sock')
+            self.uri = 'unix:%s' % path
+            server = StatusServer(self.uri, ['binary'])
+            server.start()
+            self.loop.run_until_complete(asyncio.sleep(0.1))
+            versions = {}
+            client = threading.Thread(target=self._post,
+                                      args=('binary', True, versions))
+            client.start()
+            self.loop.run_until_complete(asyncio.wait_for(server.wait(), 10))
+            client.join()
+            self.assertEqual(server.result['pass'], ['binary'])
+            self.assertEqual(versions, {'binary': protocol.VERSION})
+            self.assertFalse(os.path.exists(path))
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,27 @@
+import os
+import tempfile
 from unittest import TestCase
 
 from avocado.core.status import repo, utils
 
+from .. import temp_dir_prefix
+
 
 class StatusRepo(TestCase):
 
     def setUp(self):
         self.status_repo = repo.StatusRepo()
 
+    def _process_task(self, task_id, result, time_start, time_end):
+        self.status_repo.process_message({"id": task_id, "status": "started",
+                                          "output_dir": "/fake/path",
+                                          "time": time_start})
+        self.status_repo.process_message({"id": task_id, "status": "running",
+                                          "time": time_start + 0.5})
+        self.status_repo.process_message({"id": task_id, "status": "finished",
+                                          "result": result, "time": time_end,
+                                          "stdout": b"\x00\xff"})
+
     def test_process_raw_message_invalid(self):
         with self.assertRaises(utils.StatusMsgInvalidJSONError):
             self.status_repo.process_raw_message('+-+-InvalidJSON-AFAICT-+-+')
@@ -20,7 +34,7 @@ class StatusRepo(TestCase):
 
     def test_set_task_data(self):
         self.status_repo._set_task_data({"id": "1-foo", "status": "started"})
-        self.assertEqual(self.status_repo._data["1-foo"],
+        self.assertEqual(self.status_repo.get_task_data("1-foo"),
                          [{"status": "started"}])
 
     def test_handle_task_started(self):
@@ -65,3 +79,65 @@ class StatusRepo(TestCase):
         self.status_repo.process_raw_message(msg)
         self.assertEqual(self.status_repo.get_task_data("1-foo"),
                          [{"status": "running"}])
+
+    def test_get_task_data_unknown(self):
+        self.assertIsNone(self.status_repo.get_task_data("1-foo"))
+        self.assertIsNone(self.status_repo.get_latest_task_data("1-foo"))
+        self.assertIsNone(self.status_repo.get_task_summary("1-foo"))
+
+    def test_task_summary(self):
+        self._process_task("1-foo", "pass", 10.0, 20.0)
+        summary = self.status_repo.get_task_summary("1-foo")
+        self.assertEqual(summary.status, "finished")
+        self.assertEqual(summary.result, "pass")
+        self.assertEqual(summary.output_dir, "/fake/path")
+        self.assertEqual(summary.time_start, 10.0)
+        self.assertEqual(summary.time_end, 20.0)
+        self.assertEqual(summary.messages, 3)
+        self.assertEqual(summary.running, 1)
+        self.assertFalse(hasattr(summary, "__dict__"))
+
+    def test_get_latest_task_data(self):
+        self._process_task("1-foo", "pass", 10.0, 20.0)
+        self._process_task("2-bar", "fail", 15.0, 25.0)
+        self.assertEqual(self.status_repo.get_latest_task_data("1-foo"),
+                         {"status": "finished", "result": "pass",
+                          "time": 20.0, "stdout": b"\x00\xff"})
+        self.assertEqual(len(self.status_repo.get_task_data("2-bar")), 3)
+
+    def test_get_tasks_by_result(self):
+        self._process_task("1-foo", "pass", 10.0, 20.0)
+        self._process_task("2-bar", "fail", 15.0, 25.0)
+        self._process_task("3-baz", "pass", 30.0, 40.0)
+        self.assertEqual(self.status_repo.get_tasks_by_result("pass"),
+                         ["1-foo", "3-baz"])
+        self.assertEqual(self.status_repo.get_tasks_by_result("error"), [])
+
+    def test_get_tasks_by_time(self):
+        self._process_task("1-foo", "pass", 10.0, 20.0)
+        self._process_task("2-bar", "fail", 15.0, 25.0)
+        self._process_task("3-baz", "pass", 30.0, 40.0)
+        self.assertEqual(self.status_repo.get_tasks_by_time(21.0, 29.0),
+                         ["2-bar"])
+        self.assertEqual(self.status_repo.get_tasks_by_time(start=26.0),
+                         ["3-baz"])
+        self.assertEqual(self.status_repo.get_tasks_by_time(end=12.0),
+                         ["1-foo"])
+        self.assertEqual(len(self.status_repo.get_tasks_by_time()), 3)
+
+    def test_journal_path(self):
+        prefix = temp_dir_prefix(__name__, self, 'test_journal_path')
+        with tempfile.TemporaryDirectory(prefix=prefix) as tmpdir:
+            path = os.path.join(tmpdir, 'journal')
+            self.status_repo = repo.StatusRepo(path)
+            self._process_task("1-foo", "pass", 10.0, 20.0)
+            self.assertEqual(len(self.status_repo.get_task_data("1-foo")), 3)
+            self.status_repo.close()
+            with open(path, 'rb') as journal:
+                lines = journal.readlines()
+            self.assertEqual(len(lines), 3)
+            self.assertEqual(utils.json_loads(lines[-1])["stdout"],
+                             b"\x00\xff")
+
+    def tearDown(self):
+        self.status_repo.close()
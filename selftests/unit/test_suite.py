@@ -2,7 +2,7 @@ import tempfile
 import unittest.mock
 
 from avocado.core import data_dir
-from avocado.core.suite import TestSuite
+from avocado.core.suite import TestMatrix, TestSuite
 from avocado.utils import path as utils_path
 
 from .. import setup_avocado_loggers, temp_dir_prefix
@@ -84,5 +84,79 @@ class TestSuiteTest(unittest.TestCase):
         self.tmpdir.cleanup()
 
 
+class FakeVarianter:
+
+    def __init__(self, variants):
+        self.variants = variants
+        self.iterated = 0
+
+    def itertests(self):
+        self.iterated += 1
+        return iter(self.variants)
+
+    def get_number_of_tests(self, tests):
+        return len(tests) * len(self.variants)
+
+    def get_variant(self, index):
+        raise NotImplementedError
+
+
+class FakeRandomAccessVarianter(FakeVarianter):
+
+    def get_variant(self, index):
+        return self.variants[index]
+
+
+class TestMatrixTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tests = ['test1', 'test2', 'test3']
+        self.variants = FakeVarianter(['variant1', 'variant2'])
+
+    def test_len(self):
+        matrix = TestMatrix(self.tests, self.variants)
+        self.assertEqual(len(matrix), 6)
+        self.assertEqual(self.variants.iterated, 0)
+
+    def test_variants_per_test(self):
+        matrix = TestMatrix(self.tests, self.variants, 'variants-per-test')
+        expected = [(test, variant) for test in self.tests
+                    for variant in self.variants.variants]
+        self.assertEqual(list(matrix), expected)
+        self.assertEqual(self.variants.iterated, 3)
+        self.assertEqual([matrix[i] for i in range(len(matrix))], expected)
+        # the variants are gathered once, as there's no random access
+        self.assertEqual(self.variants.iterated, 4)
+
+    def test_tests_per_variant(self):
+        matrix = TestMatrix(self.tests, self.variants, 'tests-per-variant')
+        expected = [(test, variant) for variant in self.variants.variants
+                    for test in self.tests]
+        self.assertEqual(list(matrix), expected)
+        self.assertEqual(self.variants.iterated, 1)
+        self.assertEqual([matrix[i] for i in range(len(matrix))], expected)
+        self.assertEqual(self.variants.iterated, 2)
+
+    def test_random_access(self):
+        variants = FakeRandomAccessVarianter(self.variants.variants)
+        for order in TestMatrix.EXECUTION_ORDERS:
+            matrix = TestMatrix(self.tests, variants, order)
+            self.assertEqual([matrix[i] for i in range(len(matrix))],
+                             list(matrix))
+        self.assertEqual(variants.iterated, 4)
+
+    def test_index(self):
+        matrix = TestMatrix(self.tests, self.variants)
+        self.assertEqual(matrix[-1], ('test3', 'variant2'))
+        self.assertEqual(matrix[1:5:2], [('test1', 'variant2'),
+                                         ('test2', 'variant2')])
+        self.assertRaises(IndexError, matrix.__getitem__, 6)
+        self.assertRaises(IndexError, matrix.__getitem__, -7)
+
+    def test_unsupported_order(self):
+        self.assertRaises(NotImplementedError, TestMatrix, self.tests,
+                          self.variants, 'random')
+
+
 if __name__ == '__main__':
     unittest.main()
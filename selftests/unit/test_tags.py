@@ -312,3 +312,34 @@ class FilterRunnable(unittest.TestCase):
     def test_no_tags(self):
         runnable = Runnable('noop', None)
         self.assertFalse(tags.filter_test_tags_runnable(runnable, []))
+
+
+class CompiledTagFilter(unittest.TestCase):
+
+    def test_match(self):
+        tag_filter = tags.TagFilter(['fast,arch:x86_64,-unsafe', 'slow'])
+        self.assertTrue(tag_filter.match({'fast': None,
+                                          'arch': {'x86_64'}}))
+        self.assertTrue(tag_filter.match({'slow': None, 'unsafe': None}))
+        self.assertFalse(tag_filter.match({'fast': None, 'unsafe': None,
+                                           'arch': {'x86_64'}}))
+        self.assertFalse(tag_filter.match({'fast': None, 'arch': None}))
+        self.assertFalse(tag_filter.match({'fast': None,
+                                           'arch': {'ppc64'}}))
+        self.assertFalse(tag_filter.match({'fast': None}))
+
+    def test_match_include_empty_key(self):
+        tag_filter = tags.TagFilter(['fast,arch:x86_64'],
+                                    include_empty_key=True)
+        self.assertTrue(tag_filter.match({'fast': None}))
+        self.assertFalse(tag_filter.match({'fast': None,
+                                           'arch': {'ppc64'}}))
+
+    def test_filter_runnables(self):
+        fast = Runnable('noop', None, tags={'fast': None})
+        slow = Runnable('noop', None, tags={'slow': None})
+        empty = Runnable('noop', None)
+        self.assertEqual(tags.TagFilter(['fast']).filter_runnables(
+            [fast, slow, empty]), [fast])
+        self.assertEqual(tags.TagFilter(['fast'], True).filter_runnables(
+            [fast, slow, empty]), [fast, empty])
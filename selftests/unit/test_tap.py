@@ -294,6 +294,27 @@ class TapParserTests(unittest.TestCase):
         self.assert_test(events, number=2, name='', result=TestResult.FAIL)
         self.assert_last(events)
 
+    def test_parse_line(self):
+        parser = TapParser()
+        events = iter(parser.parse_line(b'1..2\n'))
+        self.assert_plan(events, count=2, late=False)
+        self.assert_last(events)
+        events = iter(parser.parse_line(b'ok 1 caf\xc3\xa9\n'))
+        self.assert_test(events, number=1, name='caf\xe9',
+                         result=TestResult.PASS)
+        self.assert_last(events)
+        events = iter(parser.parse_end())
+        self.assert_error(events)
+        self.assert_last(events)
+
+    def test_parse_bytes_stream(self):
+        parser = TapParser(io.BytesIO(b'1..1\nnot ok 1 - \xff\n'))
+        events = iter(parser.parse())
+        self.assert_plan(events, count=1, late=False)
+        self.assert_test(events, number=1, name='- \ufffd',
+                         result=TestResult.FAIL)
+        self.assert_last(events)
+
 
 if __name__ == '__main__':
     unittest.main()
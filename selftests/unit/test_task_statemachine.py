@@ -0,0 +1,132 @@
+import asyncio
+import time
+import unittest.mock
+
+from avocado.core import nrunner
+from avocado.core.spawners.mock import MockSpawner
+from avocado.core.status.repo import StatusRepo
+from avocado.core.task import statemachine
+from avocado.core.task.runtime import RuntimeTask
+
+
+class StatusSpawner(MockSpawner):
+    """Spawns tasks that report a result, and tracks the running ones."""
+
+    def __init__(self, status_repo, result='pass'):
+        super(StatusSpawner, self).__init__()
+        self.status_repo = status_repo
+        self.result = result
+        self.running = 0
+        self.max_running = 0
+
+    async def _run(self, task):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        self.status_repo.process_message({'id': task.identifier,
+                                          'status': 'started',
+                                          'output_dir': '/fake/path',
+                                          'time': time.time()})
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        self.status_repo.process_message({'id': task.identifier,
+                                          'status': 'finished',
+                                          'result': self.result,
+                                          'time': time.time()})
+
+    async def spawn_task(self, task):
+        asyncio.ensure_future(self._run(task))
+        return True
+
+
+class StateMachine(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.status_repo = StatusRepo()
+        self.reported = []
+        tasks = [nrunner.Task('%d-true' % number,
+                              nrunner.Runnable('exec-test', '/bin/true'))
+                 for number in range(1, 6)]
+        self.runtime_tasks = [RuntimeTask(task) for task in tasks]
+        self.state_machine = statemachine.TaskStateMachine(
+            self.runtime_tasks, self.status_repo, self.reported.append)
+
+    async def _workers(self, spawner, workers, **kwargs):
+        await asyncio.gather(*[statemachine.Worker(self.state_machine,
+                                                   spawner, **kwargs).run()
+                               for _ in range(workers)])
+
+    def _run(self, spawner, workers=1, **kwargs):
+        with unittest.mock.patch('avocado.core.nrunner.Task.'
+                                 'are_requirements_available',
+                                 return_value=True):
+            self.loop.run_until_complete(self._workers(spawner, workers,
+                                                       **kwargs))
+        self.assertTrue(self.loop.run_until_complete(
+            self.state_machine.complete))
+        self.assertEqual(sorted(self.reported, key=id),
+                         sorted(self.runtime_tasks, key=id))
+
+    def test_finished(self):
+        spawner = StatusSpawner(self.status_repo)
+        self._run(spawner, workers=3, max_running=2)
+        self.assertEqual(spawner.max_running, 2)
+        for runtime_task in self.reported:
+            self.assertIsNone(runtime_task.status)
+            self.assertIsNotNone(runtime_task.spawned)
+        self.assertEqual(len(self.status_repo.get_tasks_by_result('pass')),
+                         5)
+
+    def test_triage(self):
+        with unittest.mock.patch('avocado.core.nrunner.Task.'
+                                 'are_requirements_available',
+                                 return_value=False):
+            self.loop.run_until_complete(
+                statemachine.Worker(self.state_machine,
+                                    StatusSpawner(self.status_repo)).run())
+        for runtime_task in self.reported:
+            self.assertEqual(runtime_task.status,
+                             statemachine.FAILED_ON_TRIAGE)
+        self.assertEqual(len(self.reported), 5)
+
+    def test_failed_on_start(self):
+        spawner = StatusSpawner(self.status_repo)
+        spawner.spawn_task = unittest.mock.AsyncMock(return_value=False)
+        self._run(spawner)
+        for runtime_task in self.reported:
+            self.assertEqual(runtime_task.status,
+                             statemachine.FAILED_ON_START)
+            self.assertIsNone(runtime_task.spawned)
+
+    def test_timeout(self):
+        spawner = MockSpawner()
+        spawner.is_task_alive = lambda task: True
+        spawner.terminate_task = unittest.mock.AsyncMock()
+        self._run(spawner, max_running=5, task_timeout=0.01)
+        self.assertEqual(spawner.terminate_task.await_count, 5)
+        for runtime_task in self.reported:
+            self.assertEqual(runtime_task.status,
+                             statemachine.FAILED_WITH_TIMEOUT)
+
+    def test_without_status(self):
+        with unittest.mock.patch('avocado.core.task.statemachine.'
+                                 'TASK_EXIT_STATUS_TIMEOUT', 0.01):
+            self._run(MockSpawner(), max_running=5)
+        for runtime_task in self.reported:
+            self.assertEqual(runtime_task.status,
+                             statemachine.FAILED_WITHOUT_STATUS)
+
+    def test_job_deadline(self):
+        spawner = StatusSpawner(self.status_repo)
+        self._run(spawner, job_deadline=time.monotonic() - 1)
+        self.assertEqual(spawner.max_running, 0)
+        for runtime_task in self.reported:
+            self.assertEqual(runtime_task.status, statemachine.NOT_STARTED)
+
+    def tearDown(self):
+        self.status_repo.close()
+        self.loop.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
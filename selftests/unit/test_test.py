@@ -19,6 +19,12 @@ FAIL_SCRIPT_CONTENTS = """#!/bin/sh
 false
 """
 
+TAP_LONG_LINE_SCRIPT_CONTENTS = """#!/bin/sh
+echo '1..1'
+echo 'ok 1 - description 1'
+echo '# %snot ok 2 - bogus'
+""" % ('x' * 98)
+
 
 class TestClassTestUnit(unittest.TestCase):
 
@@ -244,6 +250,21 @@ class SimpleTestClassTest(unittest.TestCase):
         tst_instance.run_avocado()
         self.assertEqual(tst_instance.status, 'FAIL')
 
+    def test_tap_long_line(self):
+        self.script = script.TemporaryScript(
+            'avocado_tap.sh',
+            TAP_LONG_LINE_SCRIPT_CONTENTS,
+            'avocado_simpletest_unittest')
+        self.script.save()
+        tst_instance = test.TapTest(
+            name=TestID(1, self.script.path),
+            base_logdir=self.tmpdir.name)
+        # only the start of the long line is parsed, and not its rest
+        with unittest.mock.patch.object(test.TapTest, 'OUTPUT_LINE_LIMIT',
+                                        100):
+            tst_instance.run_avocado()
+        self.assertEqual(tst_instance.status, 'PASS')
+
     def tearDown(self):
         if self.script is not None:
             self.script.remove()
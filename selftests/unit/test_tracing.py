@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+import unittest
+
+from avocado.core import tracing
+
+from .. import temp_dir_prefix
+
+
+class Tracer(unittest.TestCase):
+
+    def setUp(self):
+        prefix = temp_dir_prefix(__name__, self, 'setUp')
+        self.tmpdir = tempfile.TemporaryDirectory(prefix=prefix)
+        self.tracer = tracing.Tracer()
+
+    def _export(self):
+        path = self.tracer.export()
+        self.assertEqual(path, os.path.join(self.tmpdir.name,
+                                            tracing.TRACE_FILENAME))
+        with open(path) as trace:
+            return json.load(trace)['traceEvents']
+
+    def test_disabled(self):
+        span = self.tracer.span('foo')
+        self.assertIs(span, tracing._NULL_SPAN)
+        with span:
+            pass
+        self.tracer.set_process_name('foo')
+        self.assertEqual(self.tracer._buffer, [])
+        self.assertIsNone(self.tracer.export())
+
+    def test_buffered(self):
+        self.tracer.enable()
+        with self.tracer.span('before', 'cat', key='value'):
+            pass
+        self.assertEqual(len(self.tracer._buffer), 1)
+        self.tracer.set_output(self.tmpdir.name)
+        with self.tracer.span('after'):
+            pass
+        events = self._export()
+        self.assertEqual([event['name'] for event in events],
+                         ['before', 'process_name', 'after'])
+        self.assertEqual(events[0]['cat'], 'cat')
+        self.assertEqual(events[0]['ph'], 'X')
+        self.assertEqual(events[0]['args'], {'key': 'value'})
+        self.assertEqual(events[0]['pid'], os.getpid())
+        self.assertGreaterEqual(events[0]['dur'], 0)
+        self.assertEqual(events[1]['ph'], 'M')
+        self.assertEqual(events[1]['args'], {'name': 'avocado job'})
+        self.assertNotIn('args', events[2])
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name,
+                                                     tracing.RAW_FILENAME)))
+
+    def test_exception(self):
+        self.tracer.enable()
+        self.tracer.set_output(self.tmpdir.name)
+        with self.assertRaises(ValueError):
+            with self.tracer.span('fails'):
+                raise ValueError
+        events = self._export()
+        self.assertEqual(events[-1]['args'], {'exception': 'ValueError'})
+
+    def test_forked_process(self):
+        self.tracer.enable()
+        self.tracer.set_output(self.tmpdir.name)
+        pid = os.fork()
+        if pid == 0:
+            try:
+                with self.tracer.span('child'):
+                    pass
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        with self.tracer.span('parent'):
+            pass
+        events = self._export()
+        pids = {event['name']: event['pid'] for event in events}
+        self.assertEqual(pids['child'], pid)
+        self.assertEqual(pids['parent'], os.getpid())
+
+    def test_truncated_event(self):
+        self.tracer.enable()
+        self.tracer.set_output(self.tmpdir.name)
+        os.write(self.tracer._fd, b'{"name": "trunc')
+        events = self._export()
+        self.assertEqual([event['name'] for event in events],
+                         ['process_name'])
+
+    def tearDown(self):
+        self.tracer.disable()
+        self.tmpdir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -68,3 +68,62 @@ class TreeNode(unittest.TestCase):
         self.assertTrue(tree.TreeNode().is_leaf)
         self.assertTrue(tree.TreeNode(value={'foo': 'bar'}).is_leaf)
         self.assertFalse(tree.TreeNode(children=[tree.TreeNode()]).is_leaf)
+
+    def test_add_child_merge(self):
+        root = tree.TreeNode(children=[tree.TreeNode('foo', {'a': 1})])
+        root.add_child(tree.TreeNode('foo', {'b': 2}))
+        self.assertEqual(len(root.children), 1)
+        self.assertEqual(root.get_node('/foo').value, {'a': 1, 'b': 2})
+
+    def test_detach(self):
+        foo = tree.TreeNode('foo', {'a': 1})
+        root = tree.TreeNode(children=[foo])
+        foo.detach()
+        self.assertEqual(root.children, [])
+        root.add_child(tree.TreeNode('foo', {'b': 2}))
+        self.assertEqual(root.get_node('/foo').value, {'b': 2})
+        self.assertEqual(foo.value, {'a': 1})
+
+    def test_environment_shared(self):
+        child = tree.TreeNode('child', {'key': 'child', 'list': [2]})
+        root = tree.TreeNode(value={'key': 'root', 'list': [1], 'other': 0},
+                             children=[child])
+        root.filters[0].append('/child')
+        child.filters[1].append('/other')
+        self.assertEqual(child.environment,
+                         {'key': 'child', 'list': [1, 2], 'other': 0})
+        self.assertEqual(list(child.environment), ['key', 'list', 'other'])
+        self.assertIs(child.environment.origin['other'], root)
+        self.assertIs(child.environment.origin['key'], child)
+        self.assertEqual(root.environment,
+                         {'key': 'root', 'list': [1], 'other': 0})
+        self.assertIs(child.environment.filter_only,
+                      root.environment.filter_only)
+        self.assertEqual(child.environment.filter_out, {'/other/'})
+        self.assertEqual(root.environment.filter_out, set())
+
+
+class LayeredDict(unittest.TestCase):
+
+    def setUp(self):
+        self.parent = tree.LayeredDict()
+        self.parent.update({'a': 1, 'b': 2})
+        self.layer = tree.LayeredDict(self.parent)
+        self.layer.update({'b': 3, 'c': 4})
+
+    def test_lookup(self):
+        self.assertEqual(self.layer['a'], 1)
+        self.assertEqual(self.layer['b'], 3)
+        self.assertNotIn('d', self.layer)
+        self.assertEqual(list(self.layer.items()),
+                         [('a', 1), ('b', 3), ('c', 4)])
+        self.assertEqual(len(self.layer), 3)
+        self.assertEqual(dict(self.parent), {'a': 1, 'b': 2})
+
+    def test_delete(self):
+        del self.layer['a']
+        del self.layer['c']
+        self.assertEqual(dict(self.layer), {'b': 3})
+        self.assertEqual(dict(self.parent), {'a': 1, 'b': 2})
+        with self.assertRaises(KeyError):
+            del self.layer['a']
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+
+from avocado.core import unittest_worker
+
+from .. import BASEDIR, temp_dir_prefix
+
+DATA_DIR = os.path.join(BASEDIR, 'selftests', '.data')
+
+OUTPUT_MODULE = """import os
+import sys
+import unittest
+
+COUNTER = []
+
+
+class Output(unittest.TestCase):
+
+    def test_output(self):
+        COUNTER.append(1)
+        print('out %d' % len(COUNTER))
+        sys.stderr.write('err\\n')
+        os.system('echo from subprocess')
+"""
+
+
+class Worker(unittest.TestCase):
+
+    def setUp(self):
+        self.worker = unittest_worker.UnittestWorker(DATA_DIR, 'unittests')
+        self.worker.start()
+
+    def test_statuses(self):
+        expected = {'unittests.First.test_pass': 'PASS',
+                    'unittests.Second.test_fail': 'FAIL',
+                    'unittests.Second.test_error': 'ERROR',
+                    'unittests.Second.test_skip': 'SKIP'}
+        for name, status in expected.items():
+            outcome = self.worker.run(name)
+            self.assertEqual(outcome['status'], status, outcome)
+        self.assertTrue(self.worker.is_alive())
+
+    def test_details(self):
+        outcome = self.worker.run('unittests.Second.test_error')
+        self.assertIn('This is suppose to error', outcome['details'])
+        outcome = self.worker.run('unittests.Second.test_skip')
+        self.assertEqual(outcome['details'], 'This is suppose to be skipped')
+
+    def test_invalid_name(self):
+        outcome = self.worker.run('unittests.Third.test_missing')
+        self.assertEqual(outcome['status'], 'ERROR')
+
+    def test_stop(self):
+        self.worker.stop()
+        self.assertFalse(self.worker.is_alive())
+
+    def tearDown(self):
+        self.worker.stop()
+
+
+class WorkerModule(unittest.TestCase):
+
+    def setUp(self):
+        prefix = temp_dir_prefix(__name__, self, 'setUp')
+        self.tmpdir = tempfile.TemporaryDirectory(prefix=prefix)
+
+    def _start_worker(self, module, content):
+        with open(os.path.join(self.tmpdir.name, module + '.py'), 'w') as mod:
+            mod.write(content)
+        worker = unittest_worker.UnittestWorker(self.tmpdir.name, module)
+        worker.start()
+        self.addCleanup(worker.stop)
+        return worker
+
+    def test_output_module_imported_once(self):
+        worker = self._start_worker('output', OUTPUT_MODULE)
+        worker.run('output.Output.test_output')
+        outcome = worker.run('output.Output.test_output')
+        self.assertEqual(outcome['status'], 'PASS', outcome)
+        self.assertEqual(outcome['stdout'], 'out 2\nfrom subprocess\n')
+        self.assertEqual(outcome['stderr'], 'err\n')
+
+    def test_import_error(self):
+        worker = self._start_worker('broken', 'raise ImportError("broken")')
+        outcome = worker.run('broken.Test.test')
+        self.assertEqual(outcome['status'], 'ERROR')
+        self.assertIn('broken', outcome['details'])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
+class WorkerPool(unittest.TestCase):
+
+    def test_reuse_and_limit(self):
+        pool = unittest_worker.UnittestWorkerPool(max_workers=1)
+        try:
+            first = pool.get(DATA_DIR, 'unittests')
+            self.assertIs(pool.get(DATA_DIR, 'unittests'), first)
+            first.kill()
+            second = pool.get(DATA_DIR, 'unittests')
+            self.assertIsNot(second, first)
+            self.assertTrue(second.is_alive())
+            pool.get(DATA_DIR, 'other')
+            self.assertFalse(second.is_alive())
+        finally:
+            pool.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import hashlib
+import os
+import tempfile
+import unittest.mock
+
+from avocado.utils import crypto
+
+from .. import temp_dir_prefix
+
+
+class HashFile(unittest.TestCase):
+
+    def setUp(self):
+        prefix = temp_dir_prefix(__name__, self, 'setUp')
+        self.tmpdir = tempfile.TemporaryDirectory(prefix=prefix)
+        self.filename = os.path.join(self.tmpdir.name, 'file.img')
+        self.content = os.urandom(crypto.CHUNK_SIZE * 2 + 123)
+        with open(self.filename, 'wb') as data_file:
+            data_file.write(self.content)
+        # make the file old enough to have its digests cached
+        os.utime(self.filename, (0, 0))
+
+    def test_hash_file(self):
+        self.assertEqual(crypto.hash_file(self.filename, algorithm='sha1'),
+                         hashlib.sha1(self.content).hexdigest())
+
+    def test_hash_file_size(self):
+        self.assertEqual(crypto.hash_file(self.filename, size=10),
+                         hashlib.md5(self.content[:10]).hexdigest())
+        self.assertEqual(crypto.hash_file(self.filename, size=10 ** 9),
+                         hashlib.md5(self.content).hexdigest())
+
+    def test_hash_file_invalid_algorithm(self):
+        self.assertIsNone(crypto.hash_file(self.filename,
+                                           algorithm='invalid'))
+
+    def test_digests(self):
+        digests = crypto.hash_file_digests(self.filename,
+                                           ['md5', 'sha1', 'sha256'])
+        self.assertEqual(digests,
+                         {'md5': hashlib.md5(self.content).hexdigest(),
+                          'sha1': hashlib.sha1(self.content).hexdigest(),
+                          'sha256': hashlib.sha256(self.content).hexdigest()})
+
+    def test_digests_empty_file(self):
+        empty = os.path.join(self.tmpdir.name, 'empty')
+        open(empty, 'w').close()
+        self.assertEqual(crypto.hash_file_digests(empty, ['sha1']),
+                         {'sha1': hashlib.sha1(b'').hexdigest()})
+
+    def test_cache(self):
+        expected = hashlib.sha1(self.content).hexdigest()
+        self.assertEqual(crypto.hash_file(self.filename, algorithm='sha1',
+                                          cache=True), expected)
+        self.assertTrue(os.path.isfile(self.filename + crypto.CACHE_SUFFIX))
+        with unittest.mock.patch('avocado.utils.crypto._hash_fileobj') as hsh:
+            self.assertEqual(crypto.hash_file(self.filename,
+                                              algorithm='sha1',
+                                              cache=True), expected)
+            hsh.assert_not_called()
+
+    def test_cache_invalidated(self):
+        crypto.hash_file(self.filename, algorithm='sha1', cache=True)
+        with open(self.filename, 'ab') as data_file:
+            data_file.write(b'more')
+        os.utime(self.filename, (0, 0))
+        self.assertEqual(crypto.hash_file(self.filename, algorithm='sha1',
+                                          cache=True),
+                         hashlib.sha1(self.content + b'more').hexdigest())
+
+    def test_cache_recent_file(self):
+        os.utime(self.filename)
+        crypto.hash_file(self.filename, cache=True)
+        self.assertFalse(os.path.exists(self.filename + crypto.CACHE_SUFFIX))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,8 @@ import os
 import tempfile
 import unittest
 
-from avocado.utils.filelock import AlreadyLocked, FileLock
+from avocado.utils.filelock import (AlreadyLocked, FcntlLock, FileLock,
+                                    LockFailed)
 
 from .. import temp_dir_prefix
 
@@ -38,5 +39,49 @@ class TestFileLock(unittest.TestCase):
         self.tmpdir.cleanup()
 
 
+class TestFcntlLock(unittest.TestCase):
+
+    def setUp(self):
+        prefix = temp_dir_prefix(__name__, self, 'setUp')
+        self.tmpdir = tempfile.TemporaryDirectory(prefix=prefix)
+        self.filename = os.path.join(self.tmpdir.name, 'file.img')
+
+    def test_exclusive_locked_by_me(self):
+        with FcntlLock(self.filename):
+            self.assertRaises(AlreadyLocked,
+                              FcntlLock(self.filename).acquire)
+            self.assertRaises(AlreadyLocked,
+                              FcntlLock(self.filename, shared=True).acquire)
+
+    def test_shared(self):
+        with FcntlLock(self.filename, shared=True) as first:
+            with FcntlLock(self.filename, shared=True) as second:
+                self.assertTrue(first.locked)
+                self.assertTrue(second.locked)
+            self.assertRaises(AlreadyLocked,
+                              FcntlLock(self.filename).acquire)
+
+    def test_release(self):
+        lock = FcntlLock(self.filename)
+        with lock:
+            self.assertTrue(lock.locked)
+        self.assertFalse(lock.locked)
+        with FcntlLock(self.filename) as other:
+            self.assertTrue(other.locked)
+
+    def test_timeout(self):
+        with FcntlLock(self.filename):
+            lock = FcntlLock(self.filename, timeout=0.05)
+            self.assertRaises(AlreadyLocked, lock.acquire)
+            self.assertFalse(lock.locked)
+
+    def test_unusable_lock_file(self):
+        filename = os.path.join(self.tmpdir.name, 'missing', 'file.img')
+        self.assertRaises(LockFailed, FcntlLock(filename).acquire)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,148 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from avocado.core import tree, varianter
+
+from .. import temp_dir_prefix
+
+
+class FakeVarianter:
+
+    def __init__(self, variants):
+        self.variants = variants
+
+    @staticmethod
+    def is_parsed():
+        return True
+
+    def itertests(self):
+        return iter(self.variants)
+
+
+class CompactVariants(unittest.TestCase):
+
+    def setUp(self):
+        root = tree.TreeNode('', {'shared': 'value'})
+        self.cat = tree.TreeNode('cat', {'sound': 'meow'}, parent=root)
+        self.dog = tree.TreeNode('dog', {'sound': 'woof'}, parent=root)
+        root.add_child(self.cat)
+        root.add_child(self.dog)
+        prefix = temp_dir_prefix(__name__, self, 'setUp')
+        self.tmpdir = tempfile.TemporaryDirectory(prefix=prefix)
+        self.path = os.path.join(self.tmpdir.name, varianter.VARIANTS_FILENAME)
+
+    def _variants(self, *nodes):
+        return [{'variant_id': node.name, 'paths': ['/run/*'],
+                 'variant': [node]} for node in nodes]
+
+    def _dump(self, varianters):
+        with open(self.path, 'w') as variants_file:
+            varianter.dump_variants_compact(varianters, variants_file)
+
+    def test_nodes_written_once(self):
+        stream = io.StringIO()
+        varianter.dump_variants_compact(
+            [FakeVarianter(self._variants(self.cat, self.dog, self.cat))],
+            stream)
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(lines[0],
+                         {'version': varianter.VARIANTS_COMPACT_VERSION})
+        self.assertEqual(len([_ for _ in lines if 'node' in _]), 2)
+        self.assertEqual([_['variant'] for _ in lines if 'variant' in _],
+                         [[0], [1], [0]])
+        self.assertIn('"paths": ["/run/*"]', stream.getvalue())
+
+    def test_load(self):
+        self._dump([FakeVarianter(self._variants(self.cat, self.dog)),
+                    FakeVarianter(self._variants(self.dog))])
+        suites = varianter.CompactVariants.suites(self.path)
+        self.assertEqual([len(_) for _ in suites], [2, 1])
+        variants = list(varianter.Varianter(state=suites[0]).itertests())
+        self.assertEqual([_['variant_id'] for _ in variants], ['cat', 'dog'])
+        self.assertEqual([_['paths'] for _ in variants], [['/run/*']] * 2)
+        environment = variants[0]['variant'][0].environment
+        self.assertEqual(environment['sound'], 'meow')
+        self.assertEqual(environment['shared'], 'value')
+        self.assertEqual(environment.origin['shared'].path, '/')
+        variants = list(varianter.Varianter(state=suites[1]).itertests())
+        self.assertEqual(variants[0]['variant'][0].environment['sound'],
+                         'woof')
+
+    def test_from_resultsdir(self):
+        os.mkdir(os.path.join(self.tmpdir.name, 'jobdata'))
+        self.path = os.path.join(self.tmpdir.name, 'jobdata',
+                                 varianter.VARIANTS_FILENAME)
+        self._dump([FakeVarianter(self._variants(self.cat, self.dog))])
+        varianters = varianter.Varianter.from_resultsdir(self.tmpdir.name)
+        self.assertEqual(len(varianters), 1)
+        self.assertEqual(len(varianters[0]), 2)
+
+    def test_from_resultsdir_legacy(self):
+        os.mkdir(os.path.join(self.tmpdir.name, 'jobdata'))
+        self.path = os.path.join(self.tmpdir.name, 'jobdata',
+                                 varianter.VARIANTS_FILENAME)
+        variants = self._variants(self.cat, self.dog)
+        with open(self.path, 'w') as variants_file:
+            json.dump([varianter.dump_ivariants(lambda: iter(variants))],
+                      variants_file)
+        varianters = varianter.Varianter.from_resultsdir(self.tmpdir.name)
+        self.assertEqual(len(varianters), 1)
+        loaded = list(varianters[0].itertests())
+        self.assertEqual(loaded[1]['variant'][0].environment['sound'], 'woof')
+        self.assertEqual(varianters[0].get_variant(1)['variant_id'], 'dog')
+
+    def test_get_variant_compact(self):
+        self._dump([FakeVarianter(self._variants(self.cat, self.dog))])
+        loaded = varianter.Varianter(
+            state=varianter.CompactVariants.suites(self.path)[0])
+        self.assertRaises(NotImplementedError, loaded.get_variant, 1)
+
+    def test_get_variant_empty(self):
+        empty = varianter.Varianter(state=[])
+        self.assertEqual(empty.get_variant(0)['variant_id'], None)
+        self.assertRaises(IndexError, empty.get_variant, 1)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
+class VariantId(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tree.TreeNode('', {'shared': 'value'})
+        self.cat = tree.TreeNode('cat', {'sound': 'meow'})
+        self.root.add_child(self.cat)
+
+    def test_cached(self):
+        variant_id = varianter.generate_variant_id([self.cat])
+        self.assertEqual(variant_id, varianter._generate_variant_id(  # pylint: disable=W0212
+            [self.cat]))
+        with unittest.mock.patch('avocado.core.varianter._generate_variant_id') as generate:
+            self.assertEqual(varianter.generate_variant_id([self.cat]),
+                             variant_id)
+            generate.assert_not_called()
+
+    def test_fingerprint_cached(self):
+        fingerprint = self.cat.fingerprint()
+        self.assertIs(self.cat.fingerprint(), fingerprint)
+        self.root.set_environment_dirty()
+        self.assertIsNot(self.cat.fingerprint(), fingerprint)
+        self.assertEqual(self.cat.fingerprint(), fingerprint)
+
+    def test_environment_dirty(self):
+        variant_id = varianter.generate_variant_id([self.cat])
+        self.root.value['shared'] = 'other'
+        self.assertEqual(varianter.generate_variant_id([self.cat]),
+                         variant_id)
+        self.root.set_environment_dirty()
+        other_id = varianter.generate_variant_id([self.cat])
+        self.assertNotEqual(other_id, variant_id)
+        self.assertTrue(other_id.startswith('cat-'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -100,6 +100,27 @@ class xUnitSucceedTest(unittest.TestCase):
         xml_schema = xmlschema.XMLSchema(junit_xsd)
         self.assertTrue(xml_schema.is_valid(xunit_output))
 
+    def test_resource_usage(self):
+        self.test1.resource_usage = {'cpu_user': 1.5, 'max_rss': 1024}
+        self.test_result.start_test(self.test1)
+        self.test_result.end_test(self.test1.get_state())
+        self.test_result.end_tests()
+        xunit_result = xunit.XUnitResult()
+        xunit_result.render(self.test_result, self.job)
+        xunit_output = self.job.config.get('job.run.result.xunit.output')
+        dom = minidom.parse(xunit_output)
+        props = {prop.attributes['name'].value: prop.attributes['value'].value
+                 for prop in dom.getElementsByTagName('property')}
+        name = str(self.test1.name)
+        self.assertEqual(props, {'%s.resource_usage.cpu_user' % name: '1.5',
+                                 '%s.resource_usage.max_rss' % name: '1024'})
+        if SCHEMA_CAPABLE:
+            junit_xsd = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                     os.path.pardir, ".data",
+                                                     'jenkins-junit.xsd'))
+            xml_schema = xmlschema.XMLSchema(junit_xsd)
+            self.assertTrue(xml_schema.is_valid(xunit_output))
+
     def test_max_test_log_size(self):
         def get_system_out(out):
             return out[out.find(b"<system-out>"):out.find(b"<system-out/>")]
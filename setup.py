@@ -80,6 +80,8 @@ if __name__ == '__main__':
                   "jobscripts = avocado.plugins.jobscripts:JobScriptsInit",
                   "json_variants = avocado.plugins.json_variants:JsonVariantsInit",
                   "run = avocado.plugins.run:RunInit",
+                  "nrunner = avocado.plugins.runner_nrunner:RunnerInit",
+                  "podman = avocado.plugins.spawners.podman:PodmanSpawnerInit",
               ],
               'avocado.plugins.cli': [
                   'wrapper = avocado.plugins.wrapper:Wrapper',
@@ -90,6 +92,7 @@ if __name__ == '__main__':
                   'tap = avocado.plugins.tap:TAP',
                   'zip_archive = avocado.plugins.archive:ArchiveCLI',
                   'json_variants = avocado.plugins.json_variants:JsonVariantsCLI',
+                  'nrunner = avocado.plugins.runner_nrunner:RunnerCLI',
                   ],
               'avocado.plugins.cli.cmd': [
                   'config = avocado.plugins.config:Config',